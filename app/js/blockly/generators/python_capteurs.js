@@ -1,5 +1,42 @@
 // fichier de génération Python pour les blocs Blockly personnalisés capteurs RobotPi
 
+// blocs qui lisent le capteur de distance
+const BLOCS_CAPTEUR_DISTANCE = [
+    'robotpi_obstacle_detection',
+    'robotpi_obstacle_eviter',
+    'robotpi_lire_distance_cm'
+];
+
+// Si le programme utilise le capteur, chaque tour de la boucle principale
+// (boucle « répéter » ou « tant que » posée au premier niveau, pas dans un
+// autre bloc) commence par robot.actualiser() : le capteur est relevé une
+// fois par tour et les blocs capteurs du même tour réutilisent cette mesure
+// (cache_capteurs_ms). Les boucles imbriquées ne sont pas modifiées.
+function utiliseCapteurDistance(workspace) {
+    return workspace.getAllBlocks(false).some(
+        (bloc) => BLOCS_CAPTEUR_DISTANCE.includes(bloc.type));
+}
+
+function actualiserChaqueTour(typeBoucle) {
+    const genererBoucle = Blockly.Python.forBlock[typeBoucle];
+    Blockly.Python.forBlock[typeBoucle] = function (block, generator) {
+        const code = genererBoucle.call(this, block, generator);
+        if (block.getSurroundParent() !== null || !utiliseCapteurDistance(block.workspace)) {
+            return code;
+        }
+        // au premier niveau, l'en-tête (for/while) n'est pas indenté
+        const entete = /^(?:for|while) .*:\n/m.exec(code);
+        if (entete === null) {
+            return code;
+        }
+        const fin = entete.index + entete[0].length;
+        return code.slice(0, fin) + generator.INDENT + 'robot.actualiser()\n' + code.slice(fin);
+    };
+}
+
+actualiserChaqueTour('controls_whileUntil');
+actualiserChaqueTour('controls_repeat_ext');
+
 Blockly.Python.forBlock['robotpi_obstacle_detection'] = function () {
     const code = 'robot.obstacle_detecte()';
     return [code, Blockly.Python.ORDER_FUNCTION_CALL];
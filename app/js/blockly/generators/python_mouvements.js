@@ -76,7 +76,8 @@ Blockly.Python.forBlock['robotpi_initialiser'] = function () {
         '    pwm_g=0, in1_g=3, in2_g=2,\n' +
         '    pwm_d=1, in1_d=4, in2_d=5,\n' +
         '    stby_pin=6, led_pin=15, nb_leds=4,\n' +
-        '    pin_bouton=14, i2c=i2c\n' +
+        '    pin_bouton=14, i2c=i2c, broches_i2c=(9, 8),\n' +
+        '    cache_capteurs_ms=100  # une mesure par tour de boucle (robot.actualiser())\n' +
         ')\n' +
         '\n' +
         'time.sleep(2)  # Attente de 2 secondes pour la mise en route\n' +
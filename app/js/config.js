@@ -35,7 +35,7 @@ const CONFIG = {
             saved: '💾 Programme sauvegardé',
             loaded: '📂 Programme chargé',
             generated: '⚡ Code Python généré',
-            libraryInstalled: '📚 Bibliothèque robotPi.py installée'
+            libraryInstalled: '📚 Bibliothèque robotPi installée'
         },
         error: {
             connection: '❌ Erreur de connexion',
@@ -707,7 +707,7 @@ async function deleteFile(filename) {
 }
 
 /**
- * Installe la bibliothèque robotPi.py
+ * Installe la bibliothèque robotPi (paquet robotPi/)
  */
 async function installLibrary() {
     if (!appState.isElectron) {
@@ -730,11 +730,12 @@ async function installLibrary() {
             await new Promise(resolve => setTimeout(resolve, 1000));
         }
         
-        logConsole('📚 Installation de robotPi.py...', 'info');
+        logConsole('📚 Installation de la bibliothèque robotPi...', 'info');
         
         // ⭐ Utiliser getResourcePath pour obtenir le bon chemin
-        const localPath = await window.electronAPI.getResourcePath('micropython/robotPi.py');
-        const remotePath = 'robotPi.py';
+        // (ampy put copie le dossier du paquet récursivement)
+        const localPath = await window.electronAPI.getResourcePath('micropython/robotPi');
+        const remotePath = 'robotPi';
         
         logConsole(`📂 Chemin local: ${localPath}`, 'info');
         
@@ -745,8 +746,11 @@ async function installLibrary() {
         );
         
         if (result.success) {
+            // Ancienne version en fichier unique : le paquet est prioritaire
+            // à l'import, on libère simplement la flash
+            await window.electronAPI.deleteFile(appState.currentPort, 'robotPi.py');
             logConsole('✅ Bibliothèque installée', 'success');
-            showToast('Bibliothèque robotPi.py installée !', 'success');
+            showToast('Bibliothèque robotPi installée !', 'success');
         } else {
             throw new Error(result.error || 'Erreur lors du téléversement');
         }
@@ -0,0 +1,55 @@
+"""
+Librairie robotPi pour Raspberry Pi Pico avec driver TB6612FNG
+Version avec VL53L0X fonctionnel intégré
+
+Les pilotes sont des sous-modules importés à la demande : un programme qui
+ne pilote que les moteurs ne charge ni neopixel ni le pilote VL53L0X.
+`from robotPi import RobotPi` fonctionne comme avec l'ancien fichier unique.
+"""
+
+# nom public -> sous-module qui le définit
+_NOMS = {
+    'RobotPi': 'robot',
+    'MoteurTB6612': 'moteurs',
+    'FileMouvements': 'moteurs',
+    'TamponLeds': 'leds',
+    'AnimationLeds': 'leds',
+    'Encodeur': 'odometrie',
+    'Odometrie': 'odometrie',
+    'Bouton': 'bouton',
+    'APPUI': 'bouton',
+    'RELACHE': 'bouton',
+    'APPUI_LONG': 'bouton',
+    'VL53L0X': 'vl53l0x',
+    'FiltreDistance': 'vl53l0x',
+    'Mesure': 'vl53l0x',
+    'GroupeCapteurs': 'vl53l0x',
+    'init_sensors': 'vl53l0x',
+    'TimeoutError': 'vl53l0x',
+    'PROFILES': 'vl53l0x',
+    'RANGE_VALID': 'vl53l0x',
+    'VCSEL_PRE_RANGE': 'vl53l0x',
+    'VCSEL_FINAL_RANGE': 'vl53l0x',
+    'BoucleComportements': 'comportements',
+    'Comportement': 'comportements',
+    'Croisiere': 'comportements',
+    'Evitement': 'comportements',
+    'Fuite': 'comportements',
+    'ArretBouton': 'comportements',
+    'AcquisitionCoeur1': 'acquisition',
+    'ServeurCommandes': 'serveur',
+    'Enregistreur': 'enregistreur',
+    'Histogramme': 'profilage',
+    'Profileur': 'profilage',
+    'mesurer_allocations': 'profilage',
+}
+
+
+def __getattr__(nom):
+    # appelé seulement pour un nom pas encore chargé
+    module = _NOMS.get(nom)
+    if module is None:
+        raise AttributeError(nom)
+    valeur = getattr(__import__('robotPi.' + module, None, None, (nom,)), nom)
+    globals()[nom] = valeur
+    return valeur
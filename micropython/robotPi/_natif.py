@@ -0,0 +1,95 @@
+"""
+Versions compilées en code machine des boucles les plus appelées
+
+@micropython.native compile le même code Python (mêmes résultats, flottants
+compris) ; @micropython.viper travaille sur des entiers machine et des
+pointeurs d'octets. Chaque fonction a une version Python de même
+comportement dans le module qui l'utilise, gardée quand ce module ne peut
+pas être importé : firmware sans émetteur natif (SyntaxError à la
+compilation), CPython et simulateur (ImportError). Les deux versions
+restent appelables pour comparer leurs résultats sur la carte.
+"""
+
+import sys
+
+if sys.implementation.name != 'micropython':
+    raise ImportError("émetteurs natifs : MicroPython uniquement")
+
+import micropython
+
+
+# === Moteurs (moteurs.py) ===
+
+@micropython.native
+def duty_u16(vitesse):
+    vitesse = max(0, min(100, vitesse))
+    return int((vitesse / 100) * 65535)
+
+
+@micropython.native
+def duty_signe(vitesse):
+    vitesse = max(-100, min(100, vitesse))
+    return int(vitesse * 65535 / 100)
+
+
+@micropython.native
+def rampe(moteur, cible, pas):
+    # appelée par le tick de FileMouvements, en interruption matérielle
+    duty = moteur.duty
+    if duty < cible:
+        moteur.appliquer(min(duty + pas, cible))
+    elif duty > cible:
+        moteur.appliquer(max(duty - pas, cible))
+
+
+# === LEDs (leds.py) ===
+
+@micropython.native
+def table_luminosite(lut, facteur, gamma):
+    if gamma == 1.0:
+        for v in range(256):
+            lut[v] = int(v * facteur)
+    else:
+        for v in range(256):
+            lut[v] = int(255 * (v / 255) ** gamma * facteur)
+
+
+@micropython.viper
+def interpoler(image, depart, arrivee, k: int, n: int):
+    # image[i] = depart[i] + (arrivee[i] - depart[i]) * k // n, octet par octet
+    p_image = ptr8(image)
+    p_depart = ptr8(depart)
+    p_arrivee = ptr8(arrivee)
+    taille = int(len(image))
+    i = 0
+    while i < taille:
+        v = int(p_depart[i])
+        p_image[i] = v + (int(p_arrivee[i]) - v) * k // n
+        i += 1
+
+
+# === VL53L0X (vl53l0x.py) ===
+
+@micropython.viper
+def select_spads(spad_map, spad_count: int, is_aperture: int):
+    spads = ptr8(spad_map)
+    enabled = 0
+    i = 0
+    while i < 48:
+        mask = 1 << (i >> 2)
+        value = int(spads[i >> 3])
+        if (i < 12 and is_aperture) or enabled >= spad_count:
+            spads[i >> 3] = (value | mask) ^ mask
+        elif value & mask:
+            enabled += 1
+        i += 1
+
+
+@micropython.viper
+def pack_u32(buf, value: int):
+    # entier 32 bits gros-boutiste dans buf[0:4]
+    p = ptr8(buf)
+    p[0] = value >> 24
+    p[1] = value >> 16
+    p[2] = value >> 8
+    p[3] = value
@@ -0,0 +1,154 @@
+"""
+Acquisition des distances sur le second cœur du RP2040 (_thread)
+
+Le cœur 1 relève les capteurs VL53L0X en boucle ; il est alors seul à
+utiliser leur bus I2C. Les dernières mesures sont publiées dans des tableaux
+préalloués protégés par un compteur de séquence : le cœur 0 les lit
+immédiatement, sans verrou et sans allocation. Un capteur en erreur ou muet
+est remis en état (VL53L0X.recover()) par le cœur 1 lui-même.
+"""
+
+import _thread
+import time
+from array import array
+
+
+class AcquisitionCoeur1:
+    """Boucle de mesure des capteurs sur le cœur 1.
+
+    Écriture (cœur 1) : le compteur de séquence passe à une valeur impaire,
+    la mesure est copiée, puis il redevient pair. Lecture (cœur 0) : copie
+    de la mesure entre deux lectures du compteur, recommencée si le compteur
+    était impair ou a changé entre-temps. La boucle du cœur 1 n'alloue rien.
+    """
+
+    def __init__(self, capteurs, age_max_ms=500, attente_ms=1):
+        self.capteurs = list(capteurs)
+        n = len(self.capteurs)
+        self.age_max_ms = age_max_ms  # au-delà, distance() renvoie None
+        self.attente_ms = attente_ms  # pause quand aucune mesure n'est prête
+        self._sequence = array('i', [0])
+        self._distances = array('H', [0] * n)
+        self._statuts = bytearray(n)
+        self._instants = array('i', [0] * n)
+        self.mesures = array('i', [0] * n)  # mesures publiées par capteur
+        self.erreurs = 0  # erreurs I2C sur le cœur 1 (aussi dans capteur.errors)
+        # copie de la dernière lecture faite par distance() (cœur 0)
+        self.statut = 0
+        self.numero = 0
+        self._actif = False
+        self._en_marche = False
+
+    @property
+    def en_marche(self):
+        return self._en_marche
+
+    def demarrer(self):
+        """Lance la boucle sur le cœur 1"""
+        if self._en_marche:
+            return
+        self._actif = True
+        self._en_marche = True
+        _thread.start_new_thread(self._boucle, ())
+
+    def arreter(self, timeout_ms=None):
+        """Arrête la boucle et attend la fin de la mesure en cours : le bus
+        I2C revient au cœur 0. Une remise en état en cours sur le cœur 1 est
+        menée à son terme : par défaut, l'attente est bornée par la plus
+        longue remise en état possible (voir VL53L0X.recover_timeout_ms())"""
+        if timeout_ms is None:
+            timeout_ms = max(capteur.recover_timeout_ms() + capteur.read_timeout_ms()
+                             for capteur in self.capteurs)
+        self._actif = False
+        debut = time.ticks_ms()
+        while self._en_marche:
+            if time.ticks_diff(time.ticks_ms(), debut) > timeout_ms:
+                raise RuntimeError("La boucle du cœur 1 ne s'arrête pas")
+            time.sleep_ms(1)
+
+    def _boucle(self):
+        # cœur 1 : pas d'allocation (for ... in range est compilé sans objet)
+        capteurs = self.capteurs
+        n = len(capteurs)
+        sequence = self._sequence
+        distances = self._distances
+        statuts = self._statuts
+        instants = self._instants
+        mesures = self.mesures
+        debut = time.ticks_ms()
+        for i in range(n):
+            instants[i] = debut
+        try:
+            while self._actif:
+                nouvelles = 0
+                for i in range(n):
+                    if not self._actif:
+                        break  # arreter() attend : pas de nouvel accès au bus
+                    capteur = capteurs[i]
+                    try:
+                        distance = capteur.poll()
+                    except (OSError, RuntimeError):
+                        # RuntimeError : échéance de la remise en état faite par poll()
+                        distance = None
+                        self.erreurs += 1
+                        self._remettre_en_etat(i)
+                        continue
+                    instant = time.ticks_ms()
+                    if distance is None:
+                        if time.ticks_diff(instant, instants[i]) > capteur.read_timeout_ms():
+                            # capteur muet : compté comme une échéance dépassée
+                            capteur.timeouts += 1
+                            self._remettre_en_etat(i)
+                        continue
+                    sequence[0] += 1  # impair : écriture en cours
+                    distances[i] = distance
+                    statuts[i] = capteur.range_status
+                    instants[i] = instant
+                    mesures[i] += 1
+                    sequence[0] += 1
+                    nouvelles += 1
+                if not nouvelles:
+                    time.sleep_ms(self.attente_ms)
+        finally:
+            self._en_marche = False
+
+    def _remettre_en_etat(self, i):
+        # cas exceptionnel : recover() réinitialise le capteur (et alloue)
+        if not self._actif:
+            return  # remise en état laissée au cœur 0 après arreter()
+        capteur = self.capteurs[i]
+        capteur.retries += 1
+        try:
+            capteur.recover()
+        except (OSError, RuntimeError):
+            pass  # déjà compté ; nouvel essai au prochain tour
+        # repart d'un délai complet avant la prochaine remise en état
+        sequence = self._sequence
+        sequence[0] += 1
+        self._instants[i] = time.ticks_ms()
+        sequence[0] += 1
+
+    def distance(self, i=0):
+        """Dernière distance (mm) du capteur i, None si aucune mesure n'a
+        moins de age_max_ms ; statut et numero de la mesure sont copiés dans
+        self.statut et self.numero"""
+        sequence = self._sequence
+        while True:
+            debut = sequence[0]
+            if debut & 1:
+                continue
+            distance = self._distances[i]
+            statut = self._statuts[i]
+            instant = self._instants[i]
+            numero = self.mesures[i]
+            if sequence[0] == debut:
+                break
+        self.statut = statut
+        self.numero = numero
+        if not numero or time.ticks_diff(time.ticks_ms(), instant) > self.age_max_ms:
+            return None
+        return distance
+
+    def distances(self):
+        """Dernières distances de tous les capteurs (liste, None si trop vieille)"""
+        return [self.distance(i) for i in range(len(self.capteurs))]
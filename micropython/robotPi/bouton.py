@@ -0,0 +1,157 @@
+"""
+Bouton sur interruption : anti-rebond par horodatage et file d'événements
+"""
+
+from machine import Pin, disable_irq, enable_irq
+import time
+from array import array
+from micropython import const
+
+
+# Types d'événements rangés dans la file
+APPUI = const(1)
+RELACHE = const(2)
+APPUI_LONG = const(3)
+
+_TAILLE_FILE = const(8)
+
+
+class Bouton:
+    """Bouton lu par interruption sur les deux fronts.
+
+    Un front n'est retenu que s'il change l'état stable du bouton et survient
+    au moins anti_rebond_ms après le précédent. Les événements (APPUI,
+    RELACHE, APPUI_LONG) et leur instant ticks_ms sont rangés dans des
+    tableaux préalloués : le gestionnaire n'alloue rien et tourne en
+    interruption matérielle.
+
+    arret_urgence est appelé directement dans l'interruption à chaque appui
+    retenu ; il ne doit pas allouer de mémoire.
+    """
+
+    def __init__(self, pin, actif=1, anti_rebond_ms=30, appui_long_ms=1000,
+                 taille_file=_TAILLE_FILE, arret_urgence=None):
+        self.pin = Pin(pin, Pin.IN, Pin.PULL_UP) if isinstance(pin, int) else pin
+        self.actif = actif  # niveau lu quand le bouton est appuyé
+        self.anti_rebond_ms = anti_rebond_ms
+        self.appui_long_ms = appui_long_ms
+        self.arret_urgence = arret_urgence
+        self._types = bytearray(taille_file)
+        self._instants = array('i', [0] * taille_file)
+        self._debut = 0
+        self._fin = 0
+        self.perdus = 0  # événements abandonnés, file pleine
+        self.rebonds = 0  # fronts ignorés par l'anti-rebond
+        self.instant = 0  # instant ticks_ms du dernier événement rendu
+        self._appuye = self.pin.value() == actif
+        self._instant_front = time.ticks_ms()
+        self._instant_appui = self._instant_front
+        self._long_signale = False
+        self.pin.irq(handler=self._front, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING,
+                     hard=True)
+
+    def value(self):
+        """Niveau brut de la broche (compatibilité avec Pin)"""
+        return self.pin.value()
+
+    @property
+    def etat(self):
+        """État retenu par l'interruption (vrai : appuyé), sans relire la
+        broche ni toucher à la file : utilisable en interruption"""
+        return self._appuye
+
+    def appuye(self):
+        """Vrai si le bouton est appuyé (état après anti-rebond)"""
+        self._resynchroniser(time.ticks_ms())
+        return self._appuye
+
+    def _pousser(self, type_evenement, instant):
+        suivant = (self._fin + 1) % len(self._types)
+        if suivant == self._debut:
+            self.perdus += 1
+            return
+        i = self._fin
+        self._types[i] = type_evenement
+        self._instants[i] = instant
+        self._fin = suivant  # publié en dernier : l'événement est complet
+
+    def _changer(self, appuye, instant):
+        self._appuye = appuye
+        self._instant_front = instant
+        if appuye:
+            self._instant_appui = instant
+            self._long_signale = False
+            self._pousser(APPUI, instant)
+            if self.arret_urgence is not None:
+                self.arret_urgence()
+        else:
+            if (not self._long_signale and time.ticks_diff(
+                    instant, self._instant_appui) >= self.appui_long_ms):
+                self._long_signale = True
+                self._pousser(APPUI_LONG, instant)
+            self._pousser(RELACHE, instant)
+
+    def _front(self, pin):
+        instant = time.ticks_ms()
+        appuye = pin.value() == self.actif
+        if appuye == self._appuye:
+            return
+        if time.ticks_diff(instant, self._instant_front) < self.anti_rebond_ms:
+            self.rebonds += 1
+            return
+        self._changer(appuye, instant)
+
+    def _resynchroniser(self, maintenant):
+        # un front ignoré pendant l'anti-rebond (appui très bref) laisse
+        # l'état stable faux : il est rattrapé une fois le délai écoulé
+        etat = disable_irq()
+        try:
+            appuye = self.pin.value() == self.actif
+            if (appuye != self._appuye and time.ticks_diff(
+                    maintenant, self._instant_front) >= self.anti_rebond_ms):
+                self._changer(appuye, maintenant)
+            elif (self._appuye and not self._long_signale and time.ticks_diff(
+                    maintenant, self._instant_appui) >= self.appui_long_ms):
+                self._long_signale = True
+                self._pousser(APPUI_LONG, maintenant)
+        finally:
+            enable_irq(etat)
+
+    def evenement(self):
+        """Retire et retourne le plus ancien événement, None si la file est vide.
+
+        L'appui long est signalé dès que la durée est atteinte, sans attendre
+        le relâchement.
+        """
+        if self._debut == self._fin:
+            self._resynchroniser(time.ticks_ms())
+            if self._debut == self._fin:
+                return None
+        i = self._debut
+        type_evenement = self._types[i]
+        self.instant = self._instants[i]
+        self._debut = (i + 1) % len(self._types)
+        return type_evenement
+
+    def attendre(self, type_evenement=APPUI, timeout_ms=None):
+        """Attend un événement du type donné (les autres sont écartés).
+
+        Retourne False si timeout_ms est écoulé avant.
+        """
+        debut = time.ticks_ms()
+        while True:
+            evenement = self.evenement()
+            if evenement == type_evenement:
+                return True
+            if evenement is None:
+                if (timeout_ms is not None
+                        and time.ticks_diff(time.ticks_ms(), debut) >= timeout_ms):
+                    return False
+                time.sleep_ms(5)
+
+    def vider(self):
+        """Oublie les événements en attente"""
+        self._debut = self._fin
+
+    def desactiver(self):
+        self.pin.irq(handler=None)
@@ -0,0 +1,310 @@
+"""
+Comportements réactifs : une boucle à période fixe, sans attente bloquante
+
+À chaque tick, la boucle relève les capteurs une seule fois (mesure prête
+du capteur de distance, événements du bouton) puis donne la main au premier
+comportement, par ordre de priorité, qui veut piloter les moteurs
+(architecture de subsomption). Les manœuvres en plusieurs temps sont de
+petites machines à états datées par ticks_ms : le robot continue de voir
+les obstacles et le bouton pendant qu'il recule ou tourne, et le temps de
+réaction est borné par la période du tick.
+"""
+
+import time
+from .bouton import APPUI
+
+
+class Comportement:
+    """Comportement de base ; decider() est appelé à chaque tick tant
+    qu'aucun comportement plus prioritaire n'a pris la main"""
+
+    nom = 'comportement'
+
+    def reinitialiser(self):
+        """Oublie la manœuvre en cours (appelé au démarrage de la boucle)"""
+
+    def decider(self, boucle, maintenant):
+        """(gauche, droite) en % pour prendre la main à ce tick, None pour
+        la laisser aux comportements suivants"""
+        return None
+
+
+class Croisiere(Comportement):
+    """Avance tout droit : toujours candidat, à placer en dernier"""
+
+    nom = 'croisiere'
+
+    def __init__(self, vitesse=None):
+        self.vitesse = vitesse
+
+    def decider(self, boucle, maintenant):
+        v = boucle.vitesse(self.vitesse)
+        return v, v
+
+
+class Evitement(Comportement):
+    """Tourne sur place tant qu'un obstacle est à moins de seuil_cm (puis
+    jusqu'à seuil_cm + hysteresis_cm), pendant au moins duree_min_ms.
+    sens : 1 vers la droite, -1 vers la gauche."""
+
+    nom = 'evitement'
+
+    def __init__(self, seuil_cm=20, vitesse=None, hysteresis_cm=5, duree_min_ms=200,
+                 sens=1):
+        self.seuil_mm = seuil_cm * 10
+        self.sortie_mm = (seuil_cm + hysteresis_cm) * 10
+        self.vitesse = vitesse
+        self.duree_min_ms = duree_min_ms
+        self.sens = sens
+        self._fin = None
+
+    def reinitialiser(self):
+        self._fin = None
+
+    def decider(self, boucle, maintenant):
+        distance = boucle.distance
+        if self._fin is None:
+            if distance is None or distance >= self.seuil_mm:
+                return None
+            self._fin = time.ticks_add(maintenant, self.duree_min_ms)
+        elif (time.ticks_diff(maintenant, self._fin) >= 0
+              and (distance is None or distance >= self.sortie_mm)):
+            self._fin = None
+            return None
+        v = boucle.vitesse(self.vitesse) * self.sens
+        return v, -v
+
+
+_LIBRE = 0
+_RECUL = 1
+_DEMI_TOUR = 2
+
+
+class Fuite(Comportement):
+    """Obstacle à moins de seuil_cm (robot coincé) : recule pendant
+    recul_ms puis fait demi-tour pendant demi_tour_ms"""
+
+    nom = 'fuite'
+
+    def __init__(self, seuil_cm=8, vitesse=None, recul_ms=400, demi_tour_ms=600):
+        self.seuil_mm = seuil_cm * 10
+        self.vitesse = vitesse
+        self.recul_ms = recul_ms
+        self.demi_tour_ms = demi_tour_ms
+        self._etat = _LIBRE
+        self._fin = 0
+
+    def reinitialiser(self):
+        self._etat = _LIBRE
+
+    def decider(self, boucle, maintenant):
+        etat = self._etat
+        if etat == _LIBRE:
+            distance = boucle.distance
+            if distance is None or distance >= self.seuil_mm:
+                return None
+            etat = _RECUL
+            self._fin = time.ticks_add(maintenant, self.recul_ms)
+        elif time.ticks_diff(maintenant, self._fin) >= 0:
+            if etat == _RECUL:
+                etat = _DEMI_TOUR
+                self._fin = time.ticks_add(maintenant, self.demi_tour_ms)
+            else:
+                self._etat = _LIBRE
+                return None
+        self._etat = etat
+        v = boucle.vitesse(self.vitesse)
+        if etat == _RECUL:
+            return -v, -v
+        return v, -v
+
+
+class ArretBouton(Comportement):
+    """Un appui sur le bouton arrête les moteurs et termine la boucle"""
+
+    nom = 'arret_bouton'
+
+    def decider(self, boucle, maintenant):
+        if not boucle.appui:
+            return None
+        boucle.arreter()
+        return 0, 0
+
+
+class BoucleComportements:
+    """Exécute des comportements par ordre de priorité (le premier de la
+    liste est le plus prioritaire), un tick toutes les periode_ms.
+
+    Le tick ne fait que relever les capteurs sans attendre (poll() du
+    capteur de distance, file du bouton) et changer la consigne des
+    moteurs quand elle change ; les rampes de FileMouvements adoucissent
+    les inversions. Une distance plus vieille que age_max_ms est oubliée
+    (distance vaut None) ; un capteur en erreur ou muet plus de
+    read_timeout_ms() est remis en état (VL53L0X.recover()).
+    """
+
+    def __init__(self, robot, comportements, periode_ms=20, rampe=None, age_max_ms=200):
+        self.robot = robot
+        self.comportements = list(comportements)
+        self.periode_ms = periode_ms
+        self.rampe = rampe
+        self.age_max_ms = age_max_ms
+        self.actif = False
+        self.distance = None  # mm, None sans mesure récente
+        self.appui = False    # appui sur le bouton depuis le tick précédent
+        self.comportement = None  # comportement qui a la main
+        self.ticks = 0
+        self.retards = 0  # ticks commencés après leur échéance
+        self._instant_distance = 0
+        self._echeance_capteur = 0  # sans mesure après, le capteur est remis en état
+        self._consigne = None
+        self._debut = self._echeance = 0
+        self._limite = None
+
+    def vitesse(self, vitesse):
+        return self.robot.vitesse_defaut if vitesse is None else vitesse
+
+    def arreter(self):
+        """Termine executer() à la fin du tick en cours"""
+        self.actif = False
+
+    def demarrer(self):
+        """Prépare la boucle ; à appeler avant des tick() faits à la main"""
+        for comportement in self.comportements:
+            comportement.reinitialiser()
+        bouton = self.robot.bouton
+        if bouton is not None:
+            bouton.vider()
+        self.distance = None
+        self._consigne = None
+        self.comportement = None
+        self.actif = True
+        capteur = self.robot.capteur_distance
+        if capteur is not None:
+            self._echeance_capteur = time.ticks_add(time.ticks_ms(),
+                                                    capteur.read_timeout_ms())
+
+    def _percevoir(self, maintenant):
+        robot = self.robot
+        capteur = robot.capteur_distance
+        if robot.acquisition is not None:
+            # mesures publiées par le cœur 1 (trop vieilles : None), sans
+            # accès au bus
+            self.distance = robot.lire_distance()
+        elif capteur is not None:
+            try:
+                distance = capteur.poll()
+            except OSError:
+                distance = None
+                self._remettre_en_etat(capteur)
+            if distance is not None:
+                if robot.filtre_distance is not None:
+                    distance = robot.filtre_distance.ajouter(distance, capteur.range_status)
+                robot.derniere_distance = distance
+                self.distance = distance
+                self._instant_distance = maintenant
+                self._echeance_capteur = time.ticks_add(maintenant, capteur.read_timeout_ms())
+            else:
+                if (self.distance is not None and time.ticks_diff(
+                        maintenant, self._instant_distance) > self.age_max_ms):
+                    self.distance = None
+                if time.ticks_diff(maintenant, self._echeance_capteur) > 0:
+                    # capteur muet : compté comme une échéance dépassée
+                    capteur.timeouts += 1
+                    self._remettre_en_etat(capteur)
+        appui = False
+        bouton = robot.bouton
+        if bouton is not None:
+            while True:
+                evenement = bouton.evenement()
+                if evenement is None:
+                    break
+                if evenement == APPUI:
+                    appui = True
+        self.appui = appui
+
+    def _remettre_en_etat(self, capteur):
+        # le tick suivant attend de nouveau une mesure pendant read_timeout_ms()
+        capteur.retries += 1
+        try:
+            capteur.recover()
+        except (OSError, RuntimeError):
+            pass  # déjà compté par le capteur ; nouvel essai plus tard
+        self._echeance_capteur = time.ticks_add(time.ticks_ms(), capteur.read_timeout_ms())
+
+    def tick(self):
+        """Un tick : perception, arbitrage, consigne des moteurs ; retourne
+        le comportement qui a la main (None si aucun)"""
+        maintenant = time.ticks_ms()
+        self._percevoir(maintenant)
+        choisi = None
+        consigne = (0, 0)
+        for comportement in self.comportements:
+            commande = comportement.decider(self, maintenant)
+            if commande is not None:
+                choisi = comportement
+                consigne = commande
+                break
+        if consigne != self._consigne:
+            self._consigne = consigne
+            self.robot.changer_mouvement(consigne[0], consigne[1], self.rampe)
+        self.comportement = choisi
+        self.ticks += 1
+        if self.robot.enregistreur is not None:
+            marque = 0 if choisi is None else self.comportements.index(choisi) + 1
+            self.robot.enregistrer(marque)
+        return choisi
+
+    def _attente(self):
+        # ms jusqu'au tick suivant, None quand la durée est écoulée
+        self._echeance = time.ticks_add(self._echeance, self.periode_ms)
+        maintenant = time.ticks_ms()
+        if (self._limite is not None
+                and time.ticks_diff(maintenant, self._debut) >= self._limite):
+            return None
+        attente = time.ticks_diff(self._echeance, maintenant)
+        if attente < 0:
+            # tick trop long : on repart de maintenant sans rattraper
+            self.retards += 1
+            self._echeance = maintenant
+            attente = 0
+        return attente
+
+    def _lancer(self, duree):
+        self.demarrer()
+        self._debut = self._echeance = time.ticks_ms()
+        self._limite = None if duree is None else int(duree * 1000)
+
+    def executer(self, duree=None):
+        """Boucle jusqu'à arreter() (par exemple ArretBouton) ou pendant
+        duree secondes, puis arrête les moteurs"""
+        self._lancer(duree)
+        try:
+            while self.actif:
+                self.tick()
+                attente = self._attente()
+                if attente is None:
+                    break
+                time.sleep_ms(attente)
+        finally:
+            self.actif = False
+            self.robot.stopper()
+
+    async def executer_async(self, duree=None):
+        """Version uasyncio de executer() : les autres tâches tournent
+        entre deux ticks"""
+        try:
+            import asyncio
+        except ImportError:
+            import uasyncio as asyncio
+        self._lancer(duree)
+        try:
+            while self.actif:
+                self.tick()
+                attente = self._attente()
+                if attente is None:
+                    break
+                await asyncio.sleep(attente / 1000)
+        finally:
+            self.actif = False
+            self.robot.stopper()
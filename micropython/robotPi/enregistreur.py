@@ -0,0 +1,179 @@
+"""
+Enregistreur de vol : état du robot en enregistrements binaires de taille fixe
+
+Les enregistrements sont écrits dans un tampon circulaire en RAM ; chaque
+bloc plein est ajouté d'une seule écriture au fichier en flash, qui change
+de nom quand il atteint sa taille maximale (vol.rec -> vol.rec.1 ...).
+Ce module n'importe rien de spécifique à la carte : le décodeur du PC
+(robotpi_client.enregistrement) lit le même format.
+"""
+
+import os
+import struct
+import time
+
+try:
+    from micropython import const, schedule
+except ImportError:  # décodeur sur PC
+    def const(valeur):
+        return valeur
+    schedule = None
+
+
+MAGIQUE = b'RVOL'
+VERSION = const(1)
+# magique, version, taille d'un enregistrement, taille d'un bloc
+FORMAT_ENTETE = '<4sBBH8x'
+# ticks_ms, distance mm, duty gauche et droit / 2, LED 0 (r, g, b), bouton,
+# statut du capteur, marque libre
+FORMAT = '<IHhhBBBBBB'
+TAILLE = const(16)
+
+AUCUNE_DISTANCE = const(0xffff)
+# bits de l'octet bouton
+BOUTON_APPUYE = const(1)
+ARRET_URGENCE = const(2)
+
+
+class Enregistreur:
+    """Tampon circulaire d'enregistrements vidé par blocs dans un fichier.
+
+    enregistrer() ne fait qu'un struct.pack_into dans le tampon ; quand un
+    bloc est plein et si ecriture_auto est vrai, son écriture d'un coup en
+    flash (taille_bloc octets tous les taille_bloc / 16 enregistrements) est
+    confiée à micropython.schedule. Elle n'est que différée à la limite de
+    bytecode suivante : hors d'une interruption, elle s'exécute dès le
+    retour de enregistrer() et allonge ce tour de boucle. Avec ecriture_auto
+    faux, les blocs pleins attendent vider(), à appeler là où la boucle peut
+    attendre ; si le programme ne vide pas à temps, les plus anciens sont
+    écrasés et comptés dans blocs_perdus : le coût d'un appel reste borné.
+
+    enregistrer() ne modifie que _position et _pleins, vider() que _ecrits :
+    une écriture planifiée peut s'intercaler entre deux instructions de
+    enregistrer() sans perdre de bloc.
+    """
+
+    def __init__(self, fichier='vol.rec', taille_bloc=512, nb_blocs=4,
+                 taille_fichier=65536, nb_fichiers=2, ecriture_auto=True,
+                 nouveau_fichier=True):
+        self.fichier = fichier
+        self.taille_bloc = max(TAILLE, taille_bloc - taille_bloc % TAILLE)
+        self.nb_blocs = max(2, nb_blocs)
+        self.taille_fichier = taille_fichier
+        self.nb_fichiers = nb_fichiers
+        self.ecriture_auto = ecriture_auto
+        self._tampon = bytearray(self.taille_bloc * self.nb_blocs)
+        self._mv = memoryview(self._tampon)
+        self._position = 0  # prochain enregistrement dans le tampon
+        self._pleins = 0    # blocs remplis depuis le début
+        self._ecrits = 0    # numéro du prochain bloc à écrire (ou écarté)
+        self._perdus = 0
+        self._planifie = False
+        self._vider_ref = self._vider_planifie  # schedule() n'alloue pas
+        self._f = None
+        self._taille = 0
+        self.enregistrements = 0
+        self.blocs_ecrits = 0
+        if nouveau_fichier:
+            self._tourner()
+
+    def enregistrer(self, distance, duty_g, duty_d, r=0, g=0, b=0, bouton=0,
+                    statut=0, marque=0):
+        position = self._position
+        struct.pack_into(FORMAT, self._tampon, position, time.ticks_ms(),
+                         AUCUNE_DISTANCE if distance is None else min(distance, 0xfffe),
+                         duty_g >> 1, duty_d >> 1, r, g, b, bouton, statut, marque)
+        position += TAILLE
+        if position == len(self._tampon):
+            position = 0
+        self._position = position
+        self.enregistrements += 1
+        if position % self.taille_bloc == 0:
+            self._pleins += 1
+            if self.ecriture_auto:
+                if schedule is None:
+                    self.vider()
+                elif not self._planifie:
+                    self._planifie = True
+                    try:
+                        schedule(self._vider_ref, 0)
+                    except RuntimeError:
+                        # file pleine : écrit avec le bloc suivant
+                        self._planifie = False
+
+    @property
+    def blocs_perdus(self):
+        """Blocs écrasés avant d'avoir été écrits"""
+        return self._perdus + max(0, self._premier_intact() - self._ecrits)
+
+    def _premier_intact(self):
+        # le bloc en cours de remplissage occupe une des nb_blocs cases
+        return self._pleins - (self.nb_blocs - 1)
+
+    def _vider_planifie(self, _):
+        self._planifie = False
+        self.vider()
+
+    def vider(self):
+        """Écrit les blocs pleins dans le fichier, un write() par bloc"""
+        pleins = self._pleins
+        premier = self._premier_intact()
+        if self._ecrits < premier:
+            # le tampon a débordé : les plus anciens blocs ont été écrasés
+            self._perdus += premier - self._ecrits
+            self._ecrits = premier
+        if self._ecrits == pleins:
+            return
+        while self._ecrits < pleins:
+            debut = (self._ecrits % self.nb_blocs) * self.taille_bloc
+            self._ecrire(self._mv[debut:debut + self.taille_bloc])
+            self._ecrits += 1
+            self.blocs_ecrits += 1
+        if self._f is not None:
+            self._f.flush()
+
+    def fermer(self):
+        """Écrit aussi le bloc en cours (incomplet) puis ferme le fichier"""
+        self.vider()
+        debut = self._position - self._position % self.taille_bloc
+        if self._position > debut:
+            self._ecrire(self._mv[debut:self._position])
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        self._position = 0
+        self._pleins = 0
+        self._ecrits = 0
+
+    def _ecrire(self, donnees):
+        if self._f is None:
+            try:
+                self._taille = os.stat(self.fichier)[6]
+            except OSError:
+                self._taille = 0
+            self._f = open(self.fichier, 'ab')
+            if self._taille == 0:
+                self._f.write(struct.pack(FORMAT_ENTETE, MAGIQUE, VERSION, TAILLE,
+                                          self.taille_bloc))
+                self._taille = struct.calcsize(FORMAT_ENTETE)
+        self._f.write(donnees)
+        self._taille += len(donnees)
+        if self._taille >= self.taille_fichier:
+            self._tourner()
+
+    def _tourner(self):
+        # vol.rec -> vol.rec.1 -> ... ; le plus ancien est supprimé
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        for i in range(self.nb_fichiers - 1, 0, -1):
+            ancien = self.fichier if i == 1 else '%s.%d' % (self.fichier, i - 1)
+            try:
+                os.rename(ancien, '%s.%d' % (self.fichier, i))
+            except OSError:
+                pass
+        if self.nb_fichiers <= 1:
+            try:
+                os.remove(self.fichier)
+            except OSError:
+                pass
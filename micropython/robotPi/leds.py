@@ -0,0 +1,261 @@
+"""
+Tampon d'image et animations des LEDs WS2812B
+"""
+
+from machine import Timer
+import math
+import micropython
+from micropython import const
+
+
+# Nombre maximal d'images précalculées par animation
+_MAX_IMAGES = const(64)
+
+# Couleurs de l'arc-en-ciel affichées par couleur_arc_en_ciel
+_ARC_EN_CIEL = (
+    (255, 0, 0),    # Rouge
+    (255, 127, 0),  # Orange
+    (255, 255, 0),  # Jaune
+    (0, 255, 0),    # Vert
+    (0, 0, 255),    # Bleu
+    (75, 0, 130),   # Indigo
+    (148, 0, 211),  # Violet
+)
+
+
+def _table_luminosite_py(lut, facteur, gamma):
+    if gamma == 1.0:
+        for v in range(256):
+            lut[v] = int(v * facteur)
+    else:
+        for v in range(256):
+            lut[v] = int(255 * (v / 255) ** gamma * facteur)
+
+
+def _interpoler_py(image, depart, arrivee, k, n):
+    for i in range(len(image)):
+        image[i] = depart[i] + (arrivee[i] - depart[i]) * k // n
+
+
+try:
+    from ._natif import (table_luminosite as _table_luminosite,
+                         interpoler as _interpoler)
+except (ImportError, SyntaxError, ValueError):
+    # pas d'émetteur natif : versions Python
+    _table_luminosite = _table_luminosite_py
+    _interpoler = _interpoler_py
+
+
+class TamponLeds:
+    """Image des LEDs WS2812B écrite directement dans le tampon NeoPixel.
+
+    Le remplissage se fait par copies de tranches, la luminosité passe par
+    une table précalculée et write() n'est appelé que si l'image a changé
+    depuis le dernier envoi.
+    """
+
+    def __init__(self, leds, gamma=1.0):
+        self.leds = leds
+        self.buf = leds.buf
+        self.bpp = leds.bpp
+        self.nb_leds = len(self.buf) // self.bpp
+        ordre = getattr(leds, 'ORDER', (1, 0, 2, 3))
+        self._ir = ordre[0]
+        self._ig = ordre[1]
+        self._ib = ordre[2]
+        self._mv = memoryview(self.buf)
+        self._pixel = bytearray(self.bpp)
+        self._envoye = bytearray(len(self.buf))
+        self._envoye_valide = False
+        self.gamma = gamma
+        self._lut = bytearray(256)
+        self._lut_luminosite = None
+        self._motif = None
+        self.ecritures = 0  # nombre d'envois effectifs vers les LEDs
+
+    def table_luminosite(self, luminosite):
+        """Table de correspondance 0-255 pour une luminosité en % (mise en cache)"""
+        if luminosite != self._lut_luminosite:
+            facteur = max(0.0, min(1.0, luminosite / 100))
+            _table_luminosite(self._lut, facteur, self.gamma)
+            self._lut_luminosite = luminosite
+        return self._lut
+
+    def _preparer(self, r, g, b, luminosite):
+        if luminosite != 100 or self.gamma != 1.0:
+            lut = self.table_luminosite(luminosite)
+            r = lut[r]
+            g = lut[g]
+            b = lut[b]
+        pixel = self._pixel
+        pixel[self._ir] = r
+        pixel[self._ig] = g
+        pixel[self._ib] = b
+        return pixel
+
+    def couleur(self, index):
+        """Couleur (r, g, b) d'une LED dans l'image, luminosité appliquée"""
+        debut = index * self.bpp
+        buf = self.buf
+        return buf[debut + self._ir], buf[debut + self._ig], buf[debut + self._ib]
+
+    def definir(self, index, r, g, b, luminosite=100):
+        """Change la couleur d'une LED dans l'image"""
+        debut = index * self.bpp
+        self.buf[debut:debut + self.bpp] = self._preparer(r, g, b, luminosite)
+
+    def _remplir_dans(self, buf, mv, r, g, b, luminosite):
+        total = len(buf)
+        n = self.bpp
+        if not total:
+            return
+        buf[0:n] = self._preparer(r, g, b, luminosite)
+        # doublement de la zone déjà remplie : log2(nb_leds) copies
+        while n < total:
+            m = min(n, total - n)
+            buf[n:n + m] = mv[0:m]
+            n += m
+
+    def remplir(self, r, g, b, luminosite=100):
+        """Donne la même couleur à toutes les LEDs de l'image"""
+        self._remplir_dans(self.buf, self._mv, r, g, b, luminosite)
+
+    def image(self, r, g, b, luminosite=100):
+        """Nouvelle image unie hors du tampon, pour les animations"""
+        image = bytearray(len(self.buf))
+        self._remplir_dans(image, memoryview(image), r, g, b, luminosite)
+        return image
+
+    def copier(self, donnees, debut=0):
+        """Copie des pixels déjà ordonnés pour le bandeau à partir de la LED debut"""
+        debut *= self.bpp
+        fin = min(len(self.buf), debut + len(donnees))
+        self.buf[debut:fin] = donnees[:fin - debut]
+
+    def arc_en_ciel(self, decalage):
+        """Image arc-en-ciel décalée de decalage couleurs"""
+        if self._motif is None:
+            # motif précalculé, assez long pour tous les décalages
+            motif = bytearray((self.nb_leds + len(_ARC_EN_CIEL)) * self.bpp)
+            for i in range(self.nb_leds + len(_ARC_EN_CIEL)):
+                debut = i * self.bpp
+                motif[debut:debut + self.bpp] = self._preparer(
+                    *_ARC_EN_CIEL[i % len(_ARC_EN_CIEL)], 100)
+            self._motif = memoryview(motif)
+        debut = (decalage % len(_ARC_EN_CIEL)) * self.bpp
+        self.buf[:] = self._motif[debut:debut + len(self.buf)]
+
+    def ecrire(self, forcer=False):
+        """Envoie l'image aux LEDs si elle a changé, retourne True si envoyée"""
+        if not forcer and self._envoye_valide and self.buf == self._envoye:
+            return False
+        self.leds.write()
+        self._envoye[:] = self.buf
+        self._envoye_valide = True
+        self.ecritures += 1
+        return True
+
+
+class AnimationLeds:
+    """Moteur d'animation des LEDs cadencé par machine.Timer.
+
+    Les images de chaque effet sont précalculées au lancement ; à chaque
+    tick il ne reste qu'une copie de tranche et un write() éventuel. Le
+    programme principal continue de s'exécuter pendant l'animation.
+    """
+
+    def __init__(self, tampon, images_par_seconde=30):
+        self.tampon = tampon
+        self.images_par_seconde = images_par_seconde
+        self._timer = None
+        self._images = None
+        self._pos = 0
+        self._boucle = False
+        self._afficher_ref = self._afficher_image
+        self.images_perdues = 0  # ticks sautés (file du planificateur pleine)
+
+    @property
+    def active(self):
+        return self._images is not None
+
+    def _nb_images(self, duree):
+        n = int(duree * self.images_par_seconde)
+        return max(2, min(n, _MAX_IMAGES))
+
+    def demarrer(self, images, periode_ms, boucle=True):
+        """Joue une liste d'images (bytearray) à raison d'une par periode_ms"""
+        self.arreter()
+        self._images = images
+        self._pos = 0
+        self._boucle = boucle
+        self._afficher_image(0)
+        self._timer = Timer(-1)
+        self._timer.init(period=max(1, int(periode_ms)), mode=Timer.PERIODIC,
+                         callback=self._tick)
+
+    def arreter(self):
+        """Arrête l'animation en laissant la dernière image affichée"""
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        self._images = None
+
+    def _tick(self, timer):
+        # le rafraîchissement des LEDs est fait hors interruption
+        try:
+            micropython.schedule(self._afficher_ref, 0)
+        except RuntimeError:
+            self.images_perdues += 1
+
+    def _afficher_image(self, _):
+        images = self._images
+        if images is None:
+            return
+        self.tampon.buf[:] = images[self._pos]
+        self.tampon.ecrire()
+        self._pos += 1
+        if self._pos >= len(images):
+            if self._boucle:
+                self._pos = 0
+            else:
+                self.arreter()
+
+    def clignoter(self, r, g, b, intervalle=0.5, nb_fois=None):
+        """Clignotement, indéfiniment si nb_fois vaut None"""
+        allume = self.tampon.image(r, g, b)
+        eteint = self.tampon.image(0, 0, 0)
+        if nb_fois is None:
+            self.demarrer([allume, eteint], intervalle * 1000)
+        else:
+            self.demarrer([allume, eteint] * nb_fois, intervalle * 1000,
+                          boucle=False)
+
+    def arc_en_ciel(self, intervalle=0.1):
+        """Arc-en-ciel qui défile d'une LED par image"""
+        tampon = self.tampon
+        images = []
+        for decalage in range(len(_ARC_EN_CIEL)):
+            tampon.arc_en_ciel(decalage)
+            images.append(bytearray(tampon.buf))
+        self.demarrer(images, intervalle * 1000)
+
+    def fondu(self, r, g, b, duree=1.0):
+        """Fondu de l'image actuelle vers une couleur, puis arrêt"""
+        depart = bytearray(self.tampon.buf)
+        arrivee = self.tampon.image(r, g, b)
+        n = self._nb_images(duree)
+        images = []
+        for k in range(1, n + 1):
+            image = bytearray(len(depart))
+            _interpoler(image, depart, arrivee, k, n)
+            images.append(image)
+        self.demarrer(images, duree * 1000 / n, boucle=False)
+
+    def respiration(self, r, g, b, periode=2.0):
+        """Luminosité qui monte et descend en continu"""
+        n = self._nb_images(periode)
+        images = []
+        for k in range(n):
+            luminosite = 50 - 50 * math.cos(2 * math.pi * k / n)
+            images.append(self.tampon.image(r, g, b, luminosite))
+        self.demarrer(images, periode * 1000 / n)
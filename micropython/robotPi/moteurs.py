@@ -0,0 +1,200 @@
+"""
+Moteurs TB6612FNG et file de mouvements
+"""
+
+from machine import Pin, PWM, Timer
+import time
+from micropython import const
+from array import array
+
+
+class MoteurTB6612:
+    def __init__(self, pwm_pin, in1_pin, in2_pin, freq=100):
+        self.pwm = PWM(Pin(pwm_pin, Pin.OUT))
+        self.pwm.freq(freq)
+        self.in1 = Pin(in1_pin, Pin.OUT)
+        self.in2 = Pin(in2_pin, Pin.OUT)
+        self.duty = 0  # rapport cyclique signé, négatif en marche arrière
+        self.bloque = False  # arrêt d'urgence : seul stopper() agit encore
+        self.stopper()
+
+    def avancer(self, vitesse):
+        if self.bloque:
+            return
+        duty = _duty_u16(vitesse)
+        self.in1.off()
+        self.in2.on()
+        self.pwm.duty_u16(duty)
+        self.duty = duty
+    
+    def reculer(self, vitesse):
+        if self.bloque:
+            return
+        duty = _duty_u16(vitesse)
+        self.in1.on()
+        self.in2.off()
+        self.pwm.duty_u16(duty)
+        self.duty = -duty
+    
+    def stopper(self):
+        self.in1.off()
+        self.in2.off()
+        self.pwm.duty_u16(0)
+        self.duty = 0
+
+    def appliquer(self, duty):
+        """Rapport cyclique signé entier (-65535 à 65535), utilisable en interruption"""
+        if self.bloque:
+            duty = 0
+        if duty > 0:
+            self.in1.off()
+            self.in2.on()
+            self.pwm.duty_u16(duty)
+        elif duty < 0:
+            self.in1.on()
+            self.in2.off()
+            self.pwm.duty_u16(-duty)
+        else:
+            self.in1.off()
+            self.in2.off()
+            self.pwm.duty_u16(0)
+        self.duty = duty
+
+
+_NB_SEGMENTS = const(16)
+_DUTY_MAX = const(65535)
+
+
+def _duty_u16_py(vitesse):
+    vitesse = max(0, min(100, vitesse))
+    return int((vitesse / 100) * 65535)
+
+
+def _duty_signe_py(vitesse):
+    vitesse = max(-100, min(100, vitesse))
+    return int(vitesse * _DUTY_MAX / 100)
+
+
+def _rampe_py(moteur, cible, pas):
+    duty = moteur.duty
+    if duty < cible:
+        moteur.appliquer(min(duty + pas, cible))
+    elif duty > cible:
+        moteur.appliquer(max(duty - pas, cible))
+
+
+try:
+    from ._natif import (duty_u16 as _duty_u16, duty_signe as _duty_signe,
+                         rampe as _rampe)
+except (ImportError, SyntaxError, ValueError):
+    # pas d'émetteur natif : versions Python
+    _duty_u16 = _duty_u16_py
+    _duty_signe = _duty_signe_py
+    _rampe = _rampe_py
+
+
+class FileMouvements:
+    """File de segments de mouvement exécutée par machine.Timer.
+
+    Chaque segment donne les vitesses gauche/droite (en %, négatives en
+    marche arrière), une durée et une rampe d'accélération. Les conversions
+    en rapport cyclique sont faites à l'ajout : le tick du timer ne fait que
+    des additions entières sur des tableaux préalloués, sans allocation, et
+    peut donc tourner en interruption matérielle.
+    """
+
+    def __init__(self, moteur_gauche, moteur_droit, frequence=100, rampe=400):
+        self.moteur_gauche = moteur_gauche
+        self.moteur_droit = moteur_droit
+        self.frequence = frequence
+        self.rampe = rampe  # %/s par défaut (400 : de 0 à 100 % en 0,25 s)
+        self._cibles_g = array('i', [0] * _NB_SEGMENTS)
+        self._cibles_d = array('i', [0] * _NB_SEGMENTS)
+        self._durees = array('i', [0] * _NB_SEGMENTS)  # en ticks, 0 = maintenu
+        self._pas = array('i', [0] * _NB_SEGMENTS)     # duty par tick
+        self._debut = 0
+        self._fin = 0
+        self._cible_g = 0
+        self._cible_d = 0
+        self._pas_courant = self._pas_rampe(rampe)
+        self._pas_arret = self._pas_courant
+        self._reste = -1  # ticks restants du segment, -1 = maintenu
+        self._timer = None
+
+    def _pas_rampe(self, rampe):
+        return max(1, int(rampe * _DUTY_MAX / 100 / self.frequence))
+
+    @property
+    def en_cours(self):
+        """Vrai tant qu'un segment temporisé ou une rampe n'est pas terminé
+        (faux une fois la file arrêtée par arreter())"""
+        if self._timer is None:
+            return False  # moteurs commandés directement : plus rien à attendre
+        return (self._debut != self._fin or self._reste >= 0
+                or self.moteur_gauche.duty != self._cible_g
+                or self.moteur_droit.duty != self._cible_d)
+
+    def ajouter(self, gauche, droite, duree=0, rampe=None):
+        """Ajoute un segment ; duree=0 le maintient jusqu'au segment suivant.
+
+        À la fin du dernier segment temporisé, le robot ralentit jusqu'à l'arrêt.
+        """
+        suivant = (self._fin + 1) % _NB_SEGMENTS
+        if suivant == self._debut:
+            raise RuntimeError("File de mouvements pleine")
+        i = self._fin
+        self._cibles_g[i] = _duty_signe(gauche)
+        self._cibles_d[i] = _duty_signe(droite)
+        self._durees[i] = max(1, int(duree * self.frequence)) if duree > 0 else 0
+        self._pas[i] = self._pas_rampe(self.rampe if rampe is None else rampe)
+        self._fin = suivant  # publié en dernier : le segment est complet
+        if self._timer is None:
+            self._timer = Timer(-1)
+            self._timer.init(freq=self.frequence, mode=Timer.PERIODIC,
+                             callback=self._tick)
+
+    def remplacer(self, gauche, droite, rampe=None):
+        """Abandonne la file et rejoint tout de suite les vitesses données,
+        maintenues jusqu'au segment suivant"""
+        self._debut = self._fin
+        self._reste = 0
+        self.ajouter(gauche, droite, 0, rampe)
+
+    def vider(self):
+        """Abandonne les segments en attente et ralentit jusqu'à l'arrêt"""
+        self._debut = self._fin
+        self._reste = 0
+
+    def arreter(self):
+        """Arrête le timer et vide la file sans toucher aux moteurs"""
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        self._debut = self._fin
+        self._cible_g = 0
+        self._cible_d = 0
+        self._reste = -1
+
+    def attendre(self):
+        """Bloque jusqu'à la fin des segments temporisés et des rampes"""
+        while self.en_cours:
+            time.sleep_ms(5)
+
+    def _tick(self, timer):
+        if self._reste <= 0:
+            i = self._debut
+            if i != self._fin:
+                self._cible_g = self._cibles_g[i]
+                self._cible_d = self._cibles_d[i]
+                self._pas_courant = self._pas[i]
+                self._reste = self._durees[i] or -1
+                self._debut = (i + 1) % _NB_SEGMENTS
+            elif self._reste == 0:
+                self._cible_g = 0
+                self._cible_d = 0
+                self._pas_courant = self._pas_arret
+                self._reste = -1
+        _rampe(self.moteur_gauche, self._cible_g, self._pas_courant)
+        _rampe(self.moteur_droit, self._cible_d, self._pas_courant)
+        if self._reste > 0:
+            self._reste -= 1
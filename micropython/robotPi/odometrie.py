@@ -0,0 +1,247 @@
+"""
+Encodeurs de roues, régulation de vitesse et odométrie
+"""
+
+from machine import Pin, Timer
+import math
+import time
+import micropython
+from array import array
+from micropython import const
+
+
+_DUTY_MAX = const(65535)
+_VIRGULE = const(8)  # consignes et mesures en 1/256 d'impulsion par tick
+
+
+class Encodeur:
+    """Encodeur en quadrature compté par interruption.
+
+    Les deux fronts de la voie A sont comptés, le sens étant donné par la
+    voie B : deux impulsions par période de A. Le compteur est un tableau
+    d'entier de taille fixe mis à jour sans allocation en interruption
+    matérielle.
+    """
+
+    def __init__(self, pin_a, pin_b, inverse=False):
+        self.pin_a = Pin(pin_a, Pin.IN, Pin.PULL_UP) if isinstance(pin_a, int) else pin_a
+        self.pin_b = Pin(pin_b, Pin.IN, Pin.PULL_UP) if isinstance(pin_b, int) else pin_b
+        self.compte = array('i', [0])
+        self._pas = -1 if inverse else 1
+        self.pin_a.irq(handler=self._front, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING,
+                       hard=True)
+
+    def _front(self, pin):
+        # A et B différents après le front : la roue avance
+        if pin.value() != self.pin_b.value():
+            self.compte[0] += self._pas
+        else:
+            self.compte[0] -= self._pas
+
+    def valeur(self):
+        return self.compte[0]
+
+    def desactiver(self):
+        self.pin_a.irq(handler=None)
+
+
+class Odometrie:
+    """Régulation PI de la vitesse des deux roues et calcul de la position.
+
+    Un timer à fréquence fixe mesure l'avance de chaque roue. Pendant un
+    déplacement (avancer_cm, tourner_degres), il règle le rapport cyclique
+    de chaque moteur en arithmétique entière, ralentit à l'approche de la
+    cible et arrête chaque roue dès que sa distance est parcourue. La
+    position (x, y, cap) est intégrée hors interruption.
+
+    impulsions_par_tour est le nombre de périodes de la voie A par tour de
+    roue (résolution de l'encodeur multipliée par le rapport de réduction).
+    kp et ki sont relatifs au gain en boucle ouverte : avec kp=1, un écart
+    égal à la vitesse maximale ajoute tout le rapport cyclique.
+    """
+
+    def __init__(self, moteur_gauche, moteur_droit, encodeur_gauche, encodeur_droit,
+                 impulsions_par_tour, diametre_roue_mm=65, entraxe_mm=120,
+                 vitesse_max_mm_s=300, frequence=50, kp=0.6, ki=0.15):
+        self.moteur_gauche = moteur_gauche
+        self.moteur_droit = moteur_droit
+        self.encodeur_gauche = encodeur_gauche
+        self.encodeur_droit = encodeur_droit
+        self.frequence = frequence
+        self.entraxe_mm = entraxe_mm
+        self.impulsions_par_mm = 2 * impulsions_par_tour / (math.pi * diametre_roue_mm)
+        self.vitesse_max_mm_s = vitesse_max_mm_s
+        # impulsions par tick à la vitesse maximale, en virgule fixe
+        self._consigne_max = max(1, int(vitesse_max_mm_s * self.impulsions_par_mm
+                                        / frequence * (1 << _VIRGULE)))
+        self._kp = int(kp * _DUTY_MAX / self._consigne_max * (1 << _VIRGULE))
+        self._ki = int(ki * _DUTY_MAX / self._consigne_max * (1 << _VIRGULE))
+        # rapport cyclique en boucle ouverte par unité de consigne
+        self._gain_avance = (_DUTY_MAX << _VIRGULE) // self._consigne_max
+        # l'intégrale seule ne dépasse jamais le rapport cyclique maximal
+        self._integrale_max = (_DUTY_MAX << _VIRGULE) // max(1, self._ki)
+        # état par roue : 0 gauche, 1 droite
+        self._consignes = array('i', [0, 0])   # impulsions/tick << 8, signées
+        self._restants = array('i', [0, 0])    # impulsions restantes, -1 = sans cible
+        self._origines = array('i', [0, 0])
+        self._cibles = array('i', [0, 0])
+        self._integrales = array('i', [0, 0])
+        self._faits = array('i', [0, 0])       # impulsions parcourues depuis le départ
+        self._precedents = array('i', [encodeur_gauche.compte[0], encodeur_droit.compte[0]])
+        self._mesures = array('i', [0, 0])     # impulsions lors du dernier tick
+        self._actif = False
+        self.x = 0.0
+        self.y = 0.0
+        self.cap = 0.0  # radians, positif vers la gauche
+        self._position_g = encodeur_gauche.compte[0]
+        self._position_d = encodeur_droit.compte[0]
+        self._position_ref = self._integrer_position
+        self.positions_perdues = 0  # intégrations sautées (planificateur plein)
+        self._timer = Timer(-1)
+        self._timer.init(freq=frequence, mode=Timer.PERIODIC, callback=self._tick)
+
+    @property
+    def en_cours(self):
+        """Vrai tant que le déplacement demandé n'est pas terminé"""
+        return self._actif
+
+    def _demarrer(self, roue, impulsions, vitesse):
+        sens = 1 if impulsions >= 0 else -1
+        vitesse = max(0, min(100, vitesse))
+        self._consignes[roue] = sens * (self._consigne_max * vitesse // 100)
+        self._cibles[roue] = abs(impulsions)
+        self._restants[roue] = abs(impulsions)
+        self._integrales[roue] = 0
+        self._faits[roue] = 0
+
+    def deplacer(self, distance_g_mm, distance_d_mm, vitesse):
+        """Lance un déplacement de chaque roue (mm, négatif en arrière) à
+        vitesse % de la vitesse maximale ; rend la main immédiatement"""
+        self._actif = False
+        self._origines[0] = self.encodeur_gauche.compte[0]
+        self._origines[1] = self.encodeur_droit.compte[0]
+        self._demarrer(0, int(distance_g_mm * self.impulsions_par_mm), vitesse)
+        self._demarrer(1, int(distance_d_mm * self.impulsions_par_mm), vitesse)
+        self._actif = True  # publié en dernier : les consignes sont complètes
+
+    def arreter(self):
+        """Abandonne le déplacement sans toucher aux moteurs (utilisable en
+        interruption)"""
+        self._actif = False
+        self._restants[0] = -1
+        self._restants[1] = -1
+
+    def attendre(self):
+        while self._actif:
+            time.sleep_ms(5)
+
+    def _mesurer(self, roue, compte):
+        self._mesures[roue] = compte - self._precedents[roue]
+        self._precedents[roue] = compte
+        fait = compte - self._origines[roue]
+        if self._consignes[roue] < 0:
+            fait = -fait
+        self._faits[roue] = fait
+
+    def _regler(self, roue, moteur):
+        if self._restants[roue] < 0:
+            return True
+        fait = self._faits[roue]
+        restant = self._cibles[roue] - fait
+        if restant <= 0:
+            self._restants[roue] = -1
+            moteur.appliquer(0)
+            return True
+        self._restants[roue] = restant
+        # ralentissement : au plus un quart de la distance restante par tick,
+        # sans descendre sous 10 % de la vitesse maximale
+        limite = max(self._consigne_max // 10, (restant << _VIRGULE) >> 2)
+        consigne = self._consignes[roue]
+        sens = 1 if consigne > 0 else -1
+        consigne *= sens
+        if consigne > limite:
+            consigne = limite
+        # synchronisation : la roue en avance sur l'autre ralentit, le robot
+        # garde son cap même si un moteur sature
+        autre = 1 - roue
+        if self._restants[autre] >= 0:
+            ecart = fait - self._faits[autre]
+            if ecart > 0:
+                consigne -= ecart << (_VIRGULE - 1)
+                if consigne < 0:
+                    consigne = 0
+        consigne *= sens
+        avance = (consigne * self._gain_avance) >> _VIRGULE
+        erreur = consigne - (self._mesures[roue] << _VIRGULE)
+        integrale = self._integrales[roue] + erreur
+        if integrale > self._integrale_max:
+            integrale = self._integrale_max
+        elif integrale < -self._integrale_max:
+            integrale = -self._integrale_max
+        duty = avance + ((self._kp * erreur + self._ki * integrale) >> _VIRGULE)
+        # anti-emballement : l'intégrale n'augmente pas quand le moteur sature
+        if duty > _DUTY_MAX:
+            duty = _DUTY_MAX
+            if erreur > 0:
+                integrale = self._integrales[roue]
+        elif duty < -_DUTY_MAX:
+            duty = -_DUTY_MAX
+            if erreur < 0:
+                integrale = self._integrales[roue]
+        self._integrales[roue] = integrale
+        moteur.appliquer(duty)
+        return False
+
+    def _tick(self, timer):
+        # les deux roues sont mesurées avant d'être réglées
+        self._mesurer(0, self.encodeur_gauche.compte[0])
+        self._mesurer(1, self.encodeur_droit.compte[0])
+        if self._actif:
+            fini_g = self._regler(0, self.moteur_gauche)
+            fini_d = self._regler(1, self.moteur_droit)
+            if fini_g and fini_d:
+                self._actif = False
+        # la position utilise des flottants : intégrée hors interruption
+        try:
+            micropython.schedule(self._position_ref, 0)
+        except RuntimeError:
+            self.positions_perdues += 1
+
+    def _integrer_position(self, _):
+        g = self.encodeur_gauche.compte[0]
+        d = self.encodeur_droit.compte[0]
+        dg = (g - self._position_g) / self.impulsions_par_mm
+        dd = (d - self._position_d) / self.impulsions_par_mm
+        self._position_g = g
+        self._position_d = d
+        dcap = (dd - dg) / self.entraxe_mm
+        milieu = self.cap + dcap / 2
+        avance = (dg + dd) / 2
+        self.x += avance * math.cos(milieu)
+        self.y += avance * math.sin(milieu)
+        self.cap = (self.cap + dcap) % (2 * math.pi)
+
+    def position(self):
+        """(x en mm, y en mm, cap en degrés) depuis la dernière remise à zéro"""
+        self._integrer_position(0)
+        return self.x, self.y, math.degrees(self.cap)
+
+    def reinitialiser_position(self, x=0.0, y=0.0, cap=0.0):
+        self._integrer_position(0)
+        self.x = x
+        self.y = y
+        self.cap = math.radians(cap)
+
+    def vitesses(self):
+        """Vitesses mesurées des roues gauche et droite en mm/s"""
+        facteur = self.frequence / self.impulsions_par_mm
+        return self._mesures[0] * facteur, self._mesures[1] * facteur
+
+    def desactiver(self):
+        """Arrête le timer et les interruptions des encodeurs"""
+        self.arreter()
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        self.encodeur_gauche.desactiver()
+        self.encodeur_droit.desactiver()
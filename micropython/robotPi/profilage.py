@@ -0,0 +1,161 @@
+"""
+Outils de diagnostic : allocations mémoire et latences
+"""
+
+import sys
+import time
+from micropython import const
+from array import array
+
+
+def mesurer_allocations(fonction, n=100):
+    """Octets alloués sur le tas par n appels à fonction() (MicroPython).
+
+    Exemple : mesurer_allocations(robot.capteur_distance.read) doit valoir 0.
+    """
+    import gc
+    fonction()  # premier appel hors mesure
+    gc.collect()
+    gc.disable()
+    try:
+        avant = gc.mem_alloc()
+        for _ in range(n):
+            fonction()
+        return gc.mem_alloc() - avant
+    finally:
+        gc.enable()
+
+
+# === Profilage des latences ===
+
+_NB_CASES = const(24)  # cases de 1 µs à 2^23 µs (~8 s)
+
+
+class Histogramme:
+    """Histogramme de latences en µs, cases en puissances de 2"""
+
+    def __init__(self):
+        self.cases = array('I', [0] * _NB_CASES)
+        self.nombre = 0
+        self.total = 0
+        self.max = 0
+
+    def ajouter(self, us):
+        i = 0
+        while us >> i and i < _NB_CASES - 1:
+            i += 1
+        self.cases[i] += 1
+        self.nombre += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    def quantile(self, q):
+        """Borne supérieure (µs) de la case contenant le quantile q"""
+        seuil = q * self.nombre
+        cumul = 0
+        for i in range(_NB_CASES):
+            cumul += self.cases[i]
+            if cumul >= seuil:
+                return 1 << i
+        return 1 << (_NB_CASES - 1)
+
+    def resume(self, nom):
+        if not self.nombre:
+            return "%s n=0" % nom
+        cases = ",".join("%d:%d" % (i, n) for i, n in enumerate(self.cases) if n)
+        return "%s n=%d moy=%d max=%d p50<%d p90<%d cases=%s" % (
+            nom, self.nombre, self.total // self.nombre, self.max,
+            self.quantile(0.5), self.quantile(0.9), cases)
+
+
+class _TempsProfile:
+    # remplace le module time dans les modules de robotPi pour mesurer les attentes
+    def __init__(self, module, profileur):
+        self._module = module
+        self._attentes = profileur.histogramme('sleep')
+
+    def _attendre(self, attente, valeur):
+        debut = self._module.ticks_us()
+        attente(valeur)
+        self._attentes.ajouter(self._module.ticks_diff(self._module.ticks_us(), debut))
+
+    def sleep(self, secondes):
+        self._attendre(self._module.sleep, secondes)
+
+    def sleep_ms(self, ms):
+        self._attendre(self._module.sleep_ms, ms)
+
+    def sleep_us(self, us):
+        self._attendre(self._module.sleep_us, us)
+
+    def __getattr__(self, nom):
+        return getattr(self._module, nom)
+
+
+class Profileur:
+    """Mesure des latences par méthode, en µs (ticks_us).
+
+    Les méthodes mesurées sont remplacées sur l'instance par une enveloppe
+    chronométrée ; retirer() rend les méthodes d'origine, le coût est donc
+    nul tant que le profilage n'est pas activé.
+    """
+
+    def __init__(self):
+        self.histogrammes = {}
+        self._enveloppes = []
+        self._modules_time = []
+
+    def histogramme(self, etiquette):
+        if etiquette not in self.histogrammes:
+            self.histogrammes[etiquette] = Histogramme()
+        return self.histogrammes[etiquette]
+
+    def envelopper(self, objet, nom, etiquette=None):
+        """Chronomètre objet.nom() sous l'étiquette donnée"""
+        methode = getattr(objet, nom)
+        histogramme = self.histogramme(etiquette or nom)
+        ticks_us = time.ticks_us
+        ticks_diff = time.ticks_diff
+
+        def enveloppe(*args, **kwargs):
+            debut = ticks_us()
+            try:
+                return methode(*args, **kwargs)
+            finally:
+                histogramme.ajouter(ticks_diff(ticks_us(), debut))
+
+        setattr(objet, nom, enveloppe)
+        self._enveloppes.append((objet, nom))
+
+    def profiler_attentes(self):
+        """Mesure aussi les time.sleep* de robotPi sous l'étiquette 'sleep'"""
+        if self._modules_time:
+            return
+        temps = _TempsProfile(time, self)
+        for nom in list(sys.modules):
+            module = sys.modules[nom]
+            if (nom.startswith('robotPi.') and nom != __name__
+                    and getattr(module, 'time', None) is time):
+                module.time = temps
+                self._modules_time.append(module)
+
+    def retirer(self):
+        """Rend les méthodes d'origine"""
+        for objet, nom in self._enveloppes:
+            delattr(objet, nom)
+        self._enveloppes = []
+        for module in self._modules_time:
+            module.time = time
+        self._modules_time = []
+
+    def reinitialiser(self):
+        """Vide les histogrammes"""
+        for etiquette in self.histogrammes:
+            self.histogrammes[etiquette] = Histogramme()
+
+    def rapport(self):
+        """Affiche un résumé compact sur la console série"""
+        print("--- profilage (µs) ---")
+        for etiquette in sorted(self.histogrammes):
+            print(self.histogrammes[etiquette].resume(etiquette))
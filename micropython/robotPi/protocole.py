@@ -0,0 +1,123 @@
+"""
+Protocole de commandes en trames binaires sur la liaison série USB
+
+Utilisé par le serveur de commandes sur le Pico et par le client Python
+du PC : ce module n'importe rien de spécifique à la carte.
+
+Trame : SYNC | longueur | charge utile | CRC-8 (longueur et charge utile)
+Requête : numéro | commande | arguments
+Réponse : numéro | statut | données
+"""
+
+try:
+    from micropython import const
+except ImportError:  # client sur PC
+    def const(valeur):
+        return valeur
+
+
+# 0xfe n'apparaît jamais dans du texte UTF-8 : les print() du programme
+# mêlés aux réponses ne peuvent pas être pris pour un début de trame
+SYNC = const(0xfe)
+TAILLE_MAX = const(255)  # octets de charge utile
+
+# Commandes
+PING = const(0x00)
+FIN = const(0x01)
+STOPPER = const(0x02)
+PILOTER = const(0x03)         # 'bb' vitesses gauche, droite en % signés
+MOUVEMENT = const(0x04)       # 'bbHH' gauche, droite, durée ms, rampe %/s (0 : défaut)
+AVANCER_CM = const(0x05)      # 'hB' distance mm, vitesse % (0 : défaut)
+TOURNER_DEGRES = const(0x06)  # 'hB' angle en degrés, vitesse % (0 : défaut)
+VITESSE_DEFAUT = const(0x07)  # 'B'
+LED = const(0x10)             # 'BBBB' index, r, g, b
+LEDS = const(0x11)            # 'BBB' r, g, b
+IMAGE_LEDS = const(0x12)      # r, g, b de chaque LED
+DISTANCE = const(0x20)        # -> 'HB' distance mm (0xffff : aucune), statut
+DISTANCES = const(0x21)       # -> 'H' par capteur
+BOUTON = const(0x22)          # -> 'BB' appuyé, plus ancien événement (0 : aucun)
+POSITION = const(0x23)        # -> 'iih' x mm, y mm, cap en 1/10 de degré
+LOT = const(0x7f)             # sous-commandes : commande | longueur | arguments
+
+# Statuts des réponses
+OK = const(0)
+INCONNUE = const(1)
+ARGUMENTS = const(2)
+ERREUR = const(3)
+
+AUCUNE_DISTANCE = const(0xffff)
+
+_table_crc = None
+
+
+def _table():
+    global _table_crc
+    if _table_crc is None:
+        table = bytearray(256)
+        for i in range(256):
+            crc = i
+            for _ in range(8):
+                crc = ((crc << 1) ^ 0x07) & 0xff if crc & 0x80 else (crc << 1) & 0xff
+            table[i] = crc
+        _table_crc = table
+    return _table_crc
+
+
+def crc8(donnees, crc=0):
+    """CRC-8 (polynôme 0x07)"""
+    table = _table()
+    for octet in donnees:
+        crc = table[crc ^ octet]
+    return crc
+
+
+def trame(charge):
+    """Trame complète pour une charge utile (bytes ou bytearray)"""
+    n = len(charge)
+    if n > TAILLE_MAX:
+        raise ValueError("charge utile trop longue")
+    return bytes((SYNC, n)) + bytes(charge) + bytes((crc8(charge, crc8((n,))),))
+
+
+class LecteurTrames:
+    """Décodeur de trames octet par octet dans un tampon préalloué.
+
+    Les octets hors trame (texte affiché par print()) sont ignorés ; une
+    trame dont le CRC est faux est abandonnée.
+    """
+
+    def __init__(self):
+        self.tampon = bytearray(TAILLE_MAX)
+        self.longueur = 0
+        self._etat = 0  # 0 : attente SYNC, 1 : longueur, 2 : données, 3 : CRC
+        self._n = 0
+        self._crc = 0
+        self.erreurs = 0  # trames rejetées (CRC)
+
+    def charge(self):
+        """Charge utile de la dernière trame complète"""
+        return memoryview(self.tampon)[:self.longueur]
+
+    def pousser(self, octet):
+        """Traite un octet ; True quand une trame complète est disponible"""
+        etat = self._etat
+        if etat == 0:
+            if octet == SYNC:
+                self._etat = 1
+        elif etat == 1:
+            self.longueur = octet
+            self._n = 0
+            self._crc = _table()[octet]
+            self._etat = 2 if octet else 3
+        elif etat == 2:
+            self.tampon[self._n] = octet
+            self._crc = _table()[self._crc ^ octet]
+            self._n += 1
+            if self._n == self.longueur:
+                self._etat = 3
+        else:
+            self._etat = 0
+            if octet == self._crc:
+                return True
+            self.erreurs += 1
+        return False
@@ -0,0 +1,962 @@
+"""
+Classe RobotPi : les pilotes des LEDs et du capteur ne sont importés que
+si le constructeur en a besoin
+"""
+
+from machine import Pin
+import math
+import micropython
+import time
+from .moteurs import MoteurTB6612, FileMouvements, _duty_signe
+
+
+def _asyncio():
+    # import différé : uasyncio n'occupe la RAM que si le programme l'utilise
+    try:
+        import asyncio
+    except ImportError:
+        import uasyncio as asyncio
+    return asyncio
+
+
+class RobotPi:
+    def __init__(self, pwm_g, in1_g, in2_g, pwm_d, in1_d, in2_d, stby_pin, led_pin=None, nb_leds=0, pin_bouton=None, i2c=None, pin_capteur_irq=None, profil_capteur=None, periode_capteur_ms=0, fichier_calibration='vl53l0x_cal.bin', recalibrer_capteur=False, broches_xshut=None, arret_urgence_bouton=False, acquisition_coeur1=False, broches_i2c=None, cache_capteurs_ms=0):
+        self.moteur_gauche = MoteurTB6612(pwm_g, in1_g, in2_g)
+        self.moteur_droit = MoteurTB6612(pwm_d, in1_d, in2_d)
+        
+        self.stby = Pin(stby_pin, Pin.OUT)
+        self.stby.on()
+            
+        self.vitesse_defaut = 95 # Vitesse par défaut en pourcentage 0 à 100%
+        
+        self.profileur = None
+        self.file_mouvements = None
+        self.odometrie = None
+        self.filtre_distance = None
+        self.enregistreur = None
+        self.derniere_distance = None  # dernier résultat de lire_distance()
+        self.acquisition = None
+        self._numero_filtre = 0
+        self._mesure = None  # Mesure de lire_mesure() avec l'acquisition
+        # lire_distance() rend la mesure précédente si elle a moins de
+        # cache_capteurs_ms (0 : chaque appel relève le capteur)
+        self.cache_capteurs_ms = cache_capteurs_ms
+        self._instant_cache = None
+
+        # Initialisation des LEDs WS2812B
+        self.animation_leds = None
+        if led_pin is not None:
+            from neopixel import NeoPixel
+            from .leds import TamponLeds
+            self.leds = NeoPixel(Pin(led_pin), nb_leds)
+            self.nb_leds = nb_leds
+            self.tampon_leds = TamponLeds(self.leds)
+            self.eteindre_leds()
+        else:
+            self.leds = None
+            self.tampon_leds = None
+            self.nb_leds = 0
+        
+        # Bouton lu par interruption (événements dans une file, sans attente)
+        self.urgence = False
+        if pin_bouton is not None:
+            from .bouton import Bouton
+            self.bouton = Bouton(Pin(pin_bouton, Pin.IN, Pin.PULL_UP))
+            if arret_urgence_bouton:
+                self.activer_arret_urgence()
+        else:
+            self.bouton = None
+
+        # Initialisation du capteur de distance VL53L0X
+        # (plusieurs capteurs si broches_xshut est donné, le premier servant
+        # de capteur_distance)
+        self.capteurs = None
+        if i2c is not None:
+            try:
+                if broches_xshut is not None:
+                    from .vl53l0x import init_sensors, GroupeCapteurs
+                    broches_irq = (pin_capteur_irq
+                                   if isinstance(pin_capteur_irq, (list, tuple)) else None)
+                    capteurs = init_sensors(i2c, broches_xshut, irq_pins=broches_irq,
+                                            calibration_file=fichier_calibration,
+                                            recalibrate=recalibrer_capteur,
+                                            bus_pins=broches_i2c)
+                    self.capteurs = GroupeCapteurs(capteurs)
+                else:
+                    from .vl53l0x import VL53L0X
+                    # la calibration est relue depuis la flash aux démarrages
+                    # suivants ; broches_i2c (scl, sda) permet de débloquer le bus
+                    capteurs = [VL53L0X(i2c, irq_pin=pin_capteur_irq,
+                                        calibration_file=fichier_calibration,
+                                        recalibrate=recalibrer_capteur,
+                                        bus_pins=broches_i2c)]
+                self.capteur_distance = capteurs[0]
+                for capteur in capteurs:
+                    if profil_capteur is not None:
+                        capteur.set_profile(profil_capteur)
+                    # Démarrage du capteur (dos à dos si periode_capteur_ms vaut 0)
+                    capteur.start(periode_capteur_ms)
+                if self.capteurs is not None:
+                    print(f"✓ {len(capteurs)} capteurs VL53L0X initialisés et démarrés")
+                else:
+                    print("✓ Capteur VL53L0X initialisé et démarré")
+            except Exception as e:
+                print(f"⚠ Erreur init capteur: {e}")
+                self.capteur_distance = None
+                self.capteurs = None
+        else:
+            self.capteur_distance = None
+        if acquisition_coeur1 and self.capteur_distance is not None:
+            self.demarrer_acquisition()
+    
+    
+    # === Profilage ===
+
+    def activer_profilage(self):
+        """Mesure les latences des capteurs, LEDs, moteurs et attentes.
+
+        Sans effet sur les performances tant qu'il n'est pas activé.
+        """
+        if self.profileur is not None:
+            return self.profileur
+        from .profilage import Profileur
+        profileur = Profileur()
+        if self.capteur_distance is not None:
+            self.capteur_distance.activer_profilage(profileur)
+        if self.leds is not None:
+            profileur.envelopper(self.leds, 'write', 'leds.write')
+        for moteur in (self.moteur_gauche, self.moteur_droit):
+            for nom in ('avancer', 'reculer', 'stopper'):
+                profileur.envelopper(moteur, nom, 'moteurs')
+        for nom in ('lire_distance', 'obstacle_detecte', 'eviter_obstacle'):
+            profileur.envelopper(self, nom)
+        profileur.profiler_attentes()
+        self.profileur = profileur
+        return profileur
+
+    def desactiver_profilage(self):
+        """Rend les méthodes d'origine et retourne le profileur (ses mesures
+        restent consultables) ; activer_profilage() repart de zéro"""
+        profileur = self.profileur
+        if profileur is not None:
+            profileur.retirer()
+            self.profileur = None
+        return profileur
+
+    def rapport_profilage(self):
+        """Affiche le résumé des latences dans le moniteur série"""
+        if self.profileur is None:
+            print("Profilage non activé : appelez robot.activer_profilage()")
+            return
+        self.profileur.rapport()
+
+    # === Méthodes pour les moteurs ===
+    
+    def avancer(self, vitesse=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.avancer(v)
+        self.moteur_droit.avancer(v)
+
+    def reculer(self, vitesse=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.reculer(v)
+        self.moteur_droit.reculer(v)
+    
+    def tourner_gauche(self, vitesse=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.reculer(v)
+        self.moteur_droit.avancer(v)
+    
+    def tourner_droite(self, vitesse=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.avancer(v)
+        self.moteur_droit.reculer(v)
+            
+    def avancer_pendant(self, vitesse=None, duree=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.avancer(v)
+        self.moteur_droit.avancer(v)
+        if duree is not None:
+            time.sleep(duree)
+            self.stopper()
+    
+    def reculer_pendant(self, vitesse=None, duree=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.reculer(v)
+        self.moteur_droit.reculer(v)
+        if duree is not None:
+            time.sleep(duree)
+            self.stopper()
+    
+    def tourner_gauche_pendant(self, vitesse=None, duree=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.reculer(v)
+        self.moteur_droit.avancer(v)
+        if duree is not None:
+            time.sleep(duree)
+            self.stopper()
+    
+    def tourner_droite_pendant(self, vitesse=None, duree=None):
+        self._reprendre_moteurs()
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.moteur_gauche.avancer(v)
+        self.moteur_droit.reculer(v)
+        if duree is not None:
+            time.sleep(duree)
+            self.stopper()
+    
+    def piloter(self, gauche, droite):
+        """Vitesses gauche et droite en % (négatives pour reculer), sans rampe"""
+        self._reprendre_moteurs()
+        self.moteur_gauche.appliquer(_duty_signe(gauche))
+        self.moteur_droit.appliquer(_duty_signe(droite))
+
+    def stopper(self):
+        self._reprendre_moteurs()
+        self.moteur_gauche.stopper()
+        self.moteur_droit.stopper()
+
+    # === File de mouvements (accélérations progressives) ===
+
+    def _reprendre_moteurs(self):
+        # une commande directe reprend la main sur la file de mouvements
+        # et sur la régulation de vitesse
+        if self.file_mouvements is not None:
+            self.file_mouvements.arreter()
+        if self.odometrie is not None:
+            self.odometrie.arreter()
+
+    def _mouvements(self):
+        if self.file_mouvements is None:
+            self.file_mouvements = FileMouvements(self.moteur_gauche, self.moteur_droit)
+        return self.file_mouvements
+
+    def mouvement(self, gauche, droite, duree=0, rampe=None):
+        """Ajoute un segment à la file (vitesses en %, négatives pour reculer).
+
+        Rend la main immédiatement ; duree=0 maintient le segment jusqu'au
+        suivant, rampe est en % par seconde. Ignoré après un arrêt d'urgence.
+        """
+        if self.urgence:
+            return
+        if self.odometrie is not None:
+            self.odometrie.arreter()
+        self._mouvements().ajouter(gauche, droite, duree, rampe)
+
+    def changer_mouvement(self, gauche, droite, rampe=None):
+        """Abandonne la file et rejoint tout de suite les vitesses données
+        (en %) avec une rampe, sans attendre. Ignoré après un arrêt d'urgence."""
+        if self.urgence:
+            return
+        if self.odometrie is not None:
+            self.odometrie.arreter()
+        self._mouvements().remplacer(gauche, droite, rampe)
+
+    def attendre_mouvements(self):
+        """Attend la fin des segments temporisés et des rampes de la file,
+        ou du déplacement avancer_cm / tourner_degres en cours"""
+        if self.file_mouvements is not None:
+            self.file_mouvements.attendre()
+        if self.odometrie is not None:
+            self.odometrie.attendre()
+
+    def arreter_mouvements(self):
+        """Abandonne la file et ralentit jusqu'à l'arrêt"""
+        if self.file_mouvements is not None:
+            self.file_mouvements.vider()
+
+    # === Odométrie (encodeurs de roues) ===
+
+    def configurer_odometrie(self, encodeurs, impulsions_par_tour, diametre_roue_mm=65,
+                             entraxe_mm=120, vitesse_max_mm_s=300, inverser=(False, False),
+                             frequence=50, kp=0.6, ki=0.15):
+        """Active les encodeurs ((a_g, b_g), (a_d, b_d)) et la régulation de vitesse.
+
+        impulsions_par_tour : périodes de la voie A par tour de roue ;
+        inverser : encodeurs à compter en sens inverse (moteur monté en miroir).
+        """
+        from .odometrie import Encodeur, Odometrie
+        if self.odometrie is not None:
+            self.odometrie.desactiver()
+        (a_g, b_g), (a_d, b_d) = encodeurs
+        self.odometrie = Odometrie(
+            self.moteur_gauche, self.moteur_droit,
+            Encodeur(a_g, b_g, inverser[0]), Encodeur(a_d, b_d, inverser[1]),
+            impulsions_par_tour, diametre_roue_mm, entraxe_mm, vitesse_max_mm_s,
+            frequence, kp, ki)
+        return self.odometrie
+
+    def _verifier_odometrie(self):
+        if self.odometrie is None:
+            raise RuntimeError("Odométrie non configurée. Appelez configurer_odometrie().")
+
+    def avancer_cm(self, distance_cm, vitesse=None, bloquant=True):
+        """Avance de distance_cm (recule si négatif) à vitesse régulée.
+
+        S'arrête dès que les encodeurs ont compté la distance.
+        """
+        self._verifier_odometrie()
+        self._reprendre_moteurs()
+        if self.urgence:
+            return
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        self.odometrie.deplacer(distance_cm * 10, distance_cm * 10, v)
+        if bloquant:
+            self.odometrie.attendre()
+
+    def tourner_degres(self, angle, vitesse=None, bloquant=True):
+        """Tourne sur place de angle degrés (positif à gauche, négatif à droite)"""
+        self._verifier_odometrie()
+        self._reprendre_moteurs()
+        if self.urgence:
+            return
+        v = vitesse if vitesse is not None else self.vitesse_defaut
+        arc = math.radians(angle) * self.odometrie.entraxe_mm / 2
+        self.odometrie.deplacer(-arc, arc, v)
+        if bloquant:
+            self.odometrie.attendre()
+
+    def position(self):
+        """(x en mm, y en mm, cap en degrés) mesurés par les encodeurs"""
+        self._verifier_odometrie()
+        return self.odometrie.position()
+
+    def reinitialiser_position(self, x=0.0, y=0.0, cap=0.0):
+        self._verifier_odometrie()
+        self.odometrie.reinitialiser_position(x, y, cap)
+
+    def vitesses_roues(self):
+        """Vitesses mesurées des roues gauche et droite en mm/s"""
+        self._verifier_odometrie()
+        return self.odometrie.vitesses()
+
+    # === Méthodes pour les LEDs WS2812B ===
+    
+    def _verifier_leds(self):
+        """Vérifie que les LEDs sont initialisées et reprend la main sur une animation"""
+        if self.leds is None:
+            raise RuntimeError("LEDs non initialisées. Spécifiez led_pin lors de la création du robot.")
+        if self.animation_leds is not None:
+            self.animation_leds.arreter()
+
+    def _animation(self):
+        self._verifier_leds()
+        if self.animation_leds is None:
+            from .leds import AnimationLeds
+            self.animation_leds = AnimationLeds(self.tampon_leds)
+        return self.animation_leds
+
+    def animer_clignotement(self, r, g, b, intervalle=0.5, nb_fois=None):
+        """Clignotement en arrière-plan (indéfini si nb_fois vaut None)"""
+        self._animation().clignoter(r, g, b, intervalle, nb_fois)
+
+    def animer_arc_en_ciel(self, intervalle=0.1):
+        """Arc-en-ciel défilant en arrière-plan"""
+        self._animation().arc_en_ciel(intervalle)
+
+    def animer_fondu(self, r, g, b, duree=1.0):
+        """Fondu vers une couleur en arrière-plan"""
+        self._animation().fondu(r, g, b, duree)
+
+    def animer_respiration(self, r, g, b, periode=2.0):
+        """Effet de respiration en arrière-plan"""
+        self._animation().respiration(r, g, b, periode)
+
+    def arreter_animation(self):
+        """Arrête l'animation en cours en laissant la dernière image"""
+        if self.animation_leds is not None:
+            self.animation_leds.arreter()
+    
+    def allumer_led(self, index, r, g, b):
+        """Allume une LED spécifique avec une couleur RGB"""
+        self._verifier_leds()
+        if 0 <= index < self.nb_leds:
+            self.tampon_leds.definir(index, r, g, b)
+            self.tampon_leds.ecrire()
+    
+    def allumer_leds(self, r, g, b):
+        """Allume toutes les LEDs avec la même couleur RGB"""
+        self._verifier_leds()
+        self.tampon_leds.remplir(r, g, b)
+        self.tampon_leds.ecrire()
+    
+    def eteindre_led(self, index):
+        """Éteint une LED spécifique"""
+        self.allumer_led(index, 0, 0, 0)
+    
+    def eteindre_leds(self):
+        """Éteint toutes les LEDs"""
+        self._verifier_leds()
+        self.tampon_leds.remplir(0, 0, 0)
+        self.tampon_leds.ecrire()
+    
+    def couleur_arc_en_ciel(self, index):
+        """Affiche une couleur d'arc-en-ciel différente pour chaque LED"""
+        self._verifier_leds()
+        self.tampon_leds.arc_en_ciel(index)
+        self.tampon_leds.ecrire()
+    
+    def clignoter_leds(self, r, g, b, nb_fois=3, intervalle=0.5):
+        """Fait clignoter toutes les LEDs"""
+        self._verifier_leds()
+        for _ in range(nb_fois):
+            self.allumer_leds(r, g, b)
+            time.sleep(intervalle)
+            self.eteindre_leds()
+            time.sleep(intervalle)
+    
+    def allumer_leds_luminosite(self, r, g, b, luminosite):
+        """Ajuste la luminosité globale (0.0 à 1.0)"""
+        self._verifier_leds()
+        self.tampon_leds.remplir(r, g, b, luminosite)
+        self.tampon_leds.ecrire()
+
+    def allumer_led_luminosite(self, index, r, g, b, luminosite):
+        """Ajuste la luminosité globale (0.0 à 1.0)"""
+        self._verifier_leds()
+        if 0 <= index < self.nb_leds:
+            self.tampon_leds.definir(index, r, g, b, luminosite)
+            self.tampon_leds.ecrire()
+        
+    
+    # === Méthodes pour le capteur de distance VL53L0X ===
+    
+    def _verifier_capteur(self):
+        """Vérifie que le capteur est initialisé"""
+        if self.capteur_distance is None:
+            raise RuntimeError("Capteur VL53L0X non initialisé. Spécifiez i2c lors de la création du robot.")
+    
+    def definir_profil_capteur(self, profil, periode_ms=None):
+        """Change le profil de mesure ('rapide', 'defaut', 'precis',
+        'longue_portee') et éventuellement la période de mesure en ms"""
+        self._verifier_capteur()
+        acquisition = self.acquisition
+        if acquisition is not None:
+            # le bus revient au cœur 0 le temps de la configuration
+            self.arreter_acquisition()
+        for capteur in self._liste_capteurs():
+            capteur.set_profile(profil)
+            if periode_ms is not None and periode_ms != capteur.period:
+                capteur.stop()
+                capteur.start(periode_ms)
+        if acquisition is not None:
+            self.demarrer_acquisition(acquisition.age_max_ms)
+
+    def _liste_capteurs(self):
+        if self.capteurs is not None:
+            return self.capteurs.capteurs
+        return [self.capteur_distance]
+
+    def demarrer_acquisition(self, age_max_ms=500):
+        """Relève les capteurs en boucle sur le second cœur (_thread).
+
+        lire_distance() et lire_distances() rendent alors immédiatement la
+        dernière mesure publiée (None si elle a plus de age_max_ms). Le bus
+        I2C des capteurs appartient au cœur 1 jusqu'à arreter_acquisition().
+        """
+        self._verifier_capteur()
+        if self.acquisition is not None:
+            return
+        from .acquisition import AcquisitionCoeur1
+        self.acquisition = AcquisitionCoeur1(self._liste_capteurs(), age_max_ms)
+        self.acquisition.demarrer()
+
+    def arreter_acquisition(self):
+        """Arrête la boucle du cœur 1 ; à appeler en fin de programme (le
+        cœur 1 peut survivre à l'arrêt du programme principal)"""
+        if self.acquisition is not None:
+            self.acquisition.arreter()
+            self.acquisition = None
+
+    def lire_distances(self):
+        """Distances en mm de tous les capteurs (broches_xshut), dans l'ordre
+        des broches. Les conversions se recouvrent : un relevé complet prend
+        à peu près le temps d'une seule mesure."""
+        if self.capteurs is None:
+            return [self.lire_distance()]
+        if self.acquisition is not None:
+            return self.acquisition.distances()
+        try:
+            return self.capteurs.lire()
+        except (OSError, RuntimeError):
+            return [None] * len(self.capteurs.capteurs)
+
+    def diagnostic_capteur(self):
+        """Compteurs des capteurs de distance depuis le démarrage : erreurs
+        I2C, échéances dépassées, lectures reprises et remises en état"""
+        self._verifier_capteur()
+        compteurs = {'erreurs': 0, 'timeouts': 0, 'reprises': 0, 'remises_en_etat': 0}
+        for capteur in self._liste_capteurs():
+            compteurs['erreurs'] += capteur.errors
+            compteurs['timeouts'] += capteur.timeouts
+            compteurs['reprises'] += capteur.retries
+            compteurs['remises_en_etat'] += capteur.recoveries
+        return compteurs
+
+    def configurer_filtre(self, taille=5, mode='mediane', alpha=0.3,
+                          hysteresis_cm=3, rejeter_statut=True):
+        """Filtre les mesures de distance (mode 'mediane' ou 'moyenne').
+
+        obstacle_detecte() reste alors vrai jusqu'à seuil_cm + hysteresis_cm.
+        """
+        self._verifier_capteur()
+        from .vl53l0x import FiltreDistance
+        self.filtre_distance = FiltreDistance(taille, mode, alpha, rejeter_statut)
+        self.hysteresis_cm = hysteresis_cm
+
+    def desactiver_filtre(self):
+        """Revient aux mesures brutes"""
+        self.filtre_distance = None
+
+    def actualiser(self):
+        """Relève le capteur de distance une fois pour le tour de boucle
+        (à appeler au début de chaque tour) : avec cache_capteurs_ms, les
+        appels suivants de lire_distance(), lire_distance_cm(),
+        obstacle_detecte() et eviter_obstacle() réutilisent cette mesure sans
+        accès au bus. Retourne la distance ; sans capteur, ne fait rien."""
+        if self.capteur_distance is None:
+            return None
+        self._instant_cache = None
+        return self.lire_distance()
+
+    def lire_distance(self, timeout_ms=None):
+        """Lit la distance en millimètres (filtrée si configurer_filtre() a été appelé).
+
+        Retourne None si le capteur ne répond pas dans timeout_ms (par défaut
+        deux durées de mesure), après une remise en état automatique ; voir
+        diagnostic_capteur(). Une mesure de moins de cache_capteurs_ms est
+        rendue sans relever le capteur (voir actualiser()).
+        """
+        self._verifier_capteur()
+        instant = self._instant_cache
+        if instant is not None:
+            if time.ticks_diff(time.ticks_ms(), instant) < self.cache_capteurs_ms:
+                return self.derniere_distance
+            self._instant_cache = None
+        distance = self._mesurer_distance(timeout_ms)
+        if self.cache_capteurs_ms:
+            self._instant_cache = time.ticks_ms()
+        return distance
+
+    def _mesurer_distance(self, timeout_ms):
+        acquisition = self.acquisition
+        if acquisition is not None:
+            distance = acquisition.distance()
+            if self.filtre_distance is not None:
+                # chaque mesure du cœur 1 n'entre qu'une fois dans le filtre
+                if distance is not None and acquisition.numero != self._numero_filtre:
+                    self._numero_filtre = acquisition.numero
+                    self.filtre_distance.ajouter(distance, acquisition.statut)
+                distance = self.filtre_distance.valeur if distance is not None else None
+            self.derniere_distance = distance
+            return distance
+        try:
+            distance = self.capteur_distance.read(timeout_ms)
+        except (OSError, RuntimeError):
+            # erreur I2C ou TimeoutError du pilote (dérivée de RuntimeError),
+            # déjà comptée par le capteur
+            distance = None
+        return self._retenir_distance(distance)
+
+    def _retenir_distance(self, distance):
+        # mesure du capteur principal : filtre et derniere_distance
+        if distance is not None and self.filtre_distance is not None:
+            distance = self.filtre_distance.ajouter(distance, self.capteur_distance.range_status)
+        self.derniere_distance = distance
+        return distance
+    
+    def lire_mesure(self, timeout_ms=None):
+        """Lit une mesure brute (non filtrée) avec son statut : objet Mesure
+        (distance en mm, statut, valide, signal_mcps, ambiant_mcps), None si
+        le capteur ne répond pas. Une mesure non valide (cible trop lointaine
+        ou trop peu réfléchissante) peut être ignorée.
+
+        L'objet est réutilisé à chaque lecture ; avec les mesures sur le
+        cœur 1, seuls distance et statut sont renseignés.
+        """
+        self._verifier_capteur()
+        acquisition = self.acquisition
+        if acquisition is not None:
+            distance = acquisition.distance()
+            if distance is None:
+                return None
+            mesure = self._mesure
+            if mesure is None:
+                from .vl53l0x import Mesure
+                mesure = self._mesure = Mesure()
+            mesure.distance = distance
+            mesure.statut = acquisition.statut
+            return mesure
+        try:
+            self.capteur_distance.read(timeout_ms)
+        except (OSError, RuntimeError):
+            return None
+        return self.capteur_distance.result
+
+    def lire_distance_cm(self):
+        """Lit la distance en centimètres"""
+        distance = self.lire_distance()
+        return round(distance / 10, 1) if distance is not None else None
+    
+    def obstacle_detecte(self, seuil_cm=20):
+        """Retourne True si un obstacle est détecté à moins de seuil_cm"""
+        self._verifier_capteur()
+        if self.filtre_distance is not None:
+            self.lire_distance()
+            seuil_mm = seuil_cm * 10
+            return self.filtre_distance.sous_seuil(
+                seuil_mm, seuil_mm + self.hysteresis_cm * 10)
+        distance = self.lire_distance_cm()
+        if distance is None:
+            return False
+        return distance < seuil_cm
+    
+    def eviter_obstacle(self, seuil_cm=20, vitesse=None, bloquant=True):
+        """Évite un obstacle en reculant et tournant, avec des rampes
+        d'accélération pour éviter les pics de courant aux inversions"""
+        if self.obstacle_detecte(seuil_cm):
+            v = vitesse if vitesse is not None else self.vitesse_defaut
+            self.mouvement(-v, -v, 0.5)
+            self.mouvement(v, -v, 0.5)
+            self.mouvement(self.vitesse_defaut, self.vitesse_defaut)
+            if bloquant:
+                self.attendre_mouvements()
+            return True
+        return False
+
+    def comportements(self, *comportements, periode_ms=20):
+        """Boucle de comportements réactifs, le premier donné étant le plus
+        prioritaire (voir robotPi.comportements)"""
+        from .comportements import BoucleComportements
+        return BoucleComportements(self, comportements, periode_ms)
+
+    def explorer(self, seuil_cm=20, vitesse=None, duree=None, periode_ms=20):
+        """Avance en évitant les obstacles jusqu'à un appui sur le bouton
+        (ou pendant duree secondes), sans jamais bloquer la lecture du
+        capteur : la réaction est bornée par periode_ms"""
+        self._verifier_capteur()
+        from .comportements import (BoucleComportements, ArretBouton, Fuite,
+                                    Evitement, Croisiere)
+        comportements = [Fuite(min(8, seuil_cm // 2), vitesse),
+                         Evitement(seuil_cm, vitesse), Croisiere(vitesse)]
+        if self.bouton is not None:
+            comportements.insert(0, ArretBouton())
+        boucle = BoucleComportements(self, comportements, periode_ms)
+        boucle.executer(duree)
+        return boucle
+
+    # === Méthodes pour le bouton ===
+
+    def _verifier_bouton(self):
+        if self.bouton is None:
+            raise RuntimeError("Bouton non configuré. Spécifiez pin_bouton lors de la création du robot.")
+
+    def attendre_bouton_start(self):
+        """Attend que le bouton soit appuyé pour continuer"""
+        self._verifier_bouton()
+        print("En attente du bouton...")
+        self.bouton.vider()  # seul un nouvel appui compte
+        self.bouton.attendre()
+        print("Bouton appuyé, démarrage...")
+
+    def attendre_bouton_stop(self):
+        """Attend que le bouton soit appuyé puis arrête le robot"""
+        self._verifier_bouton()
+        print("En attente du bouton...")
+        self.bouton.vider()
+        self.bouton.attendre()
+        print("Bouton appuyé, arrêt...")
+        self.stopper()
+        if self.leds is not None:
+            self.eteindre_leds()
+
+    def bouton_appuye(self):
+        """Retourne True si le bouton est appuyé"""
+        self._verifier_bouton()
+        return self.bouton.appuye()
+
+    def evenement_bouton(self):
+        """Plus ancien événement du bouton (APPUI, RELACHE, APPUI_LONG) ou None"""
+        self._verifier_bouton()
+        return self.bouton.evenement()
+
+    def arreter_si_bouton(self):
+        """Arrête le robot si le bouton a été appuyé depuis le dernier appel.
+
+        Les appuis survenus pendant une action bloquante ne sont pas perdus.
+        """
+        self._verifier_bouton()
+        from .bouton import APPUI
+        appui = False
+        while True:
+            evenement = self.bouton.evenement()
+            if evenement is None:
+                break
+            if evenement == APPUI:
+                appui = True
+        if appui:
+            print("Bouton appuyé, arrêt...")
+            self.stopper()
+            if self.leds is not None:
+                self.eteindre_leds()
+        return appui
+
+    # === Arrêt d'urgence ===
+
+    def activer_arret_urgence(self):
+        """Le bouton arrête les moteurs dès l'appui, dans l'interruption.
+
+        Les commandes de mouvement sont ensuite ignorées jusqu'à rearmer().
+        """
+        self._verifier_bouton()
+        # méthode liée créée ici : l'interruption ne doit pas allouer
+        self._fin_urgence_ref = self._fin_arret_urgence
+        self.bouton.arret_urgence = self._arret_urgence
+
+    def desactiver_arret_urgence(self):
+        if self.bouton is not None:
+            self.bouton.arret_urgence = None
+
+    def _arret_urgence(self):
+        # interruption matérielle : pas d'allocation, pas d'impression. Les
+        # moteurs bloqués restent à l'arrêt même si le tick de la file de
+        # mouvements est en cours ; son timer est arrêté hors interruption
+        self.urgence = True
+        self.moteur_gauche.bloque = True
+        self.moteur_droit.bloque = True
+        self.moteur_gauche.stopper()
+        self.moteur_droit.stopper()
+        try:
+            micropython.schedule(self._fin_urgence_ref, 0)
+        except RuntimeError:
+            pass  # file pleine : rearmer() arrêtera la file de mouvements
+
+    def _fin_arret_urgence(self, _):
+        self._reprendre_moteurs()
+
+    def rearmer(self):
+        """Autorise de nouveau les mouvements après un arrêt d'urgence"""
+        # les mouvements en attente avant l'arrêt ne reprennent pas
+        self._reprendre_moteurs()
+        self.urgence = False
+        self.moteur_gauche.bloque = False
+        self.moteur_droit.bloque = False
+
+    # === Enregistreur de vol ===
+
+    def demarrer_enregistrement(self, fichier='vol.rec', **options):
+        """Enregistre l'état du robot à chaque appel de enregistrer() dans
+        fichier (options : taille_bloc, nb_blocs, taille_fichier,
+        nb_fichiers, ecriture_auto ; voir Enregistreur)"""
+        from .enregistreur import Enregistreur
+        self.arreter_enregistrement()
+        self.enregistreur = Enregistreur(fichier, **options)
+
+    def enregistrer(self, marque=0):
+        """Ajoute un enregistrement : dernière distance lue, moteurs, LED 0,
+        bouton. À appeler une fois par tour de la boucle du programme ;
+        ne lit pas le capteur."""
+        enregistreur = self.enregistreur
+        if enregistreur is None:
+            return
+        r = g = b = 0
+        if self.tampon_leds is not None:
+            r, g, b = self.tampon_leds.couleur(0)
+        bouton = 0
+        if self.bouton is not None and self.bouton.etat:
+            bouton = 1
+        if self.urgence:
+            bouton |= 2
+        capteur = self.capteur_distance
+        enregistreur.enregistrer(self.derniere_distance, self.moteur_gauche.duty,
+                                 self.moteur_droit.duty, r, g, b, bouton,
+                                 capteur.range_status if capteur is not None else 0,
+                                 marque)
+
+    def arreter_enregistrement(self):
+        """Écrit les derniers enregistrements et ferme le fichier"""
+        if self.enregistreur is not None:
+            self.enregistreur.fermer()
+            self.enregistreur = None
+
+    # === Commandes depuis le PC ===
+
+    def servir_commandes(self, entree=None, sortie=None):
+        """Exécute les commandes du client PC reçues sur la liaison série USB.
+
+        Bloque jusqu'à la commande FIN du client.
+        """
+        from .serveur import ServeurCommandes
+        print("Serveur de commandes prêt")
+        ServeurCommandes(self, entree, sortie).servir()
+
+    # === Méthodes asynchrones (uasyncio) ===
+    # Versions non bloquantes des méthodes avec attente, à utiliser avec
+    # await dans des tâches uasyncio. Les méthodes bloquantes restent
+    # celles utilisées par les blocs Blockly.
+
+    async def _attendre_puis_stopper(self, duree):
+        if duree is not None:
+            await _asyncio().sleep(duree)
+            self.stopper()
+
+    async def avancer_pendant_async(self, vitesse=None, duree=None):
+        """Avance pendant duree secondes sans bloquer les autres tâches"""
+        self.avancer(vitesse)
+        await self._attendre_puis_stopper(duree)
+
+    async def reculer_pendant_async(self, vitesse=None, duree=None):
+        """Recule pendant duree secondes sans bloquer les autres tâches"""
+        self.reculer(vitesse)
+        await self._attendre_puis_stopper(duree)
+
+    async def tourner_gauche_pendant_async(self, vitesse=None, duree=None):
+        """Tourne à gauche pendant duree secondes sans bloquer les autres tâches"""
+        self.tourner_gauche(vitesse)
+        await self._attendre_puis_stopper(duree)
+
+    async def tourner_droite_pendant_async(self, vitesse=None, duree=None):
+        """Tourne à droite pendant duree secondes sans bloquer les autres tâches"""
+        self.tourner_droite(vitesse)
+        await self._attendre_puis_stopper(duree)
+
+    async def clignoter_leds_async(self, r, g, b, nb_fois=3, intervalle=0.5):
+        """Fait clignoter toutes les LEDs sans bloquer les autres tâches"""
+        self._verifier_leds()
+        asyncio = _asyncio()
+        for _ in range(nb_fois):
+            self.allumer_leds(r, g, b)
+            await asyncio.sleep(intervalle)
+            self.eteindre_leds()
+            await asyncio.sleep(intervalle)
+
+    async def _attendre_bouton_async(self):
+        self._verifier_bouton()
+        from .bouton import APPUI
+        asyncio = _asyncio()
+        print("En attente du bouton...")
+        self.bouton.vider()
+        while self.bouton.evenement() != APPUI:
+            await asyncio.sleep(0.02)
+
+    async def attendre_bouton_start_async(self):
+        """Attend l'appui sur le bouton sans bloquer les autres tâches"""
+        await self._attendre_bouton_async()
+        print("Bouton appuyé, démarrage...")
+
+    async def attendre_bouton_stop_async(self):
+        """Attend l'appui sur le bouton puis arrête le robot, sans bloquer
+        les autres tâches"""
+        await self._attendre_bouton_async()
+        print("Bouton appuyé, arrêt...")
+        self.stopper()
+        if self.leds is not None:
+            self.eteindre_leds()
+
+    def flux_distance(self, periode_ms=50):
+        """Flux asynchrone de distances en mm : async for d in robot.flux_distance().
+
+        Le capteur passe en mesure continue toutes les periode_ms (s'il n'y
+        est pas déjà) ; la fin de chaque mesure est attendue par sondages
+        courts, sans bloquer les autres tâches.
+        """
+        self._verifier_capteur()
+        return _FluxDistance(self, periode_ms)
+
+
+class _FluxDistance:
+    """Itérateur asynchrone sur les mesures du capteur de distance"""
+
+    def __init__(self, robot, periode_ms, attente_ms=2):
+        self.robot = robot
+        self.periode_ms = periode_ms
+        self.attente = attente_ms / 1000  # pause entre deux sondages
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        robot = self.robot
+        asyncio = _asyncio()
+        if robot.acquisition is not None:
+            # mesures du cœur 1 : la dernière publiée, sans accès au bus
+            await asyncio.sleep(self.periode_ms / 1000)
+            return robot.lire_distance()
+        capteur = robot.capteur_distance
+        try:
+            if not capteur.started:
+                capteur.start(self.periode_ms)
+            debut = time.ticks_ms()
+            while True:
+                # poll() : une transaction I2C, ou le tampon de l'interruption
+                distance = capteur.poll()
+                if distance is not None:
+                    return robot._retenir_distance(distance)
+                if time.ticks_diff(time.ticks_ms(), debut) > capteur.read_timeout_ms():
+                    capteur.timeouts += 1
+                    break
+                await asyncio.sleep(self.attente)
+        except OSError:
+            pass  # déjà comptée par le capteur
+        # capteur muet ou en erreur : remise en état (bloquante, exceptionnelle)
+        capteur.retries += 1
+        try:
+            capteur.recover()
+        except (OSError, RuntimeError):
+            pass
+        return robot._retenir_distance(None)
+
+# === Exemples d'utilisation ===
+
+# Initialisation du robot avec LEDs sur le pin GPIO 15
+# robot = RobotPi(pwm_g=0, in1_g=1, in2_g=2, 
+#                 pwm_d=3, in1_d=4, in2_d=5, 
+#                 stby_pin=6, led_pin=15, nb_leds=4)
+
+# Allumer toutes les LEDs en rouge
+# robot.allumer_leds(255, 0, 0)
+
+# Allumer la première LED en vert
+# robot.allumer_led(0, 0, 255, 0)
+
+# Clignoter en bleu 5 fois
+# robot.clignoter_leds(0, 0, 255, nb_fois=5, intervalle=0.3)
+
+# Arc-en-ciel
+# robot.couleur_arc_en_ciel(0)
+
+# Éteindre toutes les LEDs
+# robot.eteindre_leds()
+
+# --- Exemples Capteur de distance ---
+# Lire la distance en millimètres
+# distance_mm = robot.lire_distance()
+# print(f"Distance: {distance_mm} mm")
+
+# Lire la distance en centimètres
+# distance_cm = robot.lire_distance_cm()
+# print(f"Distance: {distance_cm} cm")
+
+# Détecter un obstacle
+# if robot.obstacle_detecte(seuil_cm=15):
+#     print("Obstacle détecté!")
+#     robot.allumer_leds(255, 0, 0)  # Rouge
+# else:
+#     robot.allumer_leds(0, 255, 0)  # Vert
+
+# --- Exemple Robot autonome avec évitement d'obstacles ---
+# while True:
+#     if robot.obstacle_detecte(seuil_cm=20):
+#         robot.allumer_leds(255, 0, 0)  # Rouge si obstacle
+#         robot.eviter_obstacle()
+#     else:
+#         robot.allumer_leds(0, 255, 0)  # Vert si libre
+#         robot.avancer(70)
+#     time.sleep(0.1)
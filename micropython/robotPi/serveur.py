@@ -0,0 +1,207 @@
+"""
+Serveur de commandes : pilote RobotPi depuis le PC par la liaison série USB
+"""
+
+import ustruct as struct
+from . import protocole as p
+
+
+class ServeurCommandes:
+    """Exécute les trames reçues sur la liaison série et renvoie les réponses.
+
+    servir() bloque jusqu'à la commande FIN ; pomper() traite seulement les
+    octets déjà reçus et peut être appelé dans la boucle d'un programme.
+    Ctrl-C est désactivé pendant servir() et pomper() : l'octet 0x03 peut
+    apparaître dans une trame. Un octet arrivé entre deux appels de pomper()
+    interrompt encore le programme ; une boucle qui pompe les commandes
+    désactive Ctrl-C elle-même (micropython.kbd_intr(-1)).
+    """
+
+    def __init__(self, robot, entree=None, sortie=None):
+        self.robot = robot
+        self.entree = entree
+        self.sortie = sortie
+        self.lecteur = p.LecteurTrames()
+        self.actif = False
+        self.commandes = 0  # trames exécutées
+        self._sondage = None
+        # commande -> (format des arguments, None si longueur libre ; méthode)
+        self._table = {
+            p.PING: (None, self._ping),
+            p.FIN: ('', self._fin),
+            p.STOPPER: ('', self._stopper),
+            p.PILOTER: ('bb', self._piloter),
+            p.MOUVEMENT: ('<bbHH', self._mouvement),
+            p.AVANCER_CM: ('<hB', self._avancer_cm),
+            p.TOURNER_DEGRES: ('<hB', self._tourner_degres),
+            p.VITESSE_DEFAUT: ('B', self._vitesse_defaut),
+            p.LED: ('BBBB', self._led),
+            p.LEDS: ('BBB', self._leds),
+            p.IMAGE_LEDS: (None, self._image_leds),
+            p.DISTANCE: ('', self._distance),
+            p.DISTANCES: ('', self._distances),
+            p.BOUTON: ('', self._bouton),
+            p.POSITION: ('', self._position),
+        }
+
+    def _flux(self):
+        if self.entree is None or self.sortie is None:
+            import sys
+            if self.entree is None:
+                self.entree = sys.stdin.buffer
+            if self.sortie is None:
+                self.sortie = sys.stdout.buffer
+
+    def servir(self):
+        """Traite les commandes jusqu'à la commande FIN"""
+        import micropython
+        self._flux()
+        self.actif = True
+        micropython.kbd_intr(-1)
+        try:
+            while self.actif:
+                octets = self.entree.read(1)
+                if octets:
+                    self.traiter(octets)
+        finally:
+            micropython.kbd_intr(3)
+
+    def pomper(self):
+        """Traite les octets déjà reçus sans attendre"""
+        import micropython
+        if self._sondage is None:
+            import select
+            self._flux()
+            self._sondage = select.poll()
+            self._sondage.register(self.entree, select.POLLIN)
+        micropython.kbd_intr(-1)
+        try:
+            while self._sondage.poll(0):
+                self.traiter(self.entree.read(1))
+        finally:
+            micropython.kbd_intr(3)
+
+    def traiter(self, octets):
+        """Donne des octets reçus au décodeur et répond à chaque trame complète"""
+        lecteur = self.lecteur
+        for octet in octets:
+            if lecteur.pousser(octet):
+                charge = lecteur.charge()
+                if len(charge) >= 2:
+                    statut, donnees = self.executer(charge[1], charge[2:])
+                    self.sortie.write(p.trame(bytes((charge[0], statut)) + donnees))
+                    self.commandes += 1
+
+    def executer(self, commande, arguments):
+        """(statut, données) pour une commande et ses arguments"""
+        if commande == p.LOT:
+            return self._lot(arguments)
+        entree = self._table.get(commande)
+        if entree is None:
+            return p.INCONNUE, b''
+        format_arguments, methode = entree
+        try:
+            if format_arguments is None:
+                return p.OK, methode(arguments)
+            if len(arguments) != struct.calcsize(format_arguments):
+                return p.ARGUMENTS, b''
+            return p.OK, methode(*struct.unpack(format_arguments, arguments))
+        except (RuntimeError, OSError, ValueError) as e:
+            return p.ERREUR, str(e).encode()[:64]
+
+    def _lot(self, arguments):
+        # sous-commandes : commande | longueur | arguments, exécutées dans
+        # l'ordre ; les réponses suivent : statut | longueur | données
+        reponse = bytearray()
+        i = 0
+        n = len(arguments)
+        while i < n:
+            if i + 2 > n or arguments[i] == p.LOT:
+                return p.ARGUMENTS, bytes(reponse)
+            commande = arguments[i]
+            fin = i + 2 + arguments[i + 1]
+            if fin > n:
+                return p.ARGUMENTS, bytes(reponse)
+            statut, donnees = self.executer(commande, arguments[i + 2:fin])
+            reponse.append(statut)
+            reponse.append(len(donnees))
+            reponse.extend(donnees)
+            i = fin
+        if len(reponse) > p.TAILLE_MAX - 2:
+            return p.ARGUMENTS, b''
+        return p.OK, bytes(reponse)
+
+    # === Commandes ===
+
+    def _ping(self, arguments):
+        return bytes(arguments)
+
+    def _fin(self):
+        self.actif = False
+        return b''
+
+    def _stopper(self):
+        self.robot.stopper()
+        return b''
+
+    def _piloter(self, gauche, droite):
+        self.robot.piloter(gauche, droite)
+        return b''
+
+    def _mouvement(self, gauche, droite, duree_ms, rampe):
+        self.robot.mouvement(gauche, droite, duree_ms / 1000, rampe or None)
+        return b''
+
+    def _avancer_cm(self, distance_mm, vitesse):
+        self.robot.avancer_cm(distance_mm / 10, vitesse or None, bloquant=False)
+        return b''
+
+    def _tourner_degres(self, angle, vitesse):
+        self.robot.tourner_degres(angle, vitesse or None, bloquant=False)
+        return b''
+
+    def _vitesse_defaut(self, vitesse):
+        self.robot.vitesse_defaut = vitesse
+        return b''
+
+    def _led(self, index, r, g, b):
+        self.robot.allumer_led(index, r, g, b)
+        return b''
+
+    def _leds(self, r, g, b):
+        self.robot.allumer_leds(r, g, b)
+        return b''
+
+    def _image_leds(self, arguments):
+        robot = self.robot
+        robot._verifier_leds()
+        if len(arguments) != 3 * robot.nb_leds:
+            raise ValueError("image de %d LEDs attendue" % robot.nb_leds)
+        tampon = robot.tampon_leds
+        for i in range(robot.nb_leds):
+            tampon.definir(i, arguments[3 * i], arguments[3 * i + 1], arguments[3 * i + 2])
+        tampon.ecrire()
+        return b''
+
+    def _distance(self):
+        distance = self.robot.lire_distance()
+        if distance is None:
+            return struct.pack('<HB', p.AUCUNE_DISTANCE, 0)
+        return struct.pack('<HB', min(distance, 0xfffe),
+                           self.robot.capteur_distance.range_status)
+
+    def _distances(self):
+        reponse = bytearray()
+        for distance in self.robot.lire_distances():
+            reponse.extend(struct.pack('<H', p.AUCUNE_DISTANCE if distance is None
+                                       else min(distance, 0xfffe)))
+        return bytes(reponse)
+
+    def _bouton(self):
+        robot = self.robot
+        robot._verifier_bouton()
+        return bytes((robot.bouton.appuye(), robot.bouton.evenement() or 0))
+
+    def _position(self):
+        x, y, cap = self.robot.position()
+        return struct.pack('<iih', round(x), round(y), round(cap * 10) % 3600)
@@ -0,0 +1,1198 @@
+"""
+Pilote du capteur de distance VL53L0X (I2C), d'après les librairies
+Adafruit et Pololu
+"""
+
+from machine import Pin, unique_id
+import time
+from micropython import const
+import ustruct
+from array import array
+
+
+_IO_TIMEOUT = 1000  # ms, attentes de l'initialisation
+_SYSRANGE_START = const(0x00)
+_EXTSUP_HV = const(0x89)
+_MSRC_CONFIG = const(0x60)
+_FINAL_RATE_RTN_LIMIT = const(0x44)
+_SYSTEM_SEQUENCE = const(0x01)
+_SPAD_REF_START = const(0x4f)
+_SPAD_ENABLES = const(0xb0)
+_REF_EN_START_SELECT = const(0xb6)
+_SPAD_NUM_REQUESTED = const(0x4e)
+_INTERRUPT_GPIO = const(0x0a)
+_INTERRUPT_CLEAR = const(0x0b)
+_GPIO_MUX_ACTIVE_HIGH = const(0x84)
+_RESULT_INTERRUPT_STATUS = const(0x13)
+_RESULT_RANGE_STATUS = const(0x14)
+RANGE_VALID = const(11)  # statut de mesure (bits 6:3 de RESULT_RANGE_STATUS)
+_OSC_CALIBRATE = const(0xf8)
+_IDENTIFICATION_MODEL_ID = const(0xc0)
+_I2C_SLAVE_DEVICE_ADDRESS = const(0x8a)
+DEFAULT_ADDRESS = const(0x29)
+_MEASURE_PERIOD = const(0x04)
+_PAGE_SELECT = const(0xff)
+_POWER_ACCESS = const(0x80)
+_MSRC_TIMEOUT = const(0x46)
+_PRE_RANGE_VCSEL_PERIOD = const(0x50)
+_PRE_RANGE_TIMEOUT = const(0x51)
+_PRE_RANGE_PHASE_LOW = const(0x56)
+_PRE_RANGE_PHASE_HIGH = const(0x57)
+_FINAL_RANGE_VCSEL_PERIOD = const(0x70)
+_FINAL_RANGE_TIMEOUT = const(0x71)
+_FINAL_RANGE_PHASE_LOW = const(0x47)
+_FINAL_RANGE_PHASE_HIGH = const(0x48)
+_GLOBAL_VCSEL_WIDTH = const(0x32)
+_PHASECAL_TIMEOUT = const(0x30)
+_PHASECAL_LIM = const(0x30)
+_MIN_TIMING_BUDGET = const(20000)
+
+VCSEL_PRE_RANGE = const(0)
+VCSEL_FINAL_RANGE = const(1)
+
+# période VCSEL -> phase haute de la pré-mesure
+_PRE_RANGE_PHASES = {12: 0x18, 14: 0x30, 16: 0x40, 18: 0x50}
+# période VCSEL -> (phase haute, largeur VCSEL, timeout et limite phasecal)
+_FINAL_RANGE_PHASES = {
+    8: (0x10, 0x02, 0x0c, 0x30),
+    10: (0x28, 0x03, 0x09, 0x20),
+    12: (0x38, 0x03, 0x08, 0x20),
+    14: (0x48, 0x03, 0x07, 0x20),
+}
+
+# Profils de mesure : budget (µs), limite de signal (MCPS),
+# périodes VCSEL pré-mesure et mesure finale
+PROFILES = {
+    'rapide': (20000, 0.25, 14, 10),
+    'defaut': (33000, 0.25, 14, 10),
+    'precis': (200000, 0.25, 14, 10),
+    'longue_portee': (33000, 0.1, 18, 14),
+}
+
+# Tables de configuration encodées en octets : registre, nombre, valeurs...
+# Les registres contigus sont regroupés en une seule écriture multi-octets
+# (auto-incrément du VL53L0X). Les écritures dans 0xff/0x80 passent par le
+# cache de page et sont sautées si le registre a déjà la bonne valeur.
+_STOP_VAR_OPEN = (
+    b'\xff\x01\x01'
+    b'\x00\x01\x00'
+)
+_STOP_VAR_CLOSE = (
+    b'\x00\x01\x01'
+    b'\xff\x01\x00'
+)
+_SPAD_INFO_OPEN = (
+    b'\x80\x01\x01'
+    b'\xff\x01\x01'
+    b'\x00\x01\x00'
+
+    b'\xff\x01\x06'
+)
+_SPAD_INFO_START = (
+    b'\xff\x01\x07'
+    b'\x81\x01\x01'
+
+    b'\x80\x01\x01'
+
+    b'\x94\x01\x6b'
+    b'\x83\x01\x00'
+)
+_SPAD_INFO_READ = (
+    b'\x83\x01\x01'
+)
+_SPAD_INFO_END = (
+    b'\x81\x01\x00'
+    b'\xff\x01\x06'
+)
+_SPAD_INFO_CLOSE = (
+    b'\xff\x01\x01'
+    b'\x00\x01\x01'
+
+    b'\xff\x01\x00'
+    b'\x80\x01\x00'
+)
+_REF_SPAD_CONFIG = (
+    b'\xff\x01\x01'
+    b'\x4f\x01\x00'
+    b'\x4e\x01\x2c'
+    b'\xff\x01\x00'
+    b'\xb6\x01\xb4'
+)
+# accès aux résultats de calibration VHV (0xcb) et de phase (0xee)
+_REF_CAL_OPEN = (
+    b'\xff\x01\x01'
+    b'\x00\x01\x00'
+    b'\xff\x01\x00'
+)
+_REF_CAL_CLOSE = (
+    b'\xff\x01\x01'
+    b'\x00\x01\x01'
+    b'\xff\x01\x00'
+)
+_TUNING_CONFIG = (
+    b'\xff\x01\x01'
+    b'\x00\x01\x00'
+
+    b'\xff\x01\x00'
+    b'\x09\x01\x00'
+    b'\x10\x02\x00\x00'
+
+    b'\x24\x02\x01\xff'
+    b'\x75\x01\x00'
+
+    b'\xff\x01\x01'
+    b'\x4e\x01\x2c'
+    b'\x48\x01\x00'
+    b'\x30\x01\x20'
+
+    b'\xff\x01\x00'
+    b'\x30\x01\x09'
+    b'\x54\x01\x00'
+    b'\x31\x02\x04\x03'
+    b'\x40\x01\x83'
+    b'\x46\x01\x25'
+    b'\x60\x01\x00'
+    b'\x27\x01\x00'
+    b'\x50\x03\x06\x00\x96'
+    b'\x56\x02\x08\x30'
+    b'\x61\x02\x00\x00'
+    b'\x64\x03\x00\x00\xa0'
+
+    b'\xff\x01\x01'
+    b'\x22\x01\x32'
+    b'\x47\x01\x14'
+    b'\x49\x02\xff\x00'
+
+    b'\xff\x01\x00'
+    b'\x7a\x02\x0a\x00'
+    b'\x78\x01\x21'
+
+    b'\xff\x01\x01'
+    b'\x23\x01\x34'
+    b'\x42\x01\x00'
+    b'\x44\x03\xff\x26\x05'
+    b'\x40\x01\x40'
+    b'\x0e\x01\x06'
+    b'\x20\x01\x1a'
+    b'\x43\x01\x40'
+
+    b'\xff\x01\x00'
+    b'\x34\x02\x03\x44'
+
+    b'\xff\x01\x01'
+    b'\x31\x01\x04'
+    b'\x4b\x03\x09\x05\x04'
+
+    b'\xff\x01\x00'
+    b'\x44\x02\x00\x20'
+    b'\x47\x02\x08\x28'
+    b'\x67\x01\x00'
+    b'\x70\x03\x04\x01\xfe'
+    b'\x76\x02\x00\x00'
+
+    b'\xff\x01\x01'
+    b'\x0d\x01\x01'
+
+    b'\xff\x01\x00'
+    b'\x80\x01\x01'
+    b'\x01\x01\xf8'
+
+    b'\xff\x01\x01'
+    b'\x8e\x01\x01'
+    b'\x00\x01\x01'
+    b'\xff\x01\x00'
+    b'\x80\x01\x00'
+)
+
+
+class TimeoutError(RuntimeError):
+    pass
+
+
+_RESULT_SIZE = const(12)  # bloc de résultats à partir de RESULT_RANGE_STATUS
+
+
+class Mesure:
+    """Bloc de résultats d'une mesure, décodé sans allocation.
+
+    Le pilote réutilise le même objet à chaque mesure : copier les valeurs
+    à conserver. signal et ambiant sont des taux en virgule fixe 9.7
+    (MCPS * 128), spads le nombre de SPAD effectifs en 8.8.
+    """
+
+    def __init__(self):
+        self.statut = RANGE_VALID
+        self.distance = 0  # mm
+        self.signal = 0
+        self.ambiant = 0
+        self.spads = 0
+
+    @property
+    def valide(self):
+        return self.statut == RANGE_VALID
+
+    @property
+    def signal_mcps(self):
+        return self.signal / 128
+
+    @property
+    def ambiant_mcps(self):
+        return self.ambiant / 128
+
+    def decoder(self, buf):
+        """Décode les 12 octets lus à partir de RESULT_RANGE_STATUS"""
+        self.statut = (buf[0] >> 3) & 0x0f
+        self.spads = (buf[2] << 8) | buf[3]
+        self.signal = (buf[6] << 8) | buf[7]
+        self.ambiant = (buf[8] << 8) | buf[9]
+        self.distance = (buf[10] << 8) | buf[11]
+        return self.distance
+
+    def copier(self, mesure):
+        self.statut = mesure.statut
+        self.distance = mesure.distance
+        self.signal = mesure.signal
+        self.ambiant = mesure.ambiant
+        self.spads = mesure.spads
+
+    def __repr__(self):
+        return "Mesure(distance=%d, statut=%d, signal=%.2f, ambiant=%.2f)" % (
+            self.distance, self.statut, self.signal_mcps, self.ambiant_mcps)
+
+
+# Fichier de calibration : en-tête puis un enregistrement par capteur
+# (clé : identifiant de la carte, adresse I2C et identifiant du modèle ;
+# données : carte SPAD de référence, VHV, phase ; somme de contrôle)
+_CALIBRATION_MAGIC = b'VLC1'
+_CALIBRATION_KEY = const(12)
+_CALIBRATION_RECORD = const(21)
+
+
+def _checksum(data):
+    return sum(data) & 0xff
+
+
+def _decode_timeout(value):
+    # format du registre : (LSB * 2^MSB) + 1
+    return ((value & 0xff) << (value >> 8)) + 1
+
+
+def _encode_timeout(mclks):
+    if mclks <= 0:
+        return 0
+    lsb = mclks - 1
+    msb = 0
+    while lsb > 0xff:
+        lsb >>= 1
+        msb += 1
+    return (msb << 8) | (lsb & 0xff)
+
+
+def _select_spads_py(spad_map, spad_count, is_aperture):
+    # garde spad_count SPAD de référence actifs (sans les 12 premiers avec
+    # ouverture) et désactive les autres
+    spads_enabled = 0
+    for i in range(48):
+        if i < 12 and is_aperture or spads_enabled >= spad_count:
+            spad_map[i // 8] &= ~(1 << (i >> 2))
+        elif spad_map[i // 8] & (1 << (i >> 2)):
+            spads_enabled += 1
+
+
+def _pack_u32_py(buf, value):
+    buf[0] = (value >> 24) & 0xff
+    buf[1] = (value >> 16) & 0xff
+    buf[2] = (value >> 8) & 0xff
+    buf[3] = value & 0xff
+
+
+try:
+    from ._natif import select_spads as _select_spads, pack_u32 as _pack_u32
+except (ImportError, SyntaxError, ValueError):
+    # pas d'émetteur natif : versions Python
+    _select_spads = _select_spads_py
+    _pack_u32 = _pack_u32_py
+
+
+def _macro_period_ns(vcsel_period):
+    return (2304 * vcsel_period * 1655 + 500) // 1000
+
+
+def _mclks_to_us(mclks, vcsel_period):
+    return (mclks * _macro_period_ns(vcsel_period) + 500) // 1000
+
+
+def _us_to_mclks(us, vcsel_period):
+    macro_ns = _macro_period_ns(vcsel_period)
+    return (us * 1000 + macro_ns // 2) // macro_ns
+
+
+
+class VL53L0X:
+    def __init__(self, i2c, address=DEFAULT_ADDRESS, irq_pin=None, buffer_size=4,
+                 calibration_file=None, recalibrate=False, bus_pins=None):
+        self.i2c = i2c
+        self.address = address
+        # (scl, sda) : recover() débloque le bus avant de réinitialiser
+        self.bus_pins = bus_pins
+        # attente maximale d'une mesure en ms (None : déduite du budget)
+        self.io_timeout_ms = None
+        self.max_retries = 1  # reprises automatiques de read() après recover()
+        self.errors = 0      # erreurs I2C (OSError)
+        self.timeouts = 0    # échéances dépassées
+        self.retries = 0     # reprises après recover()
+        self.recoveries = 0
+        self.profile = None
+        self._init_timeout_ms = _IO_TIMEOUT
+        self._resume = False  # mesure continue à relancer par recover()
+        # cache en flash de la calibration SPAD/VHV/phase (None : désactivé)
+        self.calibration_file = calibration_file
+        self.calibration_loaded = False
+        self.i2c_transactions = 0  # compteur de transactions I2C
+        # GPIO1 optionnel : les mesures sont récupérées sur interruption
+        # dans un tampon circulaire au lieu d'être attendues dans read()
+        if irq_pin is not None and not isinstance(irq_pin, Pin):
+            irq_pin = Pin(irq_pin, Pin.IN, Pin.PULL_UP)
+        self.irq_pin = irq_pin
+        self._samples = array('H', [0] * buffer_size)
+        self._statuses = bytearray(buffer_size)
+        self._head = 0
+        self.sample_count = 0
+        self._polled = 0
+        self._irq_error = False  # erreur I2C dans _on_data_ready
+        # statut de la dernière mesure (11 = valide)
+        self.range_status = RANGE_VALID
+        # dernier bloc de résultats, lu en une seule transaction
+        self.result = Mesure()
+        self._result_buf = bytearray(_RESULT_SIZE)
+        self._timing_budget = 0
+        self._period = 0
+        # tampons de travail : les accès 8, 16 et 32 bits n'allouent rien
+        self._buf1 = bytearray(1)
+        self._buf2 = bytearray(2)
+        self._buf4 = bytearray(4)
+        self.init(recalibrate=recalibrate)
+        self._started = False
+
+    def _registers(self, register, values=None, struct='B'):
+        self.i2c_transactions += 1
+        if values is None:
+            size = ustruct.calcsize(struct)
+            data = self.i2c.readfrom_mem(self.address, register, size)
+            values = ustruct.unpack(struct, data)
+            return values
+        if isinstance(values, (bytes, bytearray)):
+            data = values  # octets déjà dans l'ordre des registres
+        else:
+            data = ustruct.pack(struct, *values)
+        self.i2c.writeto_mem(self.address, register, data)
+
+    def _register(self, register, value=None, struct='B'):
+        if struct == 'B':
+            buf = self._buf1
+            self.i2c_transactions += 1
+            if value is None:
+                self.i2c.readfrom_mem_into(self.address, register, buf)
+                return buf[0]
+            buf[0] = value
+            self.i2c.writeto_mem(self.address, register, buf)
+        elif struct == '>H':
+            buf = self._buf2
+            self.i2c_transactions += 1
+            if value is None:
+                self.i2c.readfrom_mem_into(self.address, register, buf)
+                return (buf[0] << 8) | buf[1]
+            buf[0] = value >> 8
+            buf[1] = value & 0xff
+            self.i2c.writeto_mem(self.address, register, buf)
+        elif struct == '>I' and value is not None:
+            buf = self._buf4
+            self.i2c_transactions += 1
+            _pack_u32(buf, value)
+            self.i2c.writeto_mem(self.address, register, buf)
+        elif value is None:
+            return self._registers(register, struct=struct)[0]
+        else:
+            self._registers(register, (value,), struct=struct)
+
+    def _flag(self, register=0x00, bit=0, value=None):
+        data = self._register(register)
+        mask = 1 << bit
+        if value is None:
+            return bool(data & mask)
+        elif value:
+            data |= mask
+        else:
+            data &= ~mask
+        self._register(register, data)
+
+    def _page(self, register, value):
+        # 0x80 est lu dans la page courante : son cache est invalidé
+        # à chaque changement de page
+        if register == _PAGE_SELECT:
+            if value == self._page_select:
+                return
+            self._page_select = value
+            self._power_access = -1
+        else:
+            if value == self._power_access:
+                return
+            self._power_access = value
+        self._register(register, value)
+
+    def _config(self, table):
+        data = memoryview(table)
+        i = 0
+        end = len(table)
+        while i < end:
+            register = table[i]
+            count = table[i + 1]
+            i += 2
+            if count == 1 and (register == _PAGE_SELECT
+                               or register == _POWER_ACCESS):
+                self._page(register, table[i])
+            else:
+                self.i2c_transactions += 1
+                self.i2c.writeto_mem(self.address, register,
+                                     data[i:i + count])
+            i += count
+
+    def _open_stop_variable(self):
+        self._page(_POWER_ACCESS, 0x01)
+        self._config(_STOP_VAR_OPEN)
+
+    def _close_stop_variable(self):
+        self._config(_STOP_VAR_CLOSE)
+        self._page(_POWER_ACCESS, 0x00)
+
+    def init(self, power2v8=True, recalibrate=False, timeout_ms=_IO_TIMEOUT):
+        """Initialise le capteur ; la calibration est relue depuis
+        calibration_file si elle existe, sauf si recalibrate est vrai.
+        Chaque attente du capteur est limitée à timeout_ms."""
+        debut = time.ticks_ms()
+        self._init_timeout_ms = timeout_ms
+        # le capteur a pu être réinitialisé : état des pages inconnu
+        self._page_select = -1
+        self._power_access = -1
+
+        self._flag(_EXTSUP_HV, 0, power2v8)
+
+        # I2C standard mode
+        self._register(0x88, 0x00)
+
+        self._open_stop_variable()
+        self._stop_variable = self._register(0x91)
+        self._close_stop_variable()
+
+        # disable signal_rate_msrc and signal_rate_pre_range limit checks
+        self._flag(_MSRC_CONFIG, 1, True)
+        self._flag(_MSRC_CONFIG, 4, True)
+
+        # rate_limit = 0.25
+        self._register(_FINAL_RATE_RTN_LIMIT, int(0.25 * (1 << 7)),
+                       struct='>H')
+
+        self._register(_SYSTEM_SEQUENCE, 0xff)
+
+        key = cached = None
+        if self.calibration_file is not None:
+            key = self._calibration_key()
+            if not recalibrate:
+                cached = self._load_calibration(key)
+
+        spad_count, is_aperture = self._spad_info()
+        spad_map = bytearray(self._registers(_SPAD_ENABLES, struct='6B'))
+
+        # set reference spads
+        self._config(_REF_SPAD_CONFIG)
+
+        _select_spads(spad_map, spad_count, is_aperture)
+        # la clé ne distingue pas deux capteurs à la même adresse : les SPAD
+        # de référence lus dans la NVM de ce capteur doivent donner la carte
+        # enregistrée, sinon VHV et phase sont ceux d'un autre capteur
+        if cached is not None and cached[:6] != spad_map:
+            cached = None
+        self.calibration_loaded = cached is not None
+
+        self._registers(_SPAD_ENABLES, spad_map, struct='6B')
+
+        self._config(_TUNING_CONFIG)
+
+        self._register(_INTERRUPT_GPIO, 0x04)
+        self._flag(_GPIO_MUX_ACTIVE_HIGH, 4, False)
+        self._register(_INTERRUPT_CLEAR, 0x01)
+
+        if cached is None:
+            self._register(_SYSTEM_SEQUENCE, 0x01)
+            self._calibrate(0x40)
+            self._register(_SYSTEM_SEQUENCE, 0x02)
+            self._calibrate(0x00)
+            if key is not None:
+                vhv, phase = self._ref_calibration()
+                self._save_calibration(key, bytes(spad_map) + bytes((vhv, phase)))
+        else:
+            self._ref_calibration(cached[6], cached[7])
+
+        self._register(_SYSTEM_SEQUENCE, 0xe8)
+        self.init_ms = time.ticks_diff(time.ticks_ms(), debut)
+
+    def _calibration_key(self):
+        board = (bytes(unique_id()) + bytes(8))[:8]
+        model = bytes(self._registers(_IDENTIFICATION_MODEL_ID, struct='3B'))
+        return board + bytes((self.address,)) + model
+
+    def _load_calibration(self, key):
+        # None si absente ou rejetée : la calibration complète est refaite
+        try:
+            with open(self.calibration_file, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if data[:4] != _CALIBRATION_MAGIC:
+            return None
+        for i in range(4, len(data) - _CALIBRATION_RECORD + 1, _CALIBRATION_RECORD):
+            if data[i:i + _CALIBRATION_KEY] == key:
+                record = data[i:i + _CALIBRATION_RECORD]
+                values = bytearray(record[_CALIBRATION_KEY:-1])
+                if _checksum(record[:-1]) != record[-1] or not any(values[:6]):
+                    return None
+                return values
+        return None
+
+    def _save_calibration(self, key, values):
+        records = [key + values]
+        try:
+            with open(self.calibration_file, 'rb') as f:
+                data = f.read()
+            if data[:4] == _CALIBRATION_MAGIC:
+                for i in range(4, len(data) - _CALIBRATION_RECORD + 1,
+                               _CALIBRATION_RECORD):
+                    if data[i:i + _CALIBRATION_KEY] != key:
+                        records.append(data[i:i + _CALIBRATION_RECORD - 1])
+        except OSError:
+            pass
+        try:
+            with open(self.calibration_file, 'wb') as f:
+                f.write(_CALIBRATION_MAGIC)
+                for record in records:
+                    f.write(record)
+                    f.write(bytes((_checksum(record),)))
+        except OSError:
+            pass  # système de fichiers plein ou en lecture seule
+
+    def _ref_calibration(self, vhv=None, phase=None):
+        # lit (sans argument) ou réécrit les résultats de calibration
+        self._config(_REF_CAL_OPEN)
+        if vhv is None:
+            vhv = self._register(0xcb)
+            phase = self._register(0xee) & 0xef
+        else:
+            self._register(0xcb, vhv)
+            self._register(0xee, (self._register(0xee) & 0x80) | phase)
+        self._config(_REF_CAL_CLOSE)
+        return vhv, phase
+
+    def _spad_info(self):
+        self._config(_SPAD_INFO_OPEN)
+        self._flag(0x83, 3, True)
+        self._config(_SPAD_INFO_START)
+        self._wait(0x83, 0xff, self._init_timeout_ms)
+        self._config(_SPAD_INFO_READ)
+        value = self._register(0x92)
+        self._config(_SPAD_INFO_END)
+        self._flag(0x83, 3, False)
+        self._config(_SPAD_INFO_CLOSE)
+        count = value & 0x7f
+        is_aperture = bool(value & 0b10000000)
+        return count, is_aperture
+
+    def _wait(self, register, mask, timeout_ms, clear=False):
+        # attend que register & mask soit non nul (nul si clear), au plus
+        # timeout_ms : l'échéance est en ticks_ms, quelle que soit la durée
+        # des transactions I2C
+        deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
+        while True:
+            value = self._register(register) & mask
+            if not value if clear else value:
+                return
+            if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+                self.timeouts += 1
+                raise TimeoutError()
+            time.sleep_ms(1)
+
+    def _calibrate(self, vhv_init_byte):
+        self._register(_SYSRANGE_START, 0x01 | vhv_init_byte)
+        self._wait(_RESULT_INTERRUPT_STATUS, 0x07, self._init_timeout_ms)
+        self._register(_INTERRUPT_CLEAR, 0x01)
+        self._register(_SYSRANGE_START, 0x00)
+
+    # === Budget de mesure et périodes VCSEL (d'après la librairie Pololu) ===
+
+    def _sequence_steps(self):
+        config = self._register(_SYSTEM_SEQUENCE)
+        # tcc, dss, msrc, pre_range, final_range
+        return ((config >> 4) & 1, (config >> 3) & 1, (config >> 2) & 1,
+                (config >> 6) & 1, (config >> 7) & 1)
+
+    def vcsel_pulse_period(self, vcsel_type):
+        """Période d'impulsion VCSEL en PCLK (pré-mesure ou mesure finale)"""
+        register = (_FINAL_RANGE_VCSEL_PERIOD if vcsel_type
+                    else _PRE_RANGE_VCSEL_PERIOD)
+        return (self._register(register) + 1) << 1
+
+    def _sequence_timeouts(self, pre_range):
+        pre_vcsel = self.vcsel_pulse_period(VCSEL_PRE_RANGE)
+        msrc_mclks = self._register(_MSRC_TIMEOUT) + 1
+        msrc_us = _mclks_to_us(msrc_mclks, pre_vcsel)
+        pre_range_mclks = _decode_timeout(
+            self._register(_PRE_RANGE_TIMEOUT, struct='>H'))
+        pre_range_us = _mclks_to_us(pre_range_mclks, pre_vcsel)
+        final_vcsel = self.vcsel_pulse_period(VCSEL_FINAL_RANGE)
+        final_mclks = _decode_timeout(
+            self._register(_FINAL_RANGE_TIMEOUT, struct='>H'))
+        if pre_range:
+            final_mclks -= pre_range_mclks
+        final_us = _mclks_to_us(final_mclks, final_vcsel)
+        return msrc_us, pre_range_us, pre_range_mclks, final_us, final_vcsel
+
+    def _used_budget(self, steps, msrc_us, pre_range_us):
+        tcc, dss, msrc, pre_range, final_range = steps
+        used = 1910 + 960  # surcoût de début et de fin
+        if tcc:
+            used += msrc_us + 590
+        if dss:
+            used += 2 * (msrc_us + 690)
+        elif msrc:
+            used += msrc_us + 660
+        if pre_range:
+            used += pre_range_us + 660
+        return used
+
+    def timing_budget(self):
+        """Budget de temps d'une mesure en microsecondes"""
+        steps = self._sequence_steps()
+        msrc_us, pre_range_us, _, final_us, _ = self._sequence_timeouts(
+            steps[3])
+        used = self._used_budget(steps, msrc_us, pre_range_us)
+        if steps[4]:
+            used += final_us + 550
+        return used
+
+    def set_timing_budget(self, budget_us):
+        """Fixe le budget de temps d'une mesure (minimum 20000 µs)"""
+        if budget_us < _MIN_TIMING_BUDGET:
+            raise ValueError("budget minimum : 20000 µs")
+        steps = self._sequence_steps()
+        (msrc_us, pre_range_us, pre_range_mclks,
+         _, final_vcsel) = self._sequence_timeouts(steps[3])
+        used = self._used_budget(steps, msrc_us, pre_range_us) + 550
+        if not steps[4]:
+            return
+        if used > budget_us:
+            raise ValueError("budget trop court pour la séquence active")
+        final_mclks = _us_to_mclks(budget_us - used, final_vcsel)
+        if steps[3]:
+            final_mclks += pre_range_mclks
+        self._register(_FINAL_RANGE_TIMEOUT, _encode_timeout(final_mclks),
+                       struct='>H')
+        self._timing_budget = budget_us
+
+    def set_signal_rate_limit(self, limit_mcps):
+        """Seuil de taux de signal retourné (MCPS) en dessous duquel la
+        mesure est invalide"""
+        self._register(_FINAL_RATE_RTN_LIMIT, int(limit_mcps * (1 << 7)),
+                       struct='>H')
+
+    def set_vcsel_pulse_period(self, vcsel_type, period_pclks):
+        """Fixe la période d'impulsion VCSEL (pré-mesure : 12 à 18,
+        mesure finale : 8 à 14, valeurs paires)"""
+        budget = self._timing_budget or self.timing_budget()
+        steps = self._sequence_steps()
+        (msrc_us, pre_range_us, pre_range_mclks,
+         final_us, _) = self._sequence_timeouts(steps[3])
+        period_reg = (period_pclks >> 1) - 1
+        if vcsel_type == VCSEL_PRE_RANGE:
+            phase = _PRE_RANGE_PHASES.get(period_pclks)
+            if phase is None:
+                raise ValueError("période VCSEL invalide")
+            self._register(_PRE_RANGE_PHASE_HIGH, phase)
+            self._register(_PRE_RANGE_PHASE_LOW, 0x08)
+            self._register(_PRE_RANGE_VCSEL_PERIOD, period_reg)
+            self._register(_PRE_RANGE_TIMEOUT, _encode_timeout(
+                _us_to_mclks(pre_range_us, period_pclks)), struct='>H')
+            msrc_mclks = _us_to_mclks(msrc_us, period_pclks)
+            self._register(_MSRC_TIMEOUT,
+                           255 if msrc_mclks > 256 else msrc_mclks - 1)
+        else:
+            phases = _FINAL_RANGE_PHASES.get(period_pclks)
+            if phases is None:
+                raise ValueError("période VCSEL invalide")
+            high, width, phasecal_timeout, phasecal_lim = phases
+            self._register(_FINAL_RANGE_PHASE_HIGH, high)
+            self._register(_FINAL_RANGE_PHASE_LOW, 0x08)
+            self._register(_GLOBAL_VCSEL_WIDTH, width)
+            self._register(_PHASECAL_TIMEOUT, phasecal_timeout)
+            self._page(_PAGE_SELECT, 0x01)
+            self._register(_PHASECAL_LIM, phasecal_lim)
+            self._page(_PAGE_SELECT, 0x00)
+            self._register(_FINAL_RANGE_VCSEL_PERIOD, period_reg)
+            final_mclks = _us_to_mclks(final_us, period_pclks)
+            if steps[3]:
+                final_mclks += pre_range_mclks
+            self._register(_FINAL_RANGE_TIMEOUT, _encode_timeout(final_mclks),
+                           struct='>H')
+        self.set_timing_budget(budget)
+        # phase calibration
+        config = self._register(_SYSTEM_SEQUENCE)
+        self._register(_SYSTEM_SEQUENCE, 0x02)
+        self._calibrate(0x00)
+        self._register(_SYSTEM_SEQUENCE, config)
+
+    def set_profile(self, name):
+        """Applique un profil de mesure : 'rapide', 'defaut', 'precis'
+        ou 'longue_portee'"""
+        try:
+            budget, limit, pre_vcsel, final_vcsel = PROFILES[name]
+        except KeyError:
+            raise ValueError("profil inconnu : %s" % name)
+        self.profile = name
+        started = self._started
+        if started:
+            self.stop()
+        self.set_signal_rate_limit(limit)
+        if self.vcsel_pulse_period(VCSEL_PRE_RANGE) != pre_vcsel:
+            self.set_vcsel_pulse_period(VCSEL_PRE_RANGE, pre_vcsel)
+        if self.vcsel_pulse_period(VCSEL_FINAL_RANGE) != final_vcsel:
+            self.set_vcsel_pulse_period(VCSEL_FINAL_RANGE, final_vcsel)
+        self.set_timing_budget(budget)
+        if started:
+            self.start(self._period)
+
+    def activer_profilage(self, profileur):
+        """Chronomètre read() et chaque accès registre avec profileur"""
+        profileur.envelopper(self, 'read', 'capteur.read')
+        profileur.envelopper(self, '_register', 'capteur.i2c')
+
+    def _on_data_ready(self, pin):
+        # GPIO1 actif bas : une nouvelle mesure est prête. Interruption
+        # différée : une erreur I2C levée ici interromprait le programme
+        # principal n'importe où ; read() ou poll() remettent le capteur en état
+        try:
+            value = self._read_block()
+        except OSError:
+            self.errors += 1
+            self._irq_error = True
+            return
+        head = (self._head + 1) % len(self._samples)
+        self._samples[head] = value
+        self._statuses[head] = self.result.statut
+        self._head = head
+        self.sample_count += 1
+
+    def last(self):
+        """Dernière mesure reçue sur interruption (None si aucune)"""
+        if not self.sample_count:
+            return None
+        return self._samples[self._head]
+
+    def start(self, period=0):
+        """Démarre la mesure continue : dos à dos si period vaut 0,
+        sinon une mesure toutes les period millisecondes"""
+        self._period = period
+        self._open_stop_variable()
+        self._register(0x91, self._stop_variable)
+        self._close_stop_variable()
+        if period:
+            oscilator = self._register(_OSC_CALIBRATE, struct='>H')
+            if oscilator:
+                period *= oscilator
+            self._register(_MEASURE_PERIOD, period, struct='>I')
+            self._register(_SYSRANGE_START, 0x04)
+        else:
+            self._register(_SYSRANGE_START, 0x02)
+        self._started = True
+        if self.irq_pin is not None:
+            self.irq_pin.irq(handler=self._on_data_ready,
+                             trigger=Pin.IRQ_FALLING)
+            # GPIO1 a pu passer à l'état bas avant l'activation de l'IRQ
+            self._register(_INTERRUPT_CLEAR, 0x01)
+
+    @property
+    def started(self):
+        """Vrai en mesure continue (start())"""
+        return self._started
+
+    @property
+    def period(self):
+        """Période de la mesure continue en ms (0 : dos à dos)"""
+        return self._period
+
+    def stop(self):
+        if self.irq_pin is not None:
+            self.irq_pin.irq(handler=None)
+        self._register(_SYSRANGE_START, 0x01)
+        self._config(_STOP_VAR_OPEN)
+        self._register(0x91, self._stop_variable)
+        self._config(_STOP_VAR_CLOSE)
+        self._started = False
+
+    def read_timeout_ms(self):
+        """Attente maximale d'une mesure : io_timeout_ms, sinon deux
+        budgets de mesure (ou deux périodes en mode cadencé) plus 20 ms"""
+        if self.io_timeout_ms is not None:
+            return self.io_timeout_ms
+        budget_ms = (self._timing_budget or 33000) // 1000
+        return 2 * max(budget_ms, self._period) + 20
+
+    def read(self, timeout_ms=None):
+        """Lit la distance en millimètres ; statut, taux de signal et
+        d'ambiant de la même mesure sont dans result (Mesure).
+
+        Attend au plus timeout_ms (par défaut read_timeout_ms()). Après une
+        erreur I2C ou une échéance dépassée, le capteur est remis en état
+        (recover()) et la lecture reprise jusqu'à max_retries fois ; la
+        dernière erreur est ensuite relevée. Une erreur I2C survenue dans
+        l'interruption GPIO1 est rattrapée par un recover() en début d'appel.
+        """
+        if timeout_ms is None:
+            timeout_ms = self.read_timeout_ms()
+        if self._irq_error:
+            self.retries += 1
+            self.recover()
+        retries = self.max_retries
+        while True:
+            try:
+                return self._read(timeout_ms)
+            except TimeoutError:
+                if not retries:
+                    raise
+            except OSError:
+                self.errors += 1
+                if not retries:
+                    raise
+            retries -= 1
+            self.retries += 1
+            self.recover()
+
+    def _read(self, timeout_ms):
+        if self.irq_pin is not None and self._started:
+            # le bus appartient au gestionnaire d'interruption
+            deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
+            while not self.sample_count:
+                if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+                    self.timeouts += 1
+                    raise TimeoutError()
+                time.sleep_ms(1)
+            head = self._head
+            self.range_status = self._statuses[head]
+            return self._samples[head]
+        if not self._started:
+            self._open_stop_variable()
+            self._register(0x91, self._stop_variable)
+            self._close_stop_variable()
+            self._register(_SYSRANGE_START, 0x01)
+            self._wait(_SYSRANGE_START, 0x01, timeout_ms, clear=True)
+        self._wait(_RESULT_INTERRUPT_STATUS, 0x07, timeout_ms)
+        return self._read_result()
+
+    def recover_timeout_ms(self):
+        """Durée maximale de recover() : chaque attente de init() et de
+        set_profile() (informations SPAD, calibrations VHV et de phase) est
+        limitée à 1 s, plus les transactions I2C"""
+        waits = 3 if self.profile is None else 5
+        return waits * _IO_TIMEOUT + 100
+
+    def recover(self):
+        """Remet le capteur en état après une erreur : bus débloqué si
+        bus_pins est donné (clear_bus), capteur réinitialisé (calibration
+        relue dans calibration_file), profil réappliqué et mesure continue
+        relancée. Les erreurs de la remise en état sont relevées."""
+        self.recoveries += 1
+        self._irq_error = False
+        # une remise en état précédente a pu échouer avant start()
+        started = self._started or self._resume
+        self._resume = started
+        if self.bus_pins is not None:
+            clear_bus(*self.bus_pins)
+        try:
+            if self._started:
+                # en mesure continue, la calibration de init() n'aboutirait pas
+                self.stop()
+            self._started = False
+            self.init()
+            if self.profile is not None:
+                self.set_profile(self.profile)
+            if started:
+                self.start(self._period)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            if self.irq_pin is not None and not self._started:
+                self.irq_pin.irq(handler=None)
+        self._resume = False
+
+    def _read_block(self):
+        # statut, taux et distance en une transaction, puis acquittement
+        self.i2c_transactions += 1
+        self.i2c.readfrom_mem_into(self.address, _RESULT_RANGE_STATUS, self._result_buf)
+        self._register(_INTERRUPT_CLEAR, 0x01)
+        return self.result.decoder(self._result_buf)
+
+    def _read_result(self):
+        value = self._read_block()
+        self.range_status = self.result.statut
+        return value
+
+    def poll(self):
+        """Mesure continue sans attente : la nouvelle mesure si elle est
+        prête, sinon None (aussi après la remise en état qui suit une
+        erreur I2C dans l'interruption GPIO1)"""
+        if self.irq_pin is not None:
+            if self._irq_error:
+                self.retries += 1
+                self.recover()
+                return None
+            count = self.sample_count
+            if count == self._polled:
+                return None
+            self._polled = count
+            head = self._head
+            self.range_status = self._statuses[head]
+            return self._samples[head]
+        try:
+            if not self._register(_RESULT_INTERRUPT_STATUS) & 0x07:
+                return None
+            return self._read_result()
+        except OSError:
+            self.errors += 1
+            raise
+
+    def set_address(self, address):
+        """Change l'adresse I2C (perdue à la remise à zéro par XSHUT)"""
+        self._register(_I2C_SLAVE_DEVICE_ADDRESS, address & 0x7f)
+        self.address = address
+
+
+def clear_bus(scl, sda, pulses=9):
+    """Débloque un bus I2C dont un esclave maintient SDA à l'état bas
+    (transaction interrompue par un reset du Pico ou un parasite).
+
+    Envoie des impulsions d'horloge sur SCL jusqu'à ce que SDA soit relâchée,
+    puis une condition STOP, et rend les deux broches au contrôleur I2C du
+    RP2040. Retourne True si SDA est libre.
+    """
+    scl_pin = Pin(scl, Pin.OPEN_DRAIN, value=1)
+    sda_pin = Pin(sda, Pin.IN, Pin.PULL_UP)
+    for _ in range(pulses):
+        if sda_pin.value():
+            break
+        scl_pin.value(0)
+        time.sleep_us(5)
+        scl_pin.value(1)
+        time.sleep_us(5)
+    # STOP : SDA monte pendant que SCL est à l'état haut
+    scl_pin.value(0)
+    sda_pin.init(Pin.OPEN_DRAIN, value=0)
+    time.sleep_us(5)
+    scl_pin.value(1)
+    time.sleep_us(5)
+    sda_pin.value(1)
+    time.sleep_us(5)
+    free = bool(sda_pin.value())
+    for pin in (scl_pin, sda_pin):
+        pin.init(Pin.ALT, pull=Pin.PULL_UP, alt=Pin.ALT_I2C)
+    return free
+
+
+def init_sensors(i2c, xshut_pins, first_address=0x30, irq_pins=None,
+                 boot_ms=2, **options):
+    """Démarre plusieurs capteurs sur un même bus grâce à leurs broches XSHUT.
+
+    Tous les capteurs sont mis en reset, puis réveillés un par un à
+    l'adresse 0x29 et déplacés à first_address, first_address + 1...
+    avant d'être initialisés. Les options sont passées à VL53L0X.
+    """
+    pins = []
+    for pin in xshut_pins:
+        if not isinstance(pin, Pin):
+            pin = Pin(pin, Pin.OUT)
+        pin.init(Pin.OUT)
+        pin.value(0)
+        pins.append(pin)
+    time.sleep_ms(boot_ms)
+    sensors = []
+    for i, pin in enumerate(pins):
+        pin.value(1)
+        time.sleep_ms(boot_ms)  # démarrage du capteur (tBOOT 1,2 ms)
+        address = first_address + i
+        i2c.writeto_mem(DEFAULT_ADDRESS, _I2C_SLAVE_DEVICE_ADDRESS,
+                        bytes((address,)))
+        irq_pin = irq_pins[i] if irq_pins is not None else None
+        sensors.append(VL53L0X(i2c, address=address, irq_pin=irq_pin, **options))
+    return sensors
+
+
+class GroupeCapteurs:
+    """Plusieurs capteurs en mesure continue, relevés à tour de rôle.
+
+    Les conversions de tous les capteurs se déroulent en même temps ; le
+    relevé ne fait qu'interroger chaque capteur sans attendre, la cadence
+    totale est donc proche de N fois celle d'un seul capteur.
+    """
+
+    def __init__(self, capteurs):
+        self.capteurs = list(capteurs)
+        self.distances = [None] * len(self.capteurs)
+        self.mesures = array('I', [0] * len(self.capteurs))
+
+    def demarrer(self, periode_ms=0):
+        for capteur in self.capteurs:
+            capteur.start(periode_ms)
+
+    def arreter(self):
+        for capteur in self.capteurs:
+            capteur.stop()
+
+    def actualiser(self):
+        """Relève les mesures prêtes sans attendre ; renvoie leur nombre"""
+        nouvelles = 0
+        for i, capteur in enumerate(self.capteurs):
+            distance = capteur.poll()
+            if distance is not None:
+                self.distances[i] = distance
+                self.mesures[i] += 1
+                nouvelles += 1
+        return nouvelles
+
+    def lire(self, timeout_ms=None):
+        """Attend une nouvelle mesure de chaque capteur et renvoie les
+        distances (mm) ; timeout_ms vaut par défaut la plus longue attente
+        des capteurs (read_timeout_ms())"""
+        if timeout_ms is None:
+            timeout_ms = max(capteur.read_timeout_ms() for capteur in self.capteurs)
+        echeance = time.ticks_add(time.ticks_ms(), timeout_ms)
+        attendues = (1 << len(self.capteurs)) - 1
+        recues = 0
+        while time.ticks_diff(echeance, time.ticks_ms()) > 0:
+            for i, capteur in enumerate(self.capteurs):
+                if recues & (1 << i):
+                    continue
+                distance = capteur.poll()
+                if distance is not None:
+                    self.distances[i] = distance
+                    self.mesures[i] += 1
+                    recues |= 1 << i
+            if recues == attendues:
+                return self.distances
+            time.sleep_ms(1)
+        for i, capteur in enumerate(self.capteurs):
+            if not recues & (1 << i):
+                capteur.timeouts += 1
+        raise TimeoutError()
+
+
+# Au-delà, le capteur n'a rien vu (8190/8191 : hors de portée)
+_HORS_PORTEE = const(8190)
+_RANGE_PHASE_FAIL = const(4)  # signal trop faible : aucune cible en vue
+
+
+class FiltreDistance:
+    """Filtre en continu des mesures du capteur de distance.
+
+    Une mesure hors de portée (rien devant le capteur, statut valide ou
+    signal trop faible) compte comme une mesure lointaine de 8190 mm. Les
+    mesures au statut invalide sont rejetées ; après max_rejets rejets de
+    suite (par défaut taille), la valeur filtrée est oubliée (None) et
+    l'obstacle relâché. Les autres mesures passent par une médiane
+    glissante (fenêtre triée tenue à jour par insertion) ou une moyenne
+    exponentielle en virgule fixe. Tout est préalloué : ajouter() n'alloue
+    rien.
+    """
+
+    def __init__(self, taille=5, mode='mediane', alpha=0.3, rejeter_statut=True,
+                 max_rejets=None):
+        if mode not in ('mediane', 'moyenne'):
+            raise ValueError("Mode de filtre inconnu : " + str(mode))
+        self.taille = max(1, taille)
+        self.mode = mode
+        self.rejeter_statut = rejeter_statut
+        self.max_rejets = self.taille if max_rejets is None else max(1, max_rejets)
+        self._alpha = max(1, min(256, int(alpha * 256)))  # sur 256
+        self._fenetre = array('H', [0] * self.taille)
+        self._tries = array('H', [0] * self.taille)
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        self._oublier()
+        self.mesures = 0
+        self.rejets = 0
+
+    def _oublier(self):
+        self._n = 0
+        self._pos = 0
+        self._moyenne = 0  # en mm << 8
+        self._rejets_suite = 0
+        self.valeur = None
+        self.obstacle = False
+
+    def ajouter(self, distance, statut=RANGE_VALID):
+        """Ajoute une mesure brute (mm) et renvoie la valeur filtrée"""
+        self.mesures += 1
+        if distance is not None and distance >= _HORS_PORTEE and (
+                not self.rejeter_statut or statut == RANGE_VALID
+                or statut == _RANGE_PHASE_FAIL):
+            distance = _HORS_PORTEE  # rien devant : mesure lointaine
+        elif distance is None or distance >= _HORS_PORTEE or (
+                self.rejeter_statut and statut != RANGE_VALID):
+            self.rejets += 1
+            self._rejets_suite += 1
+            if self._rejets_suite >= self.max_rejets:
+                # plus de mesure fiable : l'ancienne valeur n'est pas gardée
+                self._oublier()
+            return self.valeur
+        self._rejets_suite = 0
+        if self.mode == 'mediane':
+            self._inserer(distance)
+            self.valeur = self._tries[self._n >> 1]
+        else:
+            if self._n:
+                self._moyenne += (self._alpha * ((distance << 8) - self._moyenne)) >> 8
+            else:
+                self._moyenne = distance << 8
+                self._n = 1
+            self.valeur = self._moyenne >> 8
+        return self.valeur
+
+    def _inserer(self, distance):
+        tries = self._tries
+        n = self._n
+        if n == self.taille:
+            # retire la plus ancienne mesure de la fenêtre triée
+            ancienne = self._fenetre[self._pos]
+            i = 0
+            while tries[i] != ancienne:
+                i += 1
+            n -= 1
+            while i < n:
+                tries[i] = tries[i + 1]
+                i += 1
+        i = n
+        while i and tries[i - 1] > distance:
+            tries[i] = tries[i - 1]
+            i -= 1
+        tries[i] = distance
+        self._n = n + 1
+        self._fenetre[self._pos] = distance
+        self._pos = (self._pos + 1) % self.taille
+
+    def sous_seuil(self, seuil_entree, seuil_sortie):
+        """Détection avec hystérésis : vrai sous seuil_entree, jusqu'à
+        repasser au-dessus de seuil_sortie (en mm)"""
+        valeur = self.valeur
+        if valeur is not None:
+            if self.obstacle:
+                self.obstacle = valeur < seuil_sortie
+            else:
+                self.obstacle = valeur < seuil_entree
+        return self.obstacle
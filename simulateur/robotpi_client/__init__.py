@@ -0,0 +1,307 @@
+"""
+Client PC (CPython) du serveur de commandes robotPi.
+
+Pilote le robot et lit ses capteurs en direct par la liaison série USB,
+sans téléverser de programme. Sur le Pico, un programme lance le serveur
+avec ``robot.servir_commandes()`` ; puis sur le PC ::
+
+    from robotpi_client import ClientRobot
+
+    with ClientRobot('/dev/ttyACM0') as robot:
+        robot.piloter(60, 60)
+        print(robot.lire_distance())
+
+        lot = robot.lot()              # plusieurs commandes en une trame
+        lot.stopper()
+        lot.allumer_leds(0, 255, 0)
+        lot.lire_distance()
+        print(lot.executer())
+
+pyserial est utilisé s'il est installé, sinon le port est ouvert avec
+termios (Linux, macOS).
+"""
+
+import importlib.util
+import os
+import select
+import struct
+import sys
+import time
+
+REPERTOIRE_LIBRAIRIE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'micropython')
+
+
+def _charger(module):
+    # module partagé avec le Pico, chargé sans importer le paquet robotPi
+    nom = __name__ + '.' + module
+    if nom not in sys.modules:
+        chemin = os.path.join(REPERTOIRE_LIBRAIRIE, 'robotPi', module + '.py')
+        spec = importlib.util.spec_from_file_location(nom, chemin)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[nom] = module
+    return sys.modules[nom]
+
+
+protocole = p = _charger('protocole')
+
+
+class ErreurCommande(Exception):
+    """Le robot a refusé ou n'a pas pu exécuter une commande"""
+
+    def __init__(self, commande, statut, message=''):
+        noms = {p.INCONNUE: "commande inconnue", p.ARGUMENTS: "arguments invalides",
+                p.ERREUR: "erreur"}
+        texte = "commande 0x%02x : %s" % (commande, noms.get(statut, statut))
+        if message:
+            texte += " (%s)" % message
+        Exception.__init__(self, texte)
+        self.commande = commande
+        self.statut = statut
+
+
+class PortPosix:
+    """Port série ou pty ouvert en mode brut avec termios"""
+
+    def __init__(self, chemin, debit=115200):
+        import termios
+        import tty
+        self.fd = os.open(chemin, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(self.fd)
+        attributs = termios.tcgetattr(self.fd)
+        vitesse = getattr(termios, 'B%d' % debit, termios.B115200)
+        attributs[4] = attributs[5] = vitesse
+        termios.tcsetattr(self.fd, termios.TCSANOW, attributs)
+
+    def ecrire(self, donnees):
+        os.write(self.fd, donnees)
+
+    def lire(self, timeout):
+        """Octets disponibles, b'' après timeout secondes sans données"""
+        if select.select([self.fd], [], [], timeout)[0]:
+            return os.read(self.fd, 256)
+        return b''
+
+    def fermer(self):
+        os.close(self.fd)
+
+
+class PortPyserial:
+    """Port série ouvert avec pyserial (Windows compris)"""
+
+    def __init__(self, chemin, debit=115200):
+        import serial
+        self.serie = serial.Serial(chemin, debit, timeout=0)
+
+    def ecrire(self, donnees):
+        self.serie.write(donnees)
+
+    def lire(self, timeout):
+        self.serie.timeout = timeout
+        premier = self.serie.read(1)
+        if not premier:
+            return b''
+        return premier + self.serie.read(self.serie.in_waiting)
+
+    def fermer(self):
+        self.serie.close()
+
+
+def ouvrir_port(chemin, debit=115200):
+    try:
+        import serial  # noqa: F401
+    except ImportError:
+        return PortPosix(chemin, debit)
+    return PortPyserial(chemin, debit)
+
+
+def _distance(donnees):
+    distance, = struct.unpack('<H', donnees[:2])
+    return None if distance == p.AUCUNE_DISTANCE else distance
+
+
+def _distances(donnees):
+    return [None if d == p.AUCUNE_DISTANCE else d
+            for d in struct.unpack('<%dH' % (len(donnees) // 2), donnees)]
+
+
+def _bouton(donnees):
+    return bool(donnees[0]), donnees[1] or None
+
+
+def _position(donnees):
+    x, y, cap = struct.unpack('<iih', donnees)
+    return x, y, cap / 10
+
+
+class _Commandes:
+    """Commandes communes au client et aux lots ; _envoyer les exécute ou
+    les met en attente"""
+
+    def _envoyer(self, commande, arguments=b'', decodeur=None):
+        raise NotImplementedError
+
+    def stopper(self):
+        return self._envoyer(p.STOPPER)
+
+    def piloter(self, gauche, droite):
+        """Vitesses gauche et droite en % (négatives pour reculer), sans rampe"""
+        return self._envoyer(p.PILOTER, struct.pack('bb', _pourcent(gauche),
+                                                    _pourcent(droite)))
+
+    def mouvement(self, gauche, droite, duree=0, rampe=None):
+        return self._envoyer(p.MOUVEMENT, struct.pack(
+            '<bbHH', _pourcent(gauche), _pourcent(droite),
+            int(duree * 1000), rampe or 0))
+
+    def avancer_cm(self, distance_cm, vitesse=None):
+        """Lance le déplacement (odométrie) sans attendre sa fin"""
+        return self._envoyer(p.AVANCER_CM, struct.pack(
+            '<hB', int(distance_cm * 10), vitesse or 0))
+
+    def tourner_degres(self, angle, vitesse=None):
+        return self._envoyer(p.TOURNER_DEGRES, struct.pack(
+            '<hB', int(angle), vitesse or 0))
+
+    def definir_vitesse_defaut(self, vitesse):
+        return self._envoyer(p.VITESSE_DEFAUT, bytes((vitesse,)))
+
+    def allumer_led(self, index, r, g, b):
+        return self._envoyer(p.LED, bytes((index, r, g, b)))
+
+    def allumer_leds(self, r, g, b):
+        return self._envoyer(p.LEDS, bytes((r, g, b)))
+
+    def eteindre_leds(self):
+        return self.allumer_leds(0, 0, 0)
+
+    def image_leds(self, couleurs):
+        """Couleur (r, g, b) de chaque LED, envoyées en une seule écriture"""
+        return self._envoyer(p.IMAGE_LEDS, bytes(c for couleur in couleurs
+                                                 for c in couleur))
+
+    def lire_distance(self):
+        """Distance en mm, None sans mesure"""
+        return self._envoyer(p.DISTANCE, b'', _distance)
+
+    def lire_distances(self):
+        return self._envoyer(p.DISTANCES, b'', _distances)
+
+    def bouton(self):
+        """(appuyé, plus ancien événement ou None)"""
+        return self._envoyer(p.BOUTON, b'', _bouton)
+
+    def position(self):
+        """(x en mm, y en mm, cap en degrés) mesurés par l'odométrie"""
+        return self._envoyer(p.POSITION, b'', _position)
+
+
+def _pourcent(vitesse):
+    return max(-100, min(100, int(vitesse)))
+
+
+class ClientRobot(_Commandes):
+    """Client du serveur de commandes ; port est un chemin ou un objet avec
+    ecrire(octets), lire(timeout) et fermer()"""
+
+    def __init__(self, port, timeout=1.0, debit=115200):
+        self.port = ouvrir_port(port, debit) if isinstance(port, str) else port
+        self.timeout = timeout
+        self.lecteur = p.LecteurTrames()
+        self._numero = 0
+        self._recus = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def fermer(self):
+        self.port.fermer()
+
+    def requete(self, commande, arguments=b''):
+        """Envoie une commande et retourne les données de la réponse"""
+        self._numero = (self._numero + 1) & 0xff
+        numero = self._numero
+        self.port.ecrire(p.trame(bytes((numero, commande)) + bytes(arguments)))
+        limite = time.monotonic() + self.timeout
+        while True:
+            charge = self._trame_suivante(limite)
+            if charge is None:
+                raise TimeoutError("pas de réponse du robot à la commande 0x%02x"
+                                   % commande)
+            if len(charge) >= 2 and charge[0] == numero:
+                break  # sinon réponse en retard à une requête abandonnée
+        statut = charge[1]
+        donnees = bytes(charge[2:])
+        if statut != p.OK:
+            raise ErreurCommande(commande, statut, donnees.decode('utf-8', 'replace'))
+        return donnees
+
+    def _trame_suivante(self, limite):
+        # les octets reçus après une trame restent pour la suivante
+        while True:
+            recus = self._recus
+            for i in range(len(recus)):
+                if self.lecteur.pousser(recus[i]):
+                    self._recus = recus[i + 1:]
+                    return self.lecteur.charge()
+            reste = limite - time.monotonic()
+            if reste <= 0:
+                self._recus = b''
+                return None
+            self._recus = self.port.lire(reste)
+
+    def _envoyer(self, commande, arguments=b'', decodeur=None):
+        donnees = self.requete(commande, arguments)
+        return decodeur(donnees) if decodeur is not None else None
+
+    def ping(self, donnees=b''):
+        """Durée d'un aller-retour en secondes"""
+        debut = time.perf_counter()
+        if self.requete(p.PING, donnees) != bytes(donnees):
+            raise ErreurCommande(p.PING, p.ERREUR, "écho différent")
+        return time.perf_counter() - debut
+
+    def fin(self):
+        """Arrête le serveur : le Pico retourne au REPL"""
+        self.requete(p.FIN)
+
+    def lot(self):
+        return Lot(self)
+
+
+class Lot(_Commandes):
+    """Commandes regroupées dans une seule trame, exécutées dans l'ordre"""
+
+    def __init__(self, client):
+        self.client = client
+        self._arguments = bytearray()
+        self._decodeurs = []
+
+    def _envoyer(self, commande, arguments=b'', decodeur=None):
+        self._arguments += bytes((commande, len(arguments))) + bytes(arguments)
+        self._decodeurs.append((commande, decodeur))
+
+    def executer(self):
+        """Résultats de chaque commande, dans l'ordre (None sans données)"""
+        donnees = self.client.requete(p.LOT, self._arguments)
+        resultats = []
+        i = 0
+        for commande, decodeur in self._decodeurs:
+            statut, n = donnees[i], donnees[i + 1]
+            reponse = donnees[i + 2:i + 2 + n]
+            i += 2 + n
+            if statut != p.OK:
+                raise ErreurCommande(commande, statut, reponse.decode('utf-8', 'replace'))
+            resultats.append(decodeur(reponse) if decodeur is not None else None)
+        self._arguments = bytearray()
+        self._decodeurs = []
+        return resultats
+
+
+__all__ = ['ClientRobot', 'Lot', 'ErreurCommande', 'PortPosix', 'PortPyserial',
+           'ouvrir_port', 'protocole', 'REPERTOIRE_LIBRAIRIE']
@@ -0,0 +1,59 @@
+"""
+Essais rapides du serveur de commandes depuis le terminal :
+
+    python -m robotpi_client /dev/ttyACM0 ping --nombre 200
+    python -m robotpi_client /dev/ttyACM0 etat
+    python -m robotpi_client /dev/ttyACM0 piloter 50 50
+"""
+
+import argparse
+import sys
+
+from . import ClientRobot, ErreurCommande
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m robotpi_client',
+                                     description="Client du serveur de commandes RobotPi")
+    parser.add_argument('port', help="port série du Pico (ou pty du simulateur)")
+    parser.add_argument('--timeout', type=float, default=1.0,
+                        help="attente maximale d'une réponse en secondes (1.0)")
+    actions = parser.add_subparsers(dest='action', required=True)
+    ping = actions.add_parser('ping', help="mesure la durée des allers-retours")
+    ping.add_argument('--nombre', type=int, default=100)
+    ping.add_argument('--taille', type=int, default=0, help="octets d'écho par trame")
+    actions.add_parser('etat', help="distance, bouton et position")
+    piloter = actions.add_parser('piloter', help="vitesses gauche et droite en %%")
+    piloter.add_argument('gauche', type=int)
+    piloter.add_argument('droite', type=int)
+    actions.add_parser('stopper')
+    actions.add_parser('fin', help="arrête le serveur (retour au REPL)")
+    options = parser.parse_args(arguments)
+
+    with ClientRobot(options.port, timeout=options.timeout) as robot:
+        if options.action == 'ping':
+            donnees = bytes(range(options.taille))
+            durees = sorted(robot.ping(donnees) * 1000 for _ in range(options.nombre))
+            print("%d allers-retours : min %.2f ms, médiane %.2f ms, max %.2f ms"
+                  % (len(durees), durees[0], durees[len(durees) // 2], durees[-1]))
+        elif options.action == 'etat':
+            lot = robot.lot()
+            lot.lire_distance()
+            lot.bouton()
+            distance, (appuye, evenement) = lot.executer()
+            print("distance : %s mm, bouton %s" % (distance, "appuyé" if appuye else "relâché"))
+            try:
+                print("position : x=%d mm, y=%d mm, cap=%.1f°" % robot.position())
+            except ErreurCommande as e:
+                print("position : %s" % e)
+        elif options.action == 'piloter':
+            robot.piloter(options.gauche, options.droite)
+        elif options.action == 'stopper':
+            robot.stopper()
+        elif options.action == 'fin':
+            robot.fin()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
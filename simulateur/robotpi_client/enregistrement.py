@@ -0,0 +1,116 @@
+"""
+Décodage des fichiers de l'enregistreur de vol (robot.demarrer_enregistrement)
+
+Copier les fichiers du Pico puis les convertir en CSV :
+
+    mpremote cp :vol.rec.1 :vol.rec .
+    python -m robotpi_client.enregistrement vol.rec.1 vol.rec -o vol.csv
+
+Donner les fichiers du plus ancien au plus récent : les instants sont mis
+bout à bout et un nouveau démarrage (instant qui recule) est signalé.
+"""
+
+import argparse
+import csv
+import struct
+import sys
+
+from . import _charger
+
+enregistreur = e = _charger('enregistreur')
+
+COLONNES = ('temps_ms', 'distance_mm', 'duty_g', 'duty_d', 'r', 'g', 'b',
+            'bouton', 'arret_urgence', 'statut_capteur', 'marque', 'demarrage')
+
+# time.ticks_ms() du Pico reboucle à 2**30
+_PERIODE_TICKS = 1 << 30
+
+
+class ErreurFormat(Exception):
+    """Le fichier n'a pas été écrit par l'enregistreur de vol"""
+
+
+def lire(chemin):
+    """Enregistrements bruts (tuples de FORMAT) d'un fichier"""
+    with open(chemin, 'rb') as f:
+        donnees = f.read()
+    taille_entete = struct.calcsize(e.FORMAT_ENTETE)
+    if len(donnees) < taille_entete:
+        raise ErreurFormat("%s : fichier trop court" % chemin)
+    magique, version, taille, _ = struct.unpack_from(e.FORMAT_ENTETE, donnees)
+    if magique != e.MAGIQUE:
+        raise ErreurFormat("%s : pas un fichier d'enregistrement" % chemin)
+    if version != e.VERSION or taille != e.TAILLE:
+        raise ErreurFormat("%s : version %d non prise en charge" % (chemin, version))
+    fin = len(donnees) - (len(donnees) - taille_entete) % taille
+    return [struct.unpack_from(e.FORMAT, donnees, i)
+            for i in range(taille_entete, fin, taille)]
+
+
+def decoder(chemins):
+    """Dictionnaires (clés COLONNES) des fichiers donnés dans l'ordre.
+
+    temps_ms part de 0 au premier enregistrement et ne reboucle pas ;
+    demarrage compte les redémarrages du Pico détectés en cours de route.
+    """
+    precedent = None
+    decalage = 0
+    demarrage = 0
+    for chemin in chemins:
+        for (ticks, distance, duty_g, duty_d, r, g, b, bouton, statut,
+             marque) in lire(chemin):
+            if precedent is not None:
+                ecart = (ticks - precedent) % _PERIODE_TICKS
+                if ecart >= _PERIODE_TICKS // 2:
+                    # l'instant recule : nouveau démarrage, repris à la suite
+                    demarrage += 1
+                    ecart = 0
+                decalage += ecart
+            precedent = ticks
+            yield {
+                'temps_ms': decalage,
+                'distance_mm': None if distance == e.AUCUNE_DISTANCE else distance,
+                'duty_g': duty_g * 2,
+                'duty_d': duty_d * 2,
+                'r': r, 'g': g, 'b': b,
+                'bouton': int(bool(bouton & e.BOUTON_APPUYE)),
+                'arret_urgence': int(bool(bouton & e.ARRET_URGENCE)),
+                'statut_capteur': statut,
+                'marque': marque,
+                'demarrage': demarrage,
+            }
+
+
+def ecrire_csv(chemins, sortie):
+    """Écrit les enregistrements en CSV dans le fichier texte sortie ;
+    retourne leur nombre"""
+    ecrivain = csv.DictWriter(sortie, COLONNES)
+    ecrivain.writeheader()
+    n = 0
+    for ligne in decoder(chemins):
+        ecrivain.writerow(ligne)
+        n += 1
+    return n
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m robotpi_client.enregistrement',
+                                     description="Convertit un enregistrement de vol en CSV")
+    parser.add_argument('fichiers', nargs='+', help="du plus ancien au plus récent")
+    parser.add_argument('-o', '--sortie', default=None, help="fichier CSV (sortie standard)")
+    options = parser.parse_args(arguments)
+    try:
+        if options.sortie is None:
+            n = ecrire_csv(options.fichiers, sys.stdout)
+        else:
+            with open(options.sortie, 'w', newline='') as sortie:
+                n = ecrire_csv(options.fichiers, sortie)
+    except (OSError, ErreurFormat) as erreur:
+        print(erreur, file=sys.stderr)
+        return 1
+    print("%d enregistrements" % n, file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
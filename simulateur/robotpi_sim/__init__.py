@@ -0,0 +1,170 @@
+"""
+Simulateur hôte (CPython) pour la librairie robotPi.
+
+Remplace les modules MicroPython ``machine``, ``neopixel``,
+``micropython``, ``_thread``, ``ustruct``, ``utime`` et ``uasyncio`` ainsi que les
+fonctions ``time.sleep*``/``ticks_*`` par des versions simulées, pour
+exécuter la librairie ``robotPi`` et les programmes générés par Blockly sans
+modification sur Linux::
+
+    import robotpi_sim
+    sim = robotpi_sim.installer(duree_max=30)
+    from robotPi import RobotPi
+    ...
+    print(sim.rapport())
+
+Le temps simulé n'avance que pendant les attentes : une simulation de
+plusieurs minutes s'exécute en quelques secondes.
+"""
+
+import os
+import struct
+import sys
+import time
+
+from . import carte as _carte
+from .carte import Carte
+from .horloge import FinSimulation, ticks_add, ticks_diff
+from .robot import Monde, RobotDifferentiel
+from .vl53l0x import VL53L0XSimule
+
+REPERTOIRE_LIBRAIRIE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'micropython')
+
+_FONCTIONS_TIME = ('sleep', 'sleep_ms', 'sleep_us', 'ticks_ms', 'ticks_us',
+                   'ticks_cpu', 'ticks_diff', 'ticks_add')
+_MODULES = ('machine', 'neopixel', 'micropython', '_thread', 'ustruct', 'utime',
+            'uasyncio')
+_sauvegarde = None
+
+
+class Simulation(Carte):
+    """Carte simulée avec le robot, son arène, son capteur et son bouton"""
+
+    def __init__(self, duree_max=None, monde=None, broche_bouton=14,
+                 broche_gpio1=None, bus_capteur=0, robot=None, broche_xshut=None):
+        Carte.__init__(self, duree_max)
+        self.monde = monde if monde is not None else Monde()
+        self.robot = RobotDifferentiel(self, self.monde, **(robot or {}))
+        self.bus_capteur = bus_capteur
+        self.capteur = VL53L0XSimule(self.robot.distance_capteur_mm,
+                                     broche_gpio1=broche_gpio1,
+                                     broche_xshut=broche_xshut, carte=self)
+        self.capteurs = [self.capteur]
+        self.broche_bouton = broche_bouton
+        if broche_bouton is not None:
+            self.broche(broche_bouton).forcer(0)
+
+    def ajouter_capteur(self, broche_xshut, angle=0.0, broche_gpio1=None):
+        """Ajoute un capteur VL53L0X orienté de angle degrés, à l'adresse 0x29
+        sur le bus du capteur principal, remis à zéro par broche_xshut"""
+        capteur = VL53L0XSimule(lambda: self.robot.distance_capteur_mm(angle),
+                                broche_gpio1=broche_gpio1, graine=len(self.capteurs),
+                                broche_xshut=broche_xshut, carte=self)
+        self.bus(self.bus_capteur).ajouter(0x29, capteur)
+        self.capteurs.append(capteur)
+        return capteur
+
+    def appuyer_bouton(self, instant, duree=0.2, rebonds=0):
+        """Programme un appui sur le bouton à instant secondes simulées.
+
+        rebonds ajoute autant d'allers-retours parasites, espacés de 1 ms,
+        à l'appui et au relâchement.
+        """
+        bouton = self.broche(self.broche_bouton)
+        horloge = self.horloge
+        for debut, niveau in ((instant, 1), (instant + duree, 0)):
+            for i in range(2 * rebonds + 1):
+                horloge.programmer((debut + i * 0.001) * 1000000 - horloge.us,
+                                   lambda n=niveau if i % 2 == 0 else 1 - niveau:
+                                   bouton.forcer(n))
+
+    def programmer_panne(self, instant, panne='capteur', capteur=0):
+        """Programme une panne à instant secondes simulées : 'capteur' (le
+        capteur numéro capteur cesse de mesurer jusqu'à sa réinitialisation)
+        ou 'bus' (SDA maintenue à l'état bas jusqu'à des impulsions sur SCL)"""
+        if panne == 'capteur':
+            capteur = self.capteurs[capteur]
+            action = lambda: setattr(capteur, 'bloque', True)
+        elif panne == 'bus':
+            action = self.bus(self.bus_capteur).bloquer
+        else:
+            raise ValueError("panne inconnue : %s" % panne)
+        self.horloge.programmer(instant * 1000000 - self.horloge.us, action)
+
+    def rapport(self):
+        x, y, cap = self.robot.position()
+        return "\n".join([
+            Carte.rapport(self),
+            "robot : x=%.3f m, y=%.3f m, cap=%.1f°, %.3f m parcourus, %d collision(s)"
+            % (x, y, cap, self.robot.distance_parcourue, self.robot.collisions),
+            "capteur : %s mesures" % ", ".join(
+                "%d (0x%02x)" % (capteur.mesures, capteur.adresse)
+                for capteur in self.capteurs),
+        ])
+
+
+def installer(duree_max=None, **options):
+    """Installe les modules simulés et retourne la Simulation active"""
+    global _sauvegarde
+    if _sauvegarde is None:
+        _sauvegarde = (
+            {nom: getattr(time, nom) for nom in _FONCTIONS_TIME if hasattr(time, nom)},
+            {nom: sys.modules.get(nom) for nom in _MODULES},
+        )
+    simulation = Simulation(duree_max, **options)
+    _carte.active = simulation
+    simulation.bus(options.get('bus_capteur', 0)).ajouter(0x29, simulation.capteur)
+
+    from . import machine, micropython, neopixel
+    # asyncio importe threading avant que _thread soit remplacé
+    import asyncio
+    from . import _thread
+    sys.modules['machine'] = machine
+    sys.modules['neopixel'] = neopixel
+    sys.modules['micropython'] = micropython
+    sys.modules['_thread'] = _thread
+    sys.modules['ustruct'] = struct
+    sys.modules['utime'] = time
+    sys.modules['uasyncio'] = asyncio
+
+    horloge = simulation.horloge
+    time.sleep = horloge.sleep
+    time.sleep_ms = horloge.sleep_ms
+    time.sleep_us = horloge.sleep_us
+    time.ticks_ms = horloge.ticks_ms
+    time.ticks_us = horloge.ticks_us
+    time.ticks_cpu = horloge.ticks_cpu
+    time.ticks_diff = ticks_diff
+    time.ticks_add = ticks_add
+    return simulation
+
+
+def desinstaller():
+    """Restaure le module time et retire les modules simulés"""
+    global _sauvegarde
+    if _sauvegarde is None:
+        return
+    fonctions, modules = _sauvegarde
+    for nom in _FONCTIONS_TIME:
+        if nom in fonctions:
+            setattr(time, nom, fonctions[nom])
+        elif hasattr(time, nom):
+            delattr(time, nom)
+    for nom, module in modules.items():
+        if module is None:
+            sys.modules.pop(nom, None)
+        else:
+            sys.modules[nom] = module
+    # le paquet et ses pilotes déjà chargés
+    for nom in [nom for nom in sys.modules
+                if nom == 'robotPi' or nom.startswith('robotPi.')]:
+        del sys.modules[nom]
+    _carte.active = None
+    _sauvegarde = None
+
+
+__all__ = ['installer', 'desinstaller', 'Simulation', 'Monde',
+           'RobotDifferentiel', 'VL53L0XSimule', 'FinSimulation',
+           'REPERTOIRE_LIBRAIRIE']
@@ -0,0 +1,97 @@
+"""
+Exécute un programme robotPi (par exemple un main.py généré par Blockly)
+dans le simulateur :
+
+    python -m robotpi_sim main.py --duree 30 --appui 3 --boite 1.0 1.6
+"""
+
+import argparse
+import math
+import os
+import runpy
+import sys
+import tempfile
+
+from . import REPERTOIRE_LIBRAIRIE, FinSimulation, installer
+
+APPUI_DEFAUT = 3.0  # instant de l'appui sur le bouton sans --appui (s)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m robotpi_sim',
+                                     description="Simulateur RobotPi")
+    parser.add_argument('programme', help="programme MicroPython à exécuter")
+    parser.add_argument('--duree', type=float, default=60,
+                        help="durée simulée maximale en secondes (60)")
+    parser.add_argument('--appui', type=float, action='append', default=None,
+                        metavar='T', help="appui sur le bouton à T secondes (3.0 : "
+                                          "après la mise en route du bloc d'initialisation)")
+    parser.add_argument('--boite', type=float, nargs=2, action='append', default=[],
+                        metavar=('X', 'Y'), help="boîte de 10 cm en (X, Y) mètres")
+    parser.add_argument('--arene', type=float, nargs=2, default=(2.0, 2.0),
+                        metavar=('L', 'H'), help="dimensions de l'arène (2 x 2 m)")
+    parser.add_argument('--cap', type=float, default=90.0,
+                        help="cap initial en degrés (90 : vers le haut)")
+    parser.add_argument('--gpio1', type=int, default=None,
+                        help="broche reliée à la sortie GPIO1 du capteur")
+    parser.add_argument('--xshut', type=int, default=None,
+                        help="broche reliée à XSHUT du capteur principal")
+    parser.add_argument('--capteur', type=float, nargs=2, action='append', default=[],
+                        metavar=('XSHUT', 'ANGLE'),
+                        help="capteur supplémentaire sur la broche XSHUT, "
+                             "orienté de ANGLE degrés (90 : à gauche)")
+    parser.add_argument('--encodeurs', type=int, nargs=4, default=None,
+                        metavar=('A_G', 'B_G', 'A_D', 'B_D'),
+                        help="broches des voies A et B des encodeurs gauche et droit")
+    parser.add_argument('--panne', nargs=2, action='append', default=[],
+                        metavar=('T', 'TYPE'),
+                        help="panne à T secondes : capteur (capteur muet) "
+                             "ou bus (SDA bloquée à l'état bas)")
+    parser.add_argument('--flash', default=None, metavar='DOSSIER',
+                        help="dossier courant du programme, comme la flash du Pico "
+                             "(calibration, enregistreur de vol ; temporaire par défaut)")
+    options = parser.parse_args(arguments)
+
+    from .robot import Monde
+    monde = Monde(*options.arene)
+    for x, y in options.boite:
+        monde.ajouter_boite(x, y)
+    robot = {'cap': math.radians(options.cap)}
+    if options.encodeurs is not None:
+        a_g, b_g, a_d, b_d = options.encodeurs
+        robot['encodeurs'] = ((a_g, b_g), (a_d, b_d))
+    simulation = installer(options.duree, monde=monde, broche_gpio1=options.gpio1,
+                           broche_xshut=options.xshut, robot=robot)
+    for broche, angle in options.capteur:
+        simulation.ajouter_capteur(int(broche), angle)
+    # le bloc d'initialisation attend 2 s et attendre_bouton_start() ignore
+    # les appuis antérieurs
+    for instant in options.appui if options.appui is not None else [APPUI_DEFAUT]:
+        simulation.appuyer_bouton(instant)
+    for instant, panne in options.panne:
+        simulation.programmer_panne(float(instant), panne)
+
+    programme = os.path.abspath(options.programme)
+    sys.path.insert(0, REPERTOIRE_LIBRAIRIE)
+    sys.path.insert(0, os.path.dirname(programme))
+    # les fichiers du programme (vl53l0x_cal.bin...) restent hors du dépôt
+    flash = tempfile.TemporaryDirectory() if options.flash is None else None
+    courant = os.getcwd()
+    os.chdir(options.flash if flash is None else flash.name)
+    code = 0
+    try:
+        runpy.run_path(programme, run_name='__main__')
+    except FinSimulation:
+        print("⏱ durée de simulation atteinte")
+    except SystemExit as e:
+        code = e.code or 0
+    finally:
+        os.chdir(courant)
+        if flash is not None:
+            flash.cleanup()
+    print(simulation.rapport())
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
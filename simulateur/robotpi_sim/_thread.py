@@ -0,0 +1,81 @@
+"""
+Module _thread simulé : chaque fil lancé par start_new_thread est un cœur
+de l'horloge simulée (un seul s'exécute à la fois, voir Horloge).
+
+Les autres fonctions sont celles du module _thread de CPython ; les verrous
+attendent en temps simulé pour qu'un cœur bloqué laisse tourner les autres.
+"""
+
+import _thread as _reel
+import sys
+
+from . import carte as _carte
+
+
+def start_new_thread(fonction, arguments, kwargs=None):
+    horloge = _carte.active.horloge
+    coeur = horloge.nouveau_coeur()
+
+    def fil():
+        horloge.entrer(coeur)
+        try:
+            fonction(*arguments, **(kwargs or {}))
+        except SystemExit:
+            pass
+        except BaseException as e:
+            # comme MicroPython : le fil s'arrête, le programme continue
+            print("Exception dans le fil %d : %r" % (coeur.ordre, e), file=sys.stderr)
+        finally:
+            horloge.sortir()
+    return _reel.start_new_thread(fil, ())
+
+
+class _Verrou:
+    def __init__(self):
+        self._verrou = _reel.allocate_lock()
+
+    def acquire(self, attendre=1, timeout=-1):
+        if self._verrou.acquire(False):
+            return True
+        if not attendre:
+            return False
+        horloge = _carte.active.horloge
+        limite = None if timeout < 0 else horloge.us + timeout * 1000000
+        while not self._verrou.acquire(False):
+            if limite is not None and horloge.us >= limite:
+                return False
+            horloge.avancer(1)
+        return True
+
+    def release(self):
+        self._verrou.release()
+
+    def locked(self):
+        return self._verrou.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def allocate_lock():
+    return _Verrou()
+
+
+def exit():
+    raise SystemExit
+
+
+def stack_size(taille=None):
+    return 0
+
+
+def get_ident():
+    return _reel.get_ident()
+
+
+def __getattr__(nom):
+    return getattr(_reel, nom)
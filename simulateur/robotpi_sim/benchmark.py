@@ -0,0 +1,371 @@
+"""
+Banc de mesure des chemins critiques de robotPi sur le simulateur.
+
+Pour chaque cas, mesure par appel : transactions et octets I2C, envois
+vers les LEDs, temps simulé (bus I2C, LEDs et attentes compris), cadence
+de boucle atteignable, temps CPU sur l'hôte et pic de mémoire allouée
+(tracemalloc, CPython : à comparer entre versions, pas au tas du Pico).
+Les résultats sont écrits en JSON pour être comparés d'une version à
+l'autre :
+
+    python -m robotpi_sim.benchmark --json resultats.json
+    python -m robotpi_sim.benchmark --reference resultats.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import REPERTOIRE_LIBRAIRIE, desinstaller, installer
+
+FORMAT = 1
+# grandeurs comparées avec --reference (plus petit = meilleur)
+_GRANDEURS = ('transactions_i2c', 'octets_i2c', 'envois_leds', 'temps_us')
+
+
+def _robot(simulation, freq, distance_mm=None, leds=True):
+    from machine import I2C
+    import robotPi
+    if distance_mm is not None:
+        simulation.capteur.distance = lambda: distance_mm
+    return robotPi.RobotPi(0, 3, 2, 1, 4, 5, stby_pin=6,
+                           led_pin=15 if leds else None, nb_leds=4 if leds else 0,
+                           pin_bouton=14, i2c=I2C(0, freq=freq),
+                           fichier_calibration=None)
+
+
+def _mesurer(simulation, fonction, n):
+    bus = simulation.bus(0)
+    fonction()  # premier appel hors mesure
+    transactions = bus.transactions
+    octets = bus.octets
+    envois = sum(leds.envois for leds in simulation.leds)
+    debut = simulation.horloge.us
+    debut_hote = time.perf_counter()
+    for _ in range(n):
+        fonction()
+    duree_hote = (time.perf_counter() - debut_hote) / n
+    duree = (simulation.horloge.us - debut) / n
+    mesure = {
+        'appels': n,
+        'transactions_i2c': (bus.transactions - transactions) / n,
+        'octets_i2c': (bus.octets - octets) / n,
+        'envois_leds': (sum(leds.envois for leds in simulation.leds) - envois) / n,
+        'temps_us': round(duree, 1),
+        'cadence_hz': round(1000000 / duree, 1) if duree else None,
+        'cpu_hote_us': round(duree_hote * 1000000, 2),
+    }
+    pic = 0
+    tracemalloc.start()
+    for _ in range(min(n, 20)):
+        tracemalloc.reset_peak()
+        avant = tracemalloc.get_traced_memory()[0]
+        fonction()
+        pic = max(pic, tracemalloc.get_traced_memory()[1] - avant)
+    tracemalloc.stop()
+    mesure['pic_alloc_octets'] = pic
+    return mesure
+
+
+def _cas(freq):
+    """(nom, préparation(simulation) -> fonction, nombre d'appels)"""
+
+    def import_moteurs(simulation):
+        # import à froid de la librairie pour un robot sans LEDs ni capteur ;
+        # comme sur le Pico, les sources sont compilées à chaque import
+        # (aucun .pyc relu ni écrit)
+        cache = tempfile.mkdtemp()
+
+        def appel():
+            for nom in [nom for nom in sys.modules
+                        if nom == 'robotPi' or nom.startswith('robotPi.')]:
+                del sys.modules[nom]
+            prefixe, sans_pyc = sys.pycache_prefix, sys.dont_write_bytecode
+            sys.pycache_prefix, sys.dont_write_bytecode = cache, True
+            try:
+                import robotPi
+                robotPi.RobotPi(0, 3, 2, 1, 4, 5, stby_pin=6)
+            finally:
+                sys.pycache_prefix, sys.dont_write_bytecode = prefixe, sans_pyc
+        return appel
+
+    def init_capteur(simulation):
+        from machine import I2C
+        import robotPi
+        i2c = I2C(0, freq=freq)
+        return lambda: robotPi.VL53L0X(i2c)
+
+    def init_capteur_cache(simulation):
+        from machine import I2C
+        import robotPi
+        i2c = I2C(0, freq=freq)
+        fichier = os.path.join(tempfile.mkdtemp(), 'vl53l0x_cal.bin')
+        # le premier appel (hors mesure) calibre et écrit le fichier
+        return lambda: robotPi.VL53L0X(i2c, calibration_file=fichier)
+
+    def read(simulation):
+        return _robot(simulation, freq).capteur_distance.read
+
+    def lire_distance(simulation):
+        return _robot(simulation, freq).lire_distance
+
+    def lire_mesure(simulation):
+        # distance, statut et taux de signal : un seul bloc de résultats lu
+        return _robot(simulation, freq).lire_mesure
+
+    def lire_distance_coeur1(simulation):
+        # mesures relevées sur le second cœur : lecture du tampon partagé
+        robot = _robot(simulation, freq)
+        robot.demarrer_acquisition()
+        simulation.horloge.sleep_ms(100)  # premières mesures publiées
+        return robot.lire_distance
+
+    def lire_distance_capteur_bloque(simulation):
+        # pire cas : le capteur ne mesure plus à chaque appel ; échéance
+        # dépassée puis remise en état (recover()) et nouvelle lecture
+        robot = _robot(simulation, freq)
+        capteur = simulation.capteur
+
+        def appel():
+            capteur.bloque = True
+            robot.lire_distance()
+        return appel
+
+    def lire_distance_bus_bloque(simulation):
+        # pire cas : SDA bloquée à chaque appel ; timeout du contrôleur I2C,
+        # impulsions sur SCL (clear_bus) puis remise en état
+        from machine import I2C, Pin
+        import robotPi
+        bus = simulation.bus(0)
+        robot = robotPi.RobotPi(0, 3, 2, 1, 4, 5, stby_pin=6,
+                                i2c=I2C(0, scl=Pin(9), sda=Pin(8), freq=freq),
+                                broches_i2c=(9, 8), fichier_calibration=None)
+
+        def appel():
+            bus.bloquer()
+            robot.lire_distance()
+        return appel
+
+    def lire_distances(simulation):
+        # trois capteurs en mesure continue : un relevé complet par appel
+        from machine import I2C
+        import robotPi
+        simulation.ajouter_capteur(21, 90)
+        simulation.ajouter_capteur(22, -90)
+        robot = robotPi.RobotPi(0, 3, 2, 1, 4, 5, stby_pin=6, i2c=I2C(0, freq=freq),
+                                fichier_calibration=None, broches_xshut=[20, 21, 22])
+        return robot.lire_distances
+
+    def obstacle_detecte(simulation):
+        return _robot(simulation, freq).obstacle_detecte
+
+    def avancer(simulation):
+        robot = _robot(simulation, freq, leds=False)
+        vitesses = [40, 80]
+        etat = [0]
+
+        def appel():
+            etat[0] ^= 1
+            robot.avancer(vitesses[etat[0]])
+        return appel
+
+    def allumer_leds_identique(simulation):
+        robot = _robot(simulation, freq)
+        return lambda: robot.allumer_leds(0, 255, 0)
+
+    def allumer_leds_alterne(simulation):
+        robot = _robot(simulation, freq)
+        etat = [0]
+
+        def appel():
+            etat[0] ^= 1
+            robot.allumer_leds(255 * etat[0], 255, 0)
+        return appel
+
+    def arc_en_ciel(simulation):
+        robot = _robot(simulation, freq)
+        etat = [0]
+
+        def appel():
+            etat[0] += 1
+            robot.couleur_arc_en_ciel(etat[0])
+        return appel
+
+    def boucle_controle(simulation):
+        robot = _robot(simulation, freq)
+
+        def appel():
+            if robot.obstacle_detecte():
+                robot.allumer_leds(255, 0, 0)
+                robot.stopper()
+            else:
+                robot.allumer_leds(0, 255, 0)
+                robot.avancer(70)
+        return appel
+
+    def boucle_blockly(simulation, cache_ms=0):
+        # tour de boucle d'un programme Blockly : trois blocs capteurs,
+        # précédés de robot.actualiser() comme dans le code généré
+        robot = _robot(simulation, freq)
+        robot.cache_capteurs_ms = cache_ms
+
+        def appel():
+            robot.actualiser()
+            if not robot.eviter_obstacle(bloquant=False):
+                robot.avancer(60)
+            if robot.obstacle_detecte():
+                robot.allumer_leds(255, 0, 0)
+            elif robot.lire_distance_cm() is not None:
+                robot.allumer_leds(0, 255, 0)
+        return appel
+
+    def boucle_blockly_cache(simulation):
+        return boucle_blockly(simulation, cache_ms=100)
+
+    def enregistrer(simulation):
+        # un enregistrement par appel ; un bloc de 512 octets écrit tous
+        # les 32 appels
+        robot = _robot(simulation, freq)
+        robot.demarrer_enregistrement(os.path.join(tempfile.mkdtemp(), 'vol.rec'))
+        return robot.enregistrer
+
+    def boucle_controle_enregistree(simulation):
+        robot = _robot(simulation, freq)
+        robot.demarrer_enregistrement(os.path.join(tempfile.mkdtemp(), 'vol.rec'))
+
+        def appel():
+            if robot.obstacle_detecte():
+                robot.allumer_leds(255, 0, 0)
+                robot.stopper()
+            else:
+                robot.allumer_leds(0, 255, 0)
+                robot.avancer(70)
+            robot.enregistrer()
+        return appel
+
+    def tick_comportements(simulation):
+        # un tick de explorer() : relevé sans attente, arbitrage, consigne
+        from robotPi.comportements import ArretBouton, Fuite, Evitement, Croisiere
+        robot = _robot(simulation, freq)
+        boucle = robot.comportements(ArretBouton(), Fuite(), Evitement(), Croisiere())
+        boucle.demarrer()
+        return boucle.tick
+
+    def eviter_obstacle(simulation):
+        robot = _robot(simulation, freq, distance_mm=100)
+        return robot.eviter_obstacle
+
+    return [
+        ('import_moteurs', import_moteurs, 10),
+        ('init_vl53l0x', init_capteur, 3),
+        ('init_vl53l0x_cache', init_capteur_cache, 3),
+        ('vl53l0x_read', read, 50),
+        ('lire_distance', lire_distance, 50),
+        ('lire_mesure', lire_mesure, 50),
+        ('lire_distance_coeur1', lire_distance_coeur1, 50),
+        ('lire_distance_muet', lire_distance_capteur_bloque, 5),
+        ('lire_distance_bus_bloque', lire_distance_bus_bloque, 5),
+        ('obstacle_detecte', obstacle_detecte, 50),
+        ('lire_distances_3_capteurs', lire_distances, 50),
+        ('avancer', avancer, 200),
+        ('allumer_leds_identique', allumer_leds_identique, 200),
+        ('allumer_leds_alterne', allumer_leds_alterne, 200),
+        ('couleur_arc_en_ciel', arc_en_ciel, 200),
+        ('boucle_controle', boucle_controle, 50),
+        ('boucle_blockly', boucle_blockly, 50),
+        ('boucle_blockly_cache', boucle_blockly_cache, 50),
+        ('enregistrer', enregistrer, 320),
+        ('boucle_controle_enregistree', boucle_controle_enregistree, 50),
+        ('tick_comportements', tick_comportements, 200),
+        ('eviter_obstacle', eviter_obstacle, 3),
+    ]
+
+
+def executer(freq=100000, filtre=None):
+    """Exécute les cas et retourne le dictionnaire de résultats"""
+    if REPERTOIRE_LIBRAIRIE not in sys.path:
+        sys.path.insert(0, REPERTOIRE_LIBRAIRIE)
+    resultats = {}
+    for nom, preparation, n in _cas(freq):
+        if filtre and filtre not in nom:
+            continue
+        simulation = installer()
+        try:
+            # les messages de robotPi ne doivent pas se mêler au tableau
+            with contextlib.redirect_stdout(io.StringIO()):
+                fonction = preparation(simulation)
+                resultats[nom] = _mesurer(simulation, fonction, n)
+        finally:
+            desinstaller()
+    return {
+        'format': FORMAT,
+        'python': platform.python_version(),
+        'freq_i2c': freq,
+        'resultats': resultats,
+    }
+
+
+def comparer(reference, actuel, tolerance=0.05):
+    """Liste des régressions de actuel par rapport à reference"""
+    regressions = []
+    for nom, mesure in actuel['resultats'].items():
+        ancienne = reference.get('resultats', {}).get(nom)
+        if ancienne is None:
+            continue
+        for grandeur in _GRANDEURS:
+            avant = ancienne.get(grandeur)
+            apres = mesure.get(grandeur)
+            if avant is None or apres is None:
+                continue
+            if apres > avant * (1 + tolerance) + 1e-9:
+                regressions.append((nom, grandeur, avant, apres))
+    return regressions
+
+
+def _afficher(resultats):
+    entete = ('cas', 'I2C/appel', 'octets', 'LEDs', 'µs simulées', 'Hz',
+              'µs hôte', 'pic alloc')
+    print('%-24s %10s %8s %6s %12s %10s %9s %10s' % entete)
+    for nom, m in resultats['resultats'].items():
+        print('%-24s %10.2f %8.1f %6.2f %12.1f %10s %9.1f %10d' % (
+            nom, m['transactions_i2c'], m['octets_i2c'], m['envois_leds'],
+            m['temps_us'], m['cadence_hz'] or '-', m['cpu_hote_us'],
+            m['pic_alloc_octets']))
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m robotpi_sim.benchmark',
+                                     description="Banc de mesure robotPi")
+    parser.add_argument('--json', metavar='FICHIER', help="écrit les résultats en JSON")
+    parser.add_argument('--reference', metavar='FICHIER',
+                        help="compare à des résultats précédents (code 1 si régression)")
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help="hausse tolérée avant de signaler une régression (5 %%)")
+    parser.add_argument('--freq', type=int, default=100000, help="fréquence I2C (100 kHz)")
+    parser.add_argument('--cas', metavar='NOM', help="n'exécute que les cas contenant NOM")
+    options = parser.parse_args(arguments)
+
+    resultats = executer(options.freq, options.cas)
+    _afficher(resultats)
+    if options.json:
+        with open(options.json, 'w') as fichier:
+            json.dump(resultats, fichier, indent=2, sort_keys=True)
+    if options.reference:
+        with open(options.reference) as fichier:
+            regressions = comparer(json.load(fichier), resultats, options.tolerance)
+        for nom, grandeur, avant, apres in regressions:
+            print('⚠ %s : %s %.2f -> %.2f' % (nom, grandeur, avant, apres))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+État de la carte simulée : horloge, broches, sorties PWM, bus I2C et LEDs.
+
+Les modules machine et neopixel simulés lisent et écrivent tous dans la
+carte active (``carte.active``), créée par ``robotpi_sim.installer()``.
+"""
+
+from .horloge import Horloge
+
+active = None
+
+# front montant / descendant (mêmes valeurs que machine.Pin sur rp2)
+IRQ_DESCENDANT = 4
+IRQ_MONTANT = 8
+
+
+class Broche:
+    """État électrique d'une broche GPIO"""
+
+    def __init__(self, numero):
+        self.numero = numero
+        self.sortie = False
+        self.niveau = 0
+        self.externe = None  # niveau imposé de l'extérieur (bouton, capteur)
+        self.tirage = None
+        self.gestionnaire = None
+        self.declencheur = 0
+        self.observateurs = []  # fonctions(broche) appelées à chaque changement
+
+    def lire(self):
+        if self.externe is not None and not self.sortie:
+            return self.externe
+        return self.niveau
+
+    def ecrire(self, niveau):
+        avant = self.lire()
+        self.niveau = 1 if niveau else 0
+        self._front(avant)
+
+    def forcer(self, niveau):
+        """Impose un niveau de l'extérieur (None : relâche la broche)"""
+        avant = self.lire()
+        self.externe = None if niveau is None else (1 if niveau else 0)
+        self._front(avant)
+
+    def _front(self, avant):
+        apres = self.lire()
+        for observateur in self.observateurs:
+            observateur(self)
+        if self.gestionnaire is None or apres == avant:
+            return
+        if (apres and self.declencheur & IRQ_MONTANT
+                or not apres and self.declencheur & IRQ_DESCENDANT):
+            self.gestionnaire(self.objet)
+
+
+class BusI2C:
+    """Bus I2C : périphériques et compteurs de trafic.
+
+    Plusieurs périphériques peuvent partager une adresse tant qu'un seul
+    est actif (capteurs tenus en reset par XSHUT).
+
+    bloquer() simule un esclave qui maintient SDA à l'état bas : chaque
+    transaction attend alors le timeout du contrôleur puis échoue avec
+    OSError(ETIMEDOUT), jusqu'à ce que des impulsions sur SCL (broches
+    données à I2C(scl=..., sda=...)) libèrent le bus.
+    """
+
+    def __init__(self, carte, identifiant):
+        self.carte = carte
+        self.identifiant = identifiant
+        self.peripheriques = []
+        self.transactions = 0
+        self.octets = 0
+        self.erreurs = 0  # transactions échouées sur un bus bloqué
+        self.bloque = 0   # impulsions SCL restantes avant que SDA soit relâchée
+        self.scl = self.sda = None
+        self._niveau_scl = 1
+
+    def relier(self, scl, sda):
+        """Broches SCL et SDA du bus (numéros)"""
+        if self.scl is not None:
+            return
+        self.scl, self.sda = scl, sda
+        for numero in (scl, sda):
+            self.carte.broche(numero).niveau = 1  # résistances de tirage
+        self.carte.broche(scl).observateurs.append(self._horloge_scl)
+
+    def bloquer(self, impulsions=3):
+        """Bloque le bus jusqu'à impulsions fronts montants sur SCL"""
+        self.bloque = impulsions
+        if self.sda is not None:
+            self.carte.broche(self.sda).forcer(0)
+
+    def _horloge_scl(self, broche):
+        niveau = broche.lire()
+        if niveau and not self._niveau_scl and self.bloque:
+            self.bloque -= 1
+            if not self.bloque and self.sda is not None:
+                self.carte.broche(self.sda).forcer(None)
+        self._niveau_scl = niveau
+
+    def verifier(self, timeout_us):
+        """Échoue après timeout_us si le bus est bloqué"""
+        if self.bloque:
+            self.erreurs += 1
+            self.carte.horloge.avancer(timeout_us)
+            raise OSError(110)  # ETIMEDOUT
+
+    def ajouter(self, adresse, peripherique):
+        self.peripheriques.append(peripherique)
+        peripherique.adresse = adresse
+        peripherique.bus = self
+        return peripherique
+
+    def adresses(self):
+        """Adresses qui répondent (comme I2C.scan())"""
+        return sorted({p.adresse for p in self.peripheriques
+                       if getattr(p, 'actif', True)})
+
+    def peripherique(self, adresse):
+        for peripherique in self.peripheriques:
+            if peripherique.adresse == adresse and getattr(peripherique, 'actif', True):
+                return peripherique
+        raise OSError(5)  # EIO, comme MicroPython sans ACK
+
+    def compter(self, octets, freq):
+        # adresse + registre + données, 9 bits par octet
+        self.transactions += 1
+        self.octets += octets
+        self.carte.horloge.avancer((octets + 2) * 9 * 1000000 // freq)
+
+
+class Carte:
+    """Carte Raspberry Pi Pico simulée"""
+
+    def __init__(self, duree_max=None):
+        self.horloge = Horloge(duree_max)
+        self.broches = {}
+        self.pwm = {}
+        self.bus_i2c = {}
+        self.leds = []
+        self.timers = []
+
+    def broche(self, numero):
+        if numero not in self.broches:
+            self.broches[numero] = Broche(numero)
+        return self.broches[numero]
+
+    def bus(self, identifiant):
+        if identifiant not in self.bus_i2c:
+            self.bus_i2c[identifiant] = BusI2C(self, identifiant)
+        return self.bus_i2c[identifiant]
+
+    def rapport(self):
+        """Résumé de l'état de la carte"""
+        lignes = ["temps simulé : %.3f s" % (self.horloge.us / 1000000)]
+        for identifiant, bus in sorted(self.bus_i2c.items()):
+            lignes.append("I2C%s : %d transactions, %d octets"
+                          % (identifiant, bus.transactions, bus.octets)
+                          + (", %d erreurs" % bus.erreurs if bus.erreurs else ""))
+        for leds in self.leds:
+            lignes.append("LEDs : %d envois" % leds.envois)
+        return "\n".join(lignes)
@@ -0,0 +1,172 @@
+"""
+Horloge simulée : le temps n'avance que lorsque le programme attend
+(sleep) ou consomme du temps (transactions I2C, envoi vers les LEDs).
+Une attente d'une seconde prend donc quelques microsecondes réelles.
+"""
+
+import heapq
+import threading
+
+_TICKS_PERIODE = 1 << 30
+_TICKS_MASQUE = _TICKS_PERIODE - 1
+_TICKS_MOITIE = _TICKS_PERIODE // 2
+
+
+def ticks_diff(fin, debut):
+    """Différence signée entre deux valeurs de ticks (avec débordement)"""
+    return ((fin - debut + _TICKS_MOITIE) & _TICKS_MASQUE) - _TICKS_MOITIE
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MASQUE
+
+
+class FinSimulation(BaseException):
+    """Levée quand la durée maximale de simulation est atteinte.
+
+    Dérive de BaseException pour traverser les ``except Exception`` des
+    programmes simulés ; elle est relevée à chaque attente suivante pour
+    sortir aussi des ``except:`` nus.
+    """
+
+
+class _Coeur:
+    """Fil d'exécution simulé comme un cœur du RP2040"""
+
+    def __init__(self, ordre, reveil):
+        self.ordre = ordre
+        self.reveil = reveil  # instant simulé jusqu'auquel il attend
+
+
+class Horloge:
+    """Temps simulé en microsecondes avec une file d'événements.
+
+    Avec plusieurs cœurs (module _thread simulé), chaque cœur est un fil
+    CPython mais un seul s'exécute à la fois : celui dont l'attente se
+    termine le plus tôt (à égalité, le cœur 0). Un cœur ne rend donc la
+    main qu'en attendant ou en communiquant, comme si le code entre deux
+    attentes ne prenait aucun temps.
+    """
+
+    def __init__(self, duree_max=None, pas_us=10000):
+        self.us = 0
+        self.duree_max_us = None if duree_max is None else int(duree_max * 1000000)
+        self.pas_us = pas_us  # pas maximal d'intégration des observateurs
+        self._evenements = []
+        self._numero = 0
+        self._observateurs = []
+        self._coeurs = []  # vide tant qu'un seul fil s'exécute
+        self._courant = None
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+    # === Planification ===
+
+    def programmer(self, delai_us, fonction):
+        """Appelle fonction() dans delai_us microsecondes simulées"""
+        self._numero += 1
+        evenement = [self.us + max(0, int(delai_us)), self._numero, fonction]
+        heapq.heappush(self._evenements, evenement)
+        return evenement
+
+    def annuler(self, evenement):
+        """Annule un événement retourné par programmer()"""
+        evenement[2] = None
+
+    def observer(self, fonction):
+        """fonction(dt_us) est appelée à chaque avancée du temps"""
+        self._observateurs.append(fonction)
+
+    # === Avancée du temps ===
+
+    def _integrer(self, jusqu_a):
+        while self.us < jusqu_a:
+            dt = min(self.pas_us, jusqu_a - self.us)
+            self.us += dt
+            for observateur in self._observateurs:
+                observateur(dt)
+
+    def avancer(self, us):
+        """Fait avancer le temps en exécutant les événements échus"""
+        coeur = getattr(self._local, 'coeur', None)
+        if coeur is None:
+            self._avancer(us)
+            return
+        with self._condition:
+            coeur.reveil = self.us + max(0, int(us))
+            self._elire()
+            while self._courant is not coeur:
+                self._condition.wait()
+            self._avancer(coeur.reveil - self.us)
+            coeur.reveil = self.us
+
+    def _avancer(self, us):
+        cible = self.us + max(0, int(us))
+        while self._evenements and self._evenements[0][0] <= cible:
+            quand, _, fonction = heapq.heappop(self._evenements)
+            self._integrer(quand)
+            if fonction is not None:
+                fonction()
+        self._integrer(cible)
+        self.verifier()
+
+    def verifier(self):
+        if self.duree_max_us is not None and self.us >= self.duree_max_us:
+            raise FinSimulation()
+
+    # === Plusieurs cœurs ===
+
+    def nouveau_coeur(self):
+        """Déclare un fil supplémentaire ; il devra appeler entrer(coeur)
+        avant de s'exécuter et sortir() à la fin"""
+        with self._condition:
+            if not self._coeurs:
+                principal = _Coeur(0, self.us)
+                self._local.coeur = principal
+                self._coeurs.append(principal)
+                self._courant = principal
+            coeur = _Coeur(max(c.ordre for c in self._coeurs) + 1, self.us)
+            self._coeurs.append(coeur)
+        return coeur
+
+    def entrer(self, coeur):
+        """Attend, dans le fil du cœur, qu'il soit son tour de s'exécuter"""
+        self._local.coeur = coeur
+        with self._condition:
+            while self._courant is not coeur:
+                self._condition.wait()
+
+    def sortir(self):
+        """Le fil du cœur courant se termine : la main passe au suivant"""
+        with self._condition:
+            self._coeurs.remove(self._local.coeur)
+            self._local.coeur = None
+            self._elire()
+
+    def _elire(self):
+        self._courant = min(self._coeurs, key=lambda c: (c.reveil, c.ordre),
+                            default=None)
+        self._condition.notify_all()
+
+    # === Interface du module time de MicroPython ===
+
+    def sleep(self, secondes):
+        self.avancer(secondes * 1000000)
+
+    def sleep_ms(self, ms):
+        self.avancer(ms * 1000)
+
+    def sleep_us(self, us):
+        self.avancer(us)
+
+    def ticks_us(self):
+        # chaque lecture coûte 1 µs : une boucle d'attente active se termine
+        self.avancer(1)
+        return self.us & _TICKS_MASQUE
+
+    def ticks_ms(self):
+        self.avancer(1)
+        return (self.us // 1000) & _TICKS_MASQUE
+
+    def ticks_cpu(self):
+        return self.ticks_us()
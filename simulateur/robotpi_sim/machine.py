@@ -0,0 +1,196 @@
+"""
+Module machine simulé : Pin, PWM, I2C, Timer et fonctions de la carte.
+"""
+
+from . import carte as _carte
+
+
+def _active():
+    if _carte.active is None:
+        raise RuntimeError("simulateur non installé : appelez robotpi_sim.installer()")
+    return _carte.active
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    ALT = 3
+    ALT_I2C = 3
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = _carte.IRQ_DESCENDANT
+    IRQ_RISING = _carte.IRQ_MONTANT
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self._broche = _active().broche(id)
+        self.init(mode, pull, value)
+
+    def init(self, mode=-1, pull=-1, value=None, alt=-1):
+        broche = self._broche
+        if mode != -1:
+            sortie = mode in (Pin.OUT, Pin.OPEN_DRAIN)
+            if sortie != broche.sortie:
+                avant = broche.lire()
+                broche.sortie = sortie
+                broche._front(avant)
+        if pull != -1:
+            broche.tirage = pull
+            if pull == Pin.PULL_UP and broche.externe is None:
+                broche.niveau = 1
+        if value is not None:
+            broche.ecrire(value)
+
+    def value(self, x=None):
+        if x is None:
+            return self._broche.lire()
+        self._broche.ecrire(x)
+
+    __call__ = value
+
+    def on(self):
+        self._broche.ecrire(1)
+
+    def off(self):
+        self._broche.ecrire(0)
+
+    high = on
+    low = off
+
+    def toggle(self):
+        self._broche.ecrire(not self._broche.niveau)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        broche = self._broche
+        broche.gestionnaire = handler
+        broche.declencheur = trigger
+        broche.objet = self
+
+    def __repr__(self):
+        return "Pin(%r)" % (self.id,)
+
+
+class PWM:
+    def __init__(self, dest, freq=None, duty_u16=None):
+        self.numero = dest.id
+        self._freq = 1000
+        self._duty = 0
+        _active().pwm[self.numero] = self
+        if freq is not None:
+            self.freq(freq)
+        if duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def freq(self, valeur=None):
+        if valeur is None:
+            return self._freq
+        self._freq = valeur
+
+    def duty_u16(self, valeur=None):
+        if valeur is None:
+            return self._duty
+        if not 0 <= valeur <= 65535:
+            raise ValueError("duty_u16 hors limites")
+        self._duty = int(valeur)
+
+    def deinit(self):
+        self._duty = 0
+
+
+class I2C:
+    def __init__(self, id=0, scl=None, sda=None, freq=400000, timeout=50000):
+        self.id = id
+        self.freq = freq
+        self.timeout = timeout  # µs, attente maximale d'un bus bloqué
+        self._bus = _active().bus(id)
+        if scl is not None and sda is not None:
+            self._bus.relier(scl.id, sda.id)
+
+    def scan(self):
+        self._bus.verifier(self.timeout)
+        return self._bus.adresses()
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        self._bus.verifier(self.timeout)
+        donnees = bytes(self._bus.peripherique(addr).lire(memaddr, nbytes))
+        self._bus.compter(nbytes, self.freq)
+        return donnees
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        self._bus.verifier(self.timeout)
+        buf[:] = self._bus.peripherique(addr).lire(memaddr, len(buf))
+        self._bus.compter(len(buf), self.freq)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self._bus.verifier(self.timeout)
+        self._bus.peripherique(addr).ecrire(memaddr, bytes(buf))
+        self._bus.compter(len(buf), self.freq)
+
+
+SoftI2C = I2C
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self._evenement = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None, tick_hz=1000, hard=False):
+        self.deinit()
+        if freq > 0:
+            periode_us = 1000000 // freq
+        else:
+            periode_us = period * 1000000 // tick_hz
+        self._periode_us = max(1, periode_us)
+        self._mode = mode
+        self._callback = callback
+        self._programmer()
+        _active().timers.append(self)
+
+    def _programmer(self):
+        self._evenement = _active().horloge.programmer(self._periode_us, self._tick)
+
+    def _tick(self):
+        if self._mode == Timer.PERIODIC:
+            self._programmer()
+        else:
+            self._evenement = None
+        if self._callback is not None:
+            self._callback(self)
+
+    def deinit(self):
+        if self._evenement is not None:
+            _active().horloge.annuler(self._evenement)
+            self._evenement = None
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
+
+
+def freq(hz=None):
+    return 125000000
+
+
+def unique_id():
+    return b'\xe6\x61\x38\x52\x83\x4b\x2c\x2d'
+
+
+def idle():
+    _active().horloge.avancer(1)
+
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+soft_reset = reset
@@ -0,0 +1,48 @@
+"""
+Module micropython simulé : const, décorateurs d'émetteurs et schedule.
+"""
+
+
+def const(valeur):
+    return valeur
+
+
+def native(fonction):
+    return fonction
+
+
+def viper(fonction):
+    return fonction
+
+
+def asm_thumb(fonction):
+    raise NotImplementedError("asm_thumb n'est pas simulé")
+
+
+def schedule(fonction, argument):
+    # pas de file : la fonction est exécutée immédiatement
+    fonction(argument)
+
+
+def alloc_emergency_exception_buf(taille):
+    pass
+
+
+def opt_level(niveau=None):
+    return 0
+
+
+def mem_info(verbose=False):
+    print("mem_info : non disponible dans le simulateur")
+
+
+def heap_lock():
+    return 0
+
+
+def heap_unlock():
+    return 0
+
+
+def kbd_intr(caractere):
+    pass
@@ -0,0 +1,46 @@
+"""
+Module neopixel simulé : même tampon et même ordre GRB que la
+bibliothèque MicroPython, l'envoi coûte le temps du protocole WS2812.
+"""
+
+from . import carte as _carte
+
+
+class NeoPixel:
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, pin, n, bpp=3, timing=1):
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+        self.envois = 0
+        self.image = bytes(self.buf)  # dernier contenu envoyé
+        _carte.active.leds.append(self)
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, i, v):
+        offset = i * self.bpp
+        for j in range(self.bpp):
+            self.buf[offset + self.ORDER[j]] = v[j]
+
+    def __getitem__(self, i):
+        offset = i * self.bpp
+        return tuple(self.buf[offset + self.ORDER[j]] for j in range(self.bpp))
+
+    def fill(self, v):
+        for i in range(self.n):
+            self[i] = v
+
+    def write(self):
+        self.envois += 1
+        self.image = bytes(self.buf)
+        # 1,25 µs par bit + 50 µs de reset
+        _carte.active.horloge.avancer(len(self.buf) * 8 * 5 // 4 + 50)
+
+    def couleurs(self):
+        """Couleurs (r, g, b) envoyées lors du dernier write()"""
+        return [tuple(self.image[i * self.bpp + self.ORDER[j]] for j in range(3))
+                for i in range(self.n)]
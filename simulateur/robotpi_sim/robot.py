@@ -0,0 +1,148 @@
+"""
+Modèle cinématique d'un robot à deux roues différentielles dans une arène.
+
+Les vitesses des roues sont déduites des sorties PWM et des broches de
+sens du TB6612FNG simulé, avec un temps de réponse du premier ordre pour
+les moteurs. La position est intégrée à chaque avancée de l'horloge, et
+les encodeurs éventuels produisent les fronts des voies A et B.
+"""
+
+import math
+
+
+class Monde:
+    """Arène rectangulaire (en mètres) avec des obstacles en segments"""
+
+    def __init__(self, largeur=2.0, hauteur=2.0):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.segments = [
+            (0.0, 0.0, largeur, 0.0),
+            (largeur, 0.0, largeur, hauteur),
+            (largeur, hauteur, 0.0, hauteur),
+            (0.0, hauteur, 0.0, 0.0),
+        ]
+
+    def ajouter_obstacle(self, x1, y1, x2, y2):
+        """Ajoute un mur entre (x1, y1) et (x2, y2)"""
+        self.segments.append((x1, y1, x2, y2))
+
+    def ajouter_boite(self, x, y, cote=0.1):
+        """Ajoute une boîte carrée centrée en (x, y)"""
+        d = cote / 2
+        coins = [(x - d, y - d), (x + d, y - d), (x + d, y + d), (x - d, y + d)]
+        for i in range(4):
+            (xa, ya), (xb, yb) = coins[i], coins[(i + 1) % 4]
+            self.ajouter_obstacle(xa, ya, xb, yb)
+
+    def distance(self, x, y, angle):
+        """Distance au premier obstacle dans la direction angle (None si aucun)"""
+        dx = math.cos(angle)
+        dy = math.sin(angle)
+        plus_proche = None
+        for x1, y1, x2, y2 in self.segments:
+            sx = x2 - x1
+            sy = y2 - y1
+            denominateur = dx * sy - dy * sx
+            if abs(denominateur) < 1e-12:
+                continue
+            t = ((x1 - x) * sy - (y1 - y) * sx) / denominateur
+            u = ((x1 - x) * dy - (y1 - y) * dx) / denominateur
+            if t >= 0 and 0 <= u <= 1 and (plus_proche is None or t < plus_proche):
+                plus_proche = t
+        return plus_proche
+
+
+class RobotDifferentiel:
+    """Robot RobotPi simulé, câblé comme le bloc d'initialisation Blockly"""
+
+    def __init__(self, carte, monde=None, pwm_g=0, in1_g=3, in2_g=2,
+                 pwm_d=1, in1_d=4, in2_d=5, stby=6, vitesse_max=0.3,
+                 entraxe=0.12, constante_temps=0.05, x=None, y=None, cap=0.0,
+                 avance_capteur=0.05, encodeurs=None, impulsions_par_tour=350,
+                 diametre_roue=0.065, rendements=(1.0, 1.0)):
+        self.carte = carte
+        self.monde = monde if monde is not None else Monde()
+        self.moteurs = ((pwm_g, in1_g, in2_g), (pwm_d, in1_d, in2_d))
+        self.stby = stby
+        self.vitesse_max = vitesse_max
+        self.entraxe = entraxe
+        self.constante_temps = constante_temps
+        self.x = self.monde.largeur / 2 if x is None else x
+        self.y = self.monde.hauteur / 2 if y is None else y
+        self.cap = cap
+        self.avance_capteur = avance_capteur
+        # vitesse réelle / vitesse nominale de chaque roue (moteurs inégaux)
+        self.rendements = rendements
+        # encodeurs : ((a_g, b_g), (a_d, b_d)), en quarts de période de A
+        self.encodeurs = encodeurs
+        self.quarts_par_metre = 4 * impulsions_par_tour / (math.pi * diametre_roue)
+        self._quarts = [0.0, 0.0]
+        self._etats = [0, 0]
+        if encodeurs is not None:
+            for a, b in encodeurs:
+                carte.broche(a).forcer(0)
+                carte.broche(b).forcer(0)
+        self.vitesses = [0.0, 0.0]  # vitesse des roues gauche et droite (m/s)
+        self.distance_parcourue = 0.0
+        self.collisions = 0
+        self._en_collision = False
+        carte.horloge.observer(self._integrer)
+
+    def _consigne(self, moteur):
+        pwm, in1, in2 = moteur
+        sortie = self.carte.pwm.get(pwm)
+        if sortie is None or not self.carte.broche(self.stby).lire():
+            return 0.0
+        a = self.carte.broche(in1).lire()
+        b = self.carte.broche(in2).lire()
+        sens = 1 if (b and not a) else -1 if (a and not b) else 0
+        return sens * sortie.duty_u16() / 65535 * self.vitesse_max
+
+    def _integrer(self, dt_us):
+        dt = dt_us / 1000000
+        alpha = min(1.0, dt / self.constante_temps) if self.constante_temps else 1.0
+        for i, moteur in enumerate(self.moteurs):
+            consigne = self._consigne(moteur) * self.rendements[i]
+            self.vitesses[i] += (consigne - self.vitesses[i]) * alpha
+        if self.encodeurs is not None:
+            self._encoder(dt)
+        gauche, droite = self.vitesses
+        v = (gauche + droite) / 2
+        self.cap = (self.cap + (droite - gauche) / self.entraxe * dt) % (2 * math.pi)
+        if v > 0:
+            devant = self.monde.distance(self.x, self.y, self.cap)
+            if devant is not None and devant < self.avance_capteur + v * dt:
+                # contact : le robot pousse contre l'obstacle sans avancer
+                if not self._en_collision:
+                    self.collisions += 1
+                self._en_collision = True
+                return
+        self._en_collision = False
+        self.x += v * math.cos(self.cap) * dt
+        self.y += v * math.sin(self.cap) * dt
+        self.distance_parcourue += abs(v) * dt
+
+    def _encoder(self, dt):
+        # séquence de Gray (A, B) : A mène B en marche avant
+        for i, (a, b) in enumerate(self.encodeurs):
+            self._quarts[i] += self.vitesses[i] * dt * self.quarts_par_metre
+            cible = math.floor(self._quarts[i])
+            while self._etats[i] != cible:
+                self._etats[i] += 1 if cible > self._etats[i] else -1
+                etat = self._etats[i] % 4
+                self.carte.broche(a).forcer(etat in (1, 2))
+                self.carte.broche(b).forcer(etat in (2, 3))
+
+    def distance_capteur_mm(self, angle=0.0):
+        """Distance vue par un capteur orienté de angle degrés par rapport à
+        l'avant du robot (None sans cible)"""
+        direction = self.cap + math.radians(angle)
+        x = self.x + self.avance_capteur * math.cos(direction)
+        y = self.y + self.avance_capteur * math.sin(direction)
+        distance = self.monde.distance(x, y, direction)
+        return None if distance is None else distance * 1000
+
+    def position(self):
+        """(x, y, cap en degrés)"""
+        return self.x, self.y, math.degrees(self.cap)
@@ -0,0 +1,121 @@
+"""
+Robot simulé derrière un pseudo-terminal : remplace le Pico branché en USB
+pour essayer le serveur de commandes et le client PC sans matériel.
+
+    python -m robotpi_sim.serie --encodeurs 10 11 12 13
+    # affiche le chemin du port, par exemple /dev/pts/5
+    python -m robotpi_client /dev/pts/5 ping
+
+Le temps simulé suit le temps réel : les moteurs tournent et le capteur
+mesure pendant que le client envoie ses commandes.
+"""
+
+import argparse
+import fcntl
+import math
+import os
+import pty
+import select
+import struct
+import sys
+import termios
+import time
+import tty
+
+from . import REPERTOIRE_LIBRAIRIE, FinSimulation, installer
+
+
+class _Sortie:
+    def __init__(self, fd):
+        self.fd = fd
+
+    def write(self, donnees):
+        os.write(self.fd, donnees)
+
+
+class PortSimule:
+    """Pseudo-terminal relié à un ServeurCommandes sur le robot simulé"""
+
+    def __init__(self, robot):
+        from robotPi.serveur import ServeurCommandes
+        self.maitre, self.esclave = pty.openpty()
+        tty.setraw(self.esclave)
+        self.chemin = os.ttyname(self.esclave)
+        self.serveur = ServeurCommandes(robot, sortie=_Sortie(self.maitre))
+
+    def servir(self, horloge, periode=0.005):
+        """Répond aux commandes jusqu'à FIN, en avançant l'horloge simulée
+        au rythme du temps réel"""
+        serveur = self.serveur
+        serveur.actif = True
+        precedent = time.monotonic()
+        while serveur.actif:
+            prets = select.select([self.maitre], [], [], periode)[0]
+            maintenant = time.monotonic()
+            horloge.avancer((maintenant - precedent) * 1000000)
+            precedent = maintenant
+            if prets:
+                serveur.traiter(os.read(self.maitre, 256))
+
+    def _en_attente(self):
+        # octets écrits par le serveur que le client n'a pas encore lus
+        taille = fcntl.ioctl(self.esclave, termios.FIONREAD, b'\0\0\0\0')
+        return struct.unpack('i', taille)[0]
+
+    def fermer(self, timeout=1.0):
+        """Ferme le port une fois la dernière réponse (à FIN) lue par le
+        client, ou après timeout secondes réelles"""
+        # time.sleep suit l'horloge simulée : select sert d'attente réelle
+        fin = time.monotonic() + timeout
+        while self._en_attente() and time.monotonic() < fin:
+            select.select([], [], [], 0.01)
+        os.close(self.maitre)
+        os.close(self.esclave)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m robotpi_sim.serie',
+                                     description="Robot simulé sur un pseudo-terminal")
+    parser.add_argument('--duree', type=float, default=None,
+                        help="durée simulée maximale en secondes (illimitée)")
+    parser.add_argument('--boite', type=float, nargs=2, action='append', default=[],
+                        metavar=('X', 'Y'), help="boîte de 10 cm en (X, Y) mètres")
+    parser.add_argument('--encodeurs', type=int, nargs=4, default=None,
+                        metavar=('A_G', 'B_G', 'A_D', 'B_D'),
+                        help="broches des voies A et B des encodeurs gauche et droit")
+    options = parser.parse_args(arguments)
+
+    robot = {'cap': math.radians(90)}
+    encodeurs = None
+    if options.encodeurs is not None:
+        a_g, b_g, a_d, b_d = options.encodeurs
+        encodeurs = robot['encodeurs'] = ((a_g, b_g), (a_d, b_d))
+    simulation = installer(options.duree, robot=robot)
+    for x, y in options.boite:
+        simulation.monde.ajouter_boite(x, y)
+
+    sys.path.insert(0, REPERTOIRE_LIBRAIRIE)
+    from machine import I2C
+    from robotPi import RobotPi
+    robot = RobotPi(pwm_g=0, in1_g=3, in2_g=2, pwm_d=1, in1_d=4, in2_d=5,
+                    stby_pin=6, led_pin=15, nb_leds=4, pin_bouton=14,
+                    i2c=I2C(0), fichier_calibration=None)
+    if encodeurs is not None:
+        robot.configurer_odometrie(encodeurs, 350)
+
+    port = PortSimule(robot)
+    print("port série simulé :", port.chemin, flush=True)
+    try:
+        port.servir(simulation.horloge)
+    except FinSimulation:
+        print("⏱ durée de simulation atteinte")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        port.fermer()
+    print(simulation.rapport())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
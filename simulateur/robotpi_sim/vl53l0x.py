@@ -0,0 +1,274 @@
+"""
+Modèle du VL53L0X au niveau registres.
+
+Le modèle répond à la séquence d'initialisation de robotPi (variable
+d'arrêt, informations SPAD, calibrations VHV et phase), respecte les
+modes de mesure unique, continue dos à dos et continue cadencée, et
+remplit le bloc de résultats (statut, taux de signal et d'ambiant,
+distance) à la fin de chaque conversion. La durée d'une conversion est
+calculée à partir du budget de temps programmé dans les registres.
+
+Avec une broche XSHUT, le capteur est en reset tant que la broche est
+pilotée à l'état bas, et redémarre à l'adresse 0x29 quand elle remonte
+(broche non pilotée : tirage au niveau haut, comme sur les modules).
+
+Avec bloque vrai, le capteur ne termine plus aucune conversion (firmware
+planté) jusqu'à ce que le pilote le réinitialise (écriture du registre
+0x89 au début de init()) ou qu'il soit remis à zéro par XSHUT.
+"""
+
+import math
+import random
+
+from . import carte as _carte
+
+_SYSRANGE_START = 0x00
+_SYSTEM_SEQUENCE = 0x01
+_MEASURE_PERIOD = 0x04
+_INTERRUPT_GPIO = 0x0a
+_INTERRUPT_CLEAR = 0x0b
+_RESULT_INTERRUPT_STATUS = 0x13
+_RESULT_RANGE_STATUS = 0x14
+_SIGNAL_RATE_LIMIT = 0x44
+_MSRC_TIMEOUT = 0x46
+_PRE_RANGE_VCSEL_PERIOD = 0x50
+_PRE_RANGE_TIMEOUT = 0x51
+_FINAL_RANGE_VCSEL_PERIOD = 0x70
+_FINAL_RANGE_TIMEOUT = 0x71
+_GPIO_MUX_ACTIVE_HIGH = 0x84
+_EXTSUP_HV = 0x89
+_I2C_ADDRESS = 0x8a
+_OSC_CALIBRATE = 0xf8
+_PAGE = 0xff
+
+PORTEE_MAX_MM = 8190  # valeur renvoyée sans cible
+STATUT_VALIDE = 11
+STATUT_PHASE = 4
+
+
+def _macro_period_ns(vcsel):
+    return (2304 * vcsel * 1655 + 500) // 1000
+
+
+def _mclks_us(mclks, vcsel):
+    return (mclks * _macro_period_ns(vcsel) + 500) // 1000
+
+
+def _decode_timeout(valeur):
+    return ((valeur & 0xff) << (valeur >> 8)) + 1
+
+
+class VL53L0XSimule:
+    """Capteur VL53L0X simulé, à ajouter sur un BusI2C"""
+
+    def __init__(self, distance=None, broche_gpio1=None, graine=0,
+                 spad_info=0x85, osc_calibrate=1000, identifiant=b'\xee\xaa\x10',
+                 broche_xshut=None, carte=None, carte_spad=b'\xff' * 6):
+        self.distance = distance if distance is not None else (lambda: 400.0)
+        self.broche_gpio1 = broche_gpio1
+        self.broche_xshut = broche_xshut
+        self.actif = True
+        self.bloque = False
+        self.adresse = 0x29
+        self.bus = None
+        self._hasard = random.Random(graine)
+        self._pages = {}
+        self._page = 0
+        self._continu = 0  # 0 : arrêt, 2 : dos à dos, 4 : cadencé
+        self._conversion = None
+        self.mesures = 0
+        self.calibrations = 0  # calibrations VHV et de phase effectuées
+        self._osc = osc_calibrate
+        self._spad_info = spad_info
+        self._carte_spad = bytes(carte_spad)  # SPAD utilisables (NVM)
+        self._identifiant = identifiant
+        self.reinitialiser()
+        if broche_xshut is not None:
+            broche = (carte or _carte.active).broche(broche_xshut)
+            broche.observateurs.append(self._xshut)
+            self._xshut(broche)
+
+    def _xshut(self, broche):
+        actif = bool(broche.lire()) if broche.sortie else True
+        if actif == self.actif:
+            return
+        self.actif = actif
+        self.reinitialiser()  # arrêt des mesures, registres à l'état initial
+
+    def reinitialiser(self):
+        """Remet les registres dans leur état à la mise sous tension"""
+        self._pages = {}
+        self._page = 0
+        self._continu = 0
+        self.bloque = False
+        if self._conversion is not None:
+            self._horloge().annuler(self._conversion)
+            self._conversion = None
+        p0 = self._registres(0)
+        p0[0xb0:0xb6] = self._carte_spad  # carte SPAD de référence
+        p0[0xc0:0xc0 + len(self._identifiant)] = self._identifiant
+        p0[_OSC_CALIBRATE] = self._osc >> 8
+        p0[_OSC_CALIBRATE + 1] = self._osc & 0xff
+        p0[_PRE_RANGE_VCSEL_PERIOD] = 0x06
+        p0[_FINAL_RANGE_VCSEL_PERIOD] = 0x04
+        p0[_SIGNAL_RATE_LIMIT:_SIGNAL_RATE_LIMIT + 2] = b'\x00\x20'
+        p0[_SYSTEM_SEQUENCE] = 0xe8
+        p0[_I2C_ADDRESS] = 0x29
+        self.adresse = 0x29
+        self._registres(1)[0x91] = 0x3c  # variable d'arrêt
+        self._registres(7)[0x92] = self._spad_info
+        self._relacher_gpio()
+
+    def _horloge(self):
+        return _carte.active.horloge
+
+    def _registres(self, page):
+        if page not in self._pages:
+            self._pages[page] = bytearray(256)
+        return self._pages[page]
+
+    # === Accès I2C ===
+
+    def lire(self, registre, n):
+        if registre == _PAGE:
+            return bytes([self._page]) + bytes(n - 1)
+        registres = self._registres(self._page)
+        return bytes(registres[(registre + i) & 0xff] for i in range(n))
+
+    def ecrire(self, registre, donnees):
+        for i, octet in enumerate(donnees):
+            self._ecrire_octet((registre + i) & 0xff, octet)
+
+    def _ecrire_octet(self, registre, octet):
+        if registre == _PAGE:
+            self._page = octet
+            return
+        registres = self._registres(self._page)
+        registres[registre] = octet
+        if self._page == 7 and registre == 0x83 and octet == 0x00:
+            # lecture des informations SPAD terminée après ~1 ms
+            self._horloge().programmer(1000, lambda: registres.__setitem__(0x83, 0x01))
+        if self._page != 0:
+            return
+        if registre == _SYSRANGE_START:
+            self._demarrer(octet)
+        elif registre == _INTERRUPT_CLEAR and octet & 0x01:
+            registres[_RESULT_INTERRUPT_STATUS] = 0
+            self._relacher_gpio()
+        elif registre == _I2C_ADDRESS:
+            self.adresse = octet & 0x7f
+        elif registre == _EXTSUP_HV:
+            self.bloque = False
+
+    # === Mesures ===
+
+    def budget_us(self):
+        """Budget de temps d'une mesure d'après les registres"""
+        p0 = self._registres(0)
+        sequence = p0[_SYSTEM_SEQUENCE]
+        pre_vcsel = (p0[_PRE_RANGE_VCSEL_PERIOD] + 1) << 1
+        final_vcsel = (p0[_FINAL_RANGE_VCSEL_PERIOD] + 1) << 1
+        msrc_us = _mclks_us(p0[_MSRC_TIMEOUT] + 1, pre_vcsel)
+        pre_mclks = _decode_timeout((p0[_PRE_RANGE_TIMEOUT] << 8) | p0[_PRE_RANGE_TIMEOUT + 1])
+        final_mclks = _decode_timeout((p0[_FINAL_RANGE_TIMEOUT] << 8) | p0[_FINAL_RANGE_TIMEOUT + 1])
+        budget = 1910 + 960
+        if sequence & 0x10:
+            budget += msrc_us + 590
+        if sequence & 0x08:
+            budget += 2 * (msrc_us + 690)
+        elif sequence & 0x04:
+            budget += msrc_us + 660
+        if sequence & 0x40:
+            budget += _mclks_us(pre_mclks, pre_vcsel) + 660
+            final_mclks -= pre_mclks
+        if sequence & 0x80:
+            budget += _mclks_us(final_mclks, final_vcsel) + 550
+        return max(budget, 1000)
+
+    def _demarrer(self, octet):
+        p0 = self._registres(0)
+        p0[_SYSRANGE_START] = 0  # la mesure démarre aussitôt
+        if octet & 0x02 or octet & 0x04:
+            self._continu = octet & 0x06
+            self._programmer_conversion(self.budget_us())
+        elif self._continu:
+            # écrire 0x01 en mode continu arrête les mesures
+            self._continu = 0
+            if self._conversion is not None:
+                self._horloge().annuler(self._conversion)
+                self._conversion = None
+        elif octet & 0x01:
+            # mesure unique ou calibration (VHV si bit 6, phase si
+            # seule l'étape de pré-mesure est active)
+            if octet & 0x40:
+                p0[0xcb] = 0x1c
+                self.calibrations += 1
+            elif p0[_SYSTEM_SEQUENCE] == 0x02:
+                p0[0xee] = (p0[0xee] & 0x80) | 0x0d
+                self.calibrations += 1
+            duree = 5000 if octet & 0xc0 else self.budget_us()
+            self._programmer_conversion(duree)
+
+    def _programmer_conversion(self, duree_us):
+        if self._conversion is not None:
+            self._horloge().annuler(self._conversion)
+        self._conversion = self._horloge().programmer(duree_us, self._fin_conversion)
+
+    def _periode_us(self):
+        p0 = self._registres(0)
+        periode = int.from_bytes(bytes(p0[_MEASURE_PERIOD:_MEASURE_PERIOD + 4]), 'big')
+        osc = (p0[_OSC_CALIBRATE] << 8) | p0[_OSC_CALIBRATE + 1]
+        if osc:
+            periode //= osc
+        return periode * 1000
+
+    def _fin_conversion(self):
+        self._conversion = None
+        if self.bloque:
+            return
+        self.mesures += 1
+        self._ecrire_resultat()
+        if self._continu == 0x02:
+            self._programmer_conversion(self.budget_us())
+        elif self._continu == 0x04:
+            self._programmer_conversion(max(self.budget_us(), self._periode_us()))
+
+    def _ecrire_resultat(self):
+        p0 = self._registres(0)
+        distance = self.distance()
+        limite = ((p0[_SIGNAL_RATE_LIMIT] << 8) | p0[_SIGNAL_RATE_LIMIT + 1]) / 128
+        if distance is None or distance <= 0:
+            signal = 0.0
+        else:
+            signal = min(40.0, 5e5 / (distance * distance))
+        if signal < max(limite, 0.01):
+            statut = STATUT_PHASE
+            mesure = PORTEE_MAX_MM
+        else:
+            # bruit plus fort pour un budget court et une cible lointaine
+            sigma = 3 * math.sqrt(33000 / self.budget_us()) + 0.01 * distance
+            mesure = int(max(0, min(PORTEE_MAX_MM - 1, self._hasard.gauss(distance, sigma))))
+            statut = STATUT_VALIDE
+        ambiant = 0.3
+        resultat = p0[_RESULT_RANGE_STATUS:_RESULT_RANGE_STATUS + 12]
+        resultat[0] = (statut << 3) | 0x01
+        resultat[2:4] = (10 << 8).to_bytes(2, 'big')  # SPAD effectifs (8.8)
+        resultat[6:8] = int(signal * 128).to_bytes(2, 'big')
+        resultat[8:10] = int(ambiant * 128).to_bytes(2, 'big')
+        resultat[10:12] = mesure.to_bytes(2, 'big')
+        p0[_RESULT_RANGE_STATUS:_RESULT_RANGE_STATUS + 12] = resultat
+        p0[_RESULT_INTERRUPT_STATUS] = p0[_INTERRUPT_GPIO] & 0x07 or 0x04
+        self._activer_gpio()
+
+    # === Sortie GPIO1 ===
+
+    def _actif_haut(self):
+        return bool(self._registres(0)[_GPIO_MUX_ACTIVE_HIGH] & 0x10)
+
+    def _activer_gpio(self):
+        if self.broche_gpio1 is not None and self._registres(0)[_INTERRUPT_GPIO] & 0x07:
+            _carte.active.broche(self.broche_gpio1).forcer(1 if self._actif_haut() else 0)
+
+    def _relacher_gpio(self):
+        if self.broche_gpio1 is not None and _carte.active is not None:
+            _carte.active.broche(self.broche_gpio1).forcer(0 if self._actif_haut() else 1)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+# robotpi_sim et robotpi_client sont importés depuis le dossier simulateur/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import robotpi_sim  # noqa: E402
+
+if robotpi_sim.REPERTOIRE_LIBRAIRIE not in sys.path:
+    sys.path.insert(0, robotpi_sim.REPERTOIRE_LIBRAIRIE)
+
+
+@pytest.fixture
+def simulation(monkeypatch, tmp_path):
+    """Installe une simulation (options de robotpi_sim.installer) dans un
+    dossier temporaire et la retire à la fin du test"""
+    monkeypatch.chdir(tmp_path)
+
+    def installer(duree_max=60, **options):
+        return robotpi_sim.installer(duree_max, **options)
+
+    yield installer
+    robotpi_sim.desinstaller()
+
+
+@pytest.fixture
+def robot(simulation):
+    """RobotPi câblé comme le bloc d'initialisation, sans fichier de
+    calibration ; robot.sim est la simulation"""
+    def creer(options_simulation=None, **options):
+        sim = simulation(**(options_simulation or {}))
+        from machine import I2C, Pin
+        from robotPi import RobotPi
+        parametres = dict(pwm_g=0, in1_g=3, in2_g=2, pwm_d=1, in1_d=4, in2_d=5,
+                          stby_pin=6, led_pin=15, nb_leds=4, pin_bouton=14,
+                          i2c=I2C(0, scl=Pin(9), sda=Pin(8)), broches_i2c=(9, 8),
+                          fichier_calibration=None)
+        parametres.update(options)
+        robot = RobotPi(**parametres)
+        robot.sim = sim
+        return robot
+    return creer
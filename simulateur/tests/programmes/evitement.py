@@ -0,0 +1,29 @@
+# Initialisation du robot
+from robotPi import RobotPi
+from machine import Pin, I2C
+import time
+import sys
+
+# Initialiser l'I2C (ajustez les pins selon votre configuration)
+i2c = I2C(0,scl=Pin(9), sda=Pin(8), freq=100000)
+
+# Configuration
+robot = RobotPi(
+    pwm_g=0, in1_g=3, in2_g=2,
+    pwm_d=1, in1_d=4, in2_d=5,
+    stby_pin=6, led_pin=15, nb_leds=4,
+    pin_bouton=14, i2c=i2c, broches_i2c=(9, 8),
+    cache_capteurs_ms=100  # une mesure par tour de boucle (robot.actualiser())
+)
+
+time.sleep(2)  # Attente de 2 secondes pour la mise en route
+
+robot.attendre_bouton_start()
+while True:
+  robot.actualiser()
+  if robot.obstacle_detecte():
+    robot.eviter_obstacle()
+  else:
+    robot.avancer()
+  if robot.arreter_si_bouton():
+      break
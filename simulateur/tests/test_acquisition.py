@@ -0,0 +1,109 @@
+"""
+Acquisition des distances sur le cœur 1 (robotPi.acquisition)
+"""
+
+import time
+
+import pytest
+
+
+@pytest.fixture
+def acquisition(robot):
+    """Robot avec l'acquisition sur le cœur 1 et une cible à 250 mm"""
+    r = robot(acquisition_coeur1=True)
+    r.sim.capteur.distance = lambda: 250.0
+    return r
+
+
+def test_distance_fraiche(acquisition):
+    a = acquisition.acquisition
+    assert a.en_marche
+    time.sleep_ms(200)
+    assert a.distance() == pytest.approx(250, abs=25)
+    numero = a.numero
+    assert numero > 0 and a.statut == 11
+    time.sleep_ms(200)
+    a.distance()
+    assert a.numero > numero
+    assert acquisition.lire_distance() == pytest.approx(250, abs=25)
+
+
+def test_distance_perimee(acquisition):
+    a = acquisition.acquisition
+    time.sleep_ms(100)
+    a.arreter()
+    assert a.distance() is not None
+    time.sleep_ms(a.age_max_ms // 2)
+    assert a.distance() is not None
+    time.sleep_ms(a.age_max_ms // 2 + 10)
+    assert a.distance() is None
+    assert a.numero > 0  # la dernière mesure reste numérotée
+
+
+def test_aucune_mesure_avant_la_premiere(robot):
+    from robotPi.acquisition import AcquisitionCoeur1
+    r = robot()
+    a = AcquisitionCoeur1([r.capteur_distance])
+    assert a.distance() is None and a.numero == 0
+
+
+def test_erreur_i2c_remise_en_etat(acquisition):
+    a = acquisition.acquisition
+    capteur = acquisition.capteur_distance
+    time.sleep_ms(100)
+    acquisition.sim.programmer_panne(0.05 + time.ticks_ms() / 1000, 'bus')
+    time.sleep_ms(500)
+    assert a.erreurs >= 1 and capteur.errors >= 1
+    assert capteur.recoveries >= 1 and capteur.retries >= 1
+    # bus débloqué par clear_bus : les mesures reprennent
+    numero = (a.distance(), a.numero)[1]
+    time.sleep_ms(200)
+    assert a.distance() == pytest.approx(250, abs=25)
+    assert a.numero > numero
+    assert a.en_marche
+
+
+def test_capteur_muet_remis_en_etat(acquisition):
+    a = acquisition.acquisition
+    capteur = acquisition.capteur_distance
+    time.sleep_ms(100)
+    acquisition.sim.programmer_panne(time.ticks_ms() / 1000, 'capteur')
+    time.sleep_ms(capteur.read_timeout_ms() + 300)
+    assert capteur.timeouts >= 1 and capteur.recoveries >= 1
+    assert a.distance() == pytest.approx(250, abs=25)
+
+
+def _figer(capteur_simule):
+    # plus aucune conversion ne se termine, même après réinitialisation :
+    # chaque attente de la remise en état va jusqu'à son échéance
+    capteur_simule._fin_conversion = lambda: None
+
+
+def _arreter(robot):
+    capteur = robot.capteur_distance
+    a = robot.acquisition
+    debut = time.ticks_ms()
+    robot.arreter_acquisition()
+    duree = time.ticks_diff(time.ticks_ms(), debut)
+    assert not a.en_marche and robot.acquisition is None
+    assert duree <= capteur.recover_timeout_ms() + capteur.read_timeout_ms()
+
+
+@pytest.mark.parametrize('retard_ms', [0, 5, 60])
+def test_arreter_apres_une_erreur_i2c(acquisition, retard_ms):
+    time.sleep_ms(100)
+    acquisition.sim.programmer_panne(time.ticks_ms() / 1000, 'bus')
+    time.sleep_ms(retard_ms)
+    _arreter(acquisition)
+    # le bus est de nouveau au cœur 0
+    assert acquisition.lire_distance() == pytest.approx(250, abs=25)
+
+
+@pytest.mark.parametrize('retard_ms', [150, 600, 1500, 2500])
+def test_arreter_pendant_une_remise_en_etat_qui_echoue(acquisition, retard_ms):
+    capteur = acquisition.capteur_distance
+    time.sleep_ms(100)
+    _figer(acquisition.sim.capteur)
+    time.sleep_ms(retard_ms)
+    assert capteur.recoveries >= 1  # remise en état en cours sur le cœur 1
+    _arreter(acquisition)
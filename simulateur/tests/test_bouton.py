@@ -0,0 +1,102 @@
+"""
+Bouton sur interruption (robotPi.bouton) et arrêt d'urgence
+"""
+
+import time
+
+import pytest
+
+
+def _dans(secondes):
+    return time.ticks_ms() / 1000 + secondes
+
+
+def _evenements(bouton):
+    evenements = []
+    while True:
+        evenement = bouton.evenement()
+        if evenement is None:
+            return evenements
+        evenements.append(evenement)
+
+
+def test_anti_rebond(robot):
+    r = robot()
+    from robotPi.bouton import APPUI, RELACHE
+    r.sim.appuyer_bouton(_dans(0.1), duree=0.3, rebonds=4)
+    time.sleep_ms(600)
+    assert _evenements(r.bouton) == [APPUI, RELACHE]
+    # 4 allers-retours parasites par front : 4 changements d'état ignorés chacun
+    assert r.bouton.rebonds == 8
+
+
+def test_appui_long_signale_avant_le_relachement(robot):
+    r = robot()
+    from robotPi.bouton import APPUI, APPUI_LONG, RELACHE
+    r.sim.appuyer_bouton(_dans(0.1), duree=1.5)
+    time.sleep_ms(1200)
+    assert _evenements(r.bouton) == [APPUI, APPUI_LONG]
+    time.sleep_ms(500)
+    assert _evenements(r.bouton) == [RELACHE]
+
+
+def test_appuis_pendant_une_action_bloquante(robot):
+    r = robot()
+    r.sim.appuyer_bouton(_dans(0.2))
+    r.avancer_pendant(duree=1, vitesse=50)
+    assert r.arreter_si_bouton()
+    assert not r.arreter_si_bouton()
+
+
+def test_file_pleine(robot):
+    r = robot()
+    from robotPi.bouton import APPUI
+    for i in range(10):
+        r.sim.appuyer_bouton(_dans(0.1 + 0.2 * i), duree=0.1)
+    time.sleep_ms(2500)
+    assert r.bouton.perdus > 0
+    evenements = _evenements(r.bouton)
+    assert evenements[0] == APPUI and len(evenements) == 7  # taille de la file - 1
+
+
+@pytest.fixture
+def urgence(robot):
+    return robot(arret_urgence_bouton=True)
+
+
+def test_arret_urgence_dans_l_interruption(urgence):
+    r = urgence
+    r.avancer(80)
+    time.sleep_ms(100)
+    assert r.moteur_gauche.duty > 0
+    instant = _dans(0.05)
+    r.sim.appuyer_bouton(instant)
+    time.sleep_ms(60)
+    # arrêt au front, sans attendre que le programme lise le bouton
+    assert r.urgence
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
+    r.avancer(80)
+    r.mouvement(50, 50, 1)
+    time.sleep_ms(200)
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
+    r.rearmer()
+    r.avancer(80)
+    time.sleep_ms(100)
+    assert r.moteur_gauche.duty > 0
+
+
+def test_arret_urgence_pendant_une_file_de_mouvements(urgence):
+    r = urgence
+    r.mouvement(100, 100, 2)
+    r.mouvement(-100, 100, 2)
+    r.sim.appuyer_bouton(_dans(0.5))
+    time.sleep_ms(600)
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
+    # la file est arrêtée : le segment suivant ne démarre pas
+    time.sleep_ms(2000)
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
+    assert not r.file_mouvements.en_cours
+    r.rearmer()
+    r.mouvement(60, 60, 0.5)
+    time.sleep_ms(300)
+    assert r.moteur_gauche.duty > 0
@@ -0,0 +1,66 @@
+"""
+Calibration du VL53L0X en cache dans la flash (calibration_file)
+"""
+
+import pytest
+
+AUTRE_CARTE_SPAD = b'\xf7\xff\xfe\xff\xff\xff'
+
+
+@pytest.fixture
+def demarrer(simulation, tmp_path):
+    """Démarre un capteur (options du capteur simulé) avec le cache
+    tmp_path/vl53l0x_cal.bin ; retourne (pilote, capteur simulé)"""
+    import robotpi_sim
+    fichier = str(tmp_path / 'vl53l0x_cal.bin')
+
+    def demarrer(**capteur):
+        robotpi_sim.desinstaller()
+        sim = simulation()
+        if capteur:
+            # capteur remplacé à la même adresse
+            bus = sim.bus(0)
+            bus.peripheriques.clear()
+            sim.capteur = bus.ajouter(0x29, robotpi_sim.VL53L0XSimule(**capteur))
+        from machine import I2C
+        from robotPi.vl53l0x import VL53L0X
+        return VL53L0X(I2C(0), calibration_file=fichier), sim.capteur
+    demarrer.fichier = fichier
+    return demarrer
+
+
+def test_calibration_relue(demarrer):
+    pilote, capteur = demarrer()
+    assert not pilote.calibration_loaded and capteur.calibrations == 2
+    pilote, capteur = demarrer()
+    assert pilote.calibration_loaded and capteur.calibrations == 0
+    assert 0 < pilote.read() < 8190
+
+
+def test_capteur_remplace(demarrer):
+    demarrer()
+    pilote, capteur = demarrer(carte_spad=AUTRE_CARTE_SPAD)
+    # les SPAD de ce capteur ne donnent pas la carte enregistrée
+    assert not pilote.calibration_loaded and capteur.calibrations == 2
+    pilote, capteur = demarrer(carte_spad=AUTRE_CARTE_SPAD)
+    assert pilote.calibration_loaded
+    pilote, capteur = demarrer()
+    assert not pilote.calibration_loaded
+
+
+def test_fichier_corrompu(demarrer):
+    demarrer()
+    with open(demarrer.fichier, 'r+b') as f:
+        f.seek(-1, 2)
+        octet = f.read(1)[0]
+        f.seek(-1, 2)
+        f.write(bytes((octet ^ 0xff,)))
+    pilote, capteur = demarrer()
+    assert not pilote.calibration_loaded and capteur.calibrations == 2
+
+
+def test_recalibrer(demarrer):
+    demarrer()
+    pilote, capteur = demarrer()
+    pilote.init(recalibrate=True)
+    assert not pilote.calibration_loaded and capteur.calibrations == 2
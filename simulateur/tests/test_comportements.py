@@ -0,0 +1,104 @@
+"""
+Boucle de comportements réactifs (robotPi.comportements)
+"""
+
+import time
+
+import pytest
+
+
+@pytest.fixture
+def boucle(robot):
+    """Robot, cible réglable (mm, None : rien devant) et boucle Fuite,
+    Evitement, Croisiere démarrée pour des tick() à la main"""
+    r = robot()
+    cible = {'mm': None}
+    r.sim.capteur.distance = lambda: cible['mm']
+    from robotPi.comportements import Croisiere, Evitement, Fuite
+    b = r.comportements(Fuite(8, 40), Evitement(20, 50), Croisiere(70))
+    b.demarrer()
+    b.cible = cible
+
+    def ticks(duree_ms):
+        noms = []
+        fin = time.ticks_add(time.ticks_ms(), duree_ms)
+        while time.ticks_diff(fin, time.ticks_ms()) > 0:
+            choisi = b.tick()
+            noms.append(None if choisi is None else choisi.nom)
+            time.sleep_ms(b.periode_ms)
+        return noms
+    b.ticks_pendant = ticks
+    return b
+
+
+def test_priorites(boucle):
+    r = boucle.robot
+    assert boucle.ticks_pendant(200)[-1] == 'croisiere'
+    time.sleep_ms(300)
+    assert r.moteur_gauche.duty == r.moteur_droit.duty > 0
+
+    boucle.cible['mm'] = 150
+    assert boucle.ticks_pendant(200)[-1] == 'evitement'
+    time.sleep_ms(300)
+    assert r.moteur_gauche.duty > 0 > r.moteur_droit.duty
+
+    boucle.cible['mm'] = 50
+    assert boucle.ticks_pendant(200)[-1] == 'fuite'
+    time.sleep_ms(200)
+    assert r.moteur_gauche.duty < 0 and r.moteur_droit.duty < 0
+
+
+def test_hysteresis_et_duree_minimale_de_l_evitement(boucle):
+    boucle.cible['mm'] = 180
+    boucle.ticks_pendant(100)
+    boucle.cible['mm'] = 220  # au-dessus du seuil, sous seuil + hystérésis
+    assert set(boucle.ticks_pendant(300)) == {'evitement'}
+    boucle.cible['mm'] = 400
+    noms = boucle.ticks_pendant(300)
+    assert noms[-1] == 'croisiere'
+
+
+def test_fuite_recule_puis_fait_demi_tour(boucle):
+    boucle.ticks_pendant(100)
+    boucle.cible['mm'] = 50
+    boucle.ticks_pendant(100)
+    boucle.cible['mm'] = None  # plus rien devant : la manœuvre continue
+    noms = boucle.ticks_pendant(1200)  # 400 ms de recul, 600 de demi-tour
+    assert set(noms[:10]) == {'fuite'}
+    assert noms[-1] == 'croisiere'
+
+
+def test_temps_de_reaction_borne(boucle):
+    boucle.ticks_pendant(200)
+    apparition = time.ticks_ms()
+    boucle.cible['mm'] = 150
+    while boucle.tick().nom != 'evitement':
+        time.sleep_ms(boucle.periode_ms)
+    reaction = time.ticks_diff(time.ticks_ms(), apparition)
+    # la mesure en cours, la suivante (deux budgets de 33 ms) et un tick
+    assert reaction <= 2 * 33 + boucle.periode_ms
+
+
+def test_explorer_sans_collision(robot):
+    r = robot({'duree_max': 120})
+    r.sim.monde.ajouter_boite(1.5, 1.0)
+    r.sim.monde.ajouter_boite(0.6, 1.4)
+    b = r.explorer(seuil_cm=20, vitesse=60, duree=30)
+    simule = r.sim.robot
+    assert simule.collisions == 0
+    assert simule.distance_parcourue > 1.5
+    assert b.ticks >= 30000 // b.periode_ms * 0.95
+    assert b.retards <= b.ticks // 100
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
+
+
+def test_explorer_arrete_par_le_bouton(robot):
+    r = robot()
+    debut = time.ticks_ms()
+    r.sim.appuyer_bouton(debut / 1000 + 2)
+    b = r.explorer(duree=20)
+    duree = time.ticks_diff(time.ticks_ms(), debut)
+    assert 2000 <= duree <= 2000 + 2 * b.periode_ms
+    assert b.comportement.nom == 'arret_bouton'
+    time.sleep_ms(300)
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
@@ -0,0 +1,81 @@
+"""
+Enregistreur de vol (robotPi.enregistreur) et décodeur du PC
+(robotpi_client.enregistrement)
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def enregistreur(simulation):
+    simulation()
+    from robotPi.enregistreur import Enregistreur
+    return Enregistreur
+
+
+def _remplir(e, premier, nombre):
+    for i in range(premier, premier + nombre):
+        e.enregistrer(10 * i, 2 * i, -2 * i, r=i, bouton=i % 2, statut=11, marque=i)
+
+
+def _fichiers(nom='vol.rec'):
+    return sorted((f for f in os.listdir('.') if f.startswith(nom)), reverse=True)
+
+
+def test_aller_retour_avec_rotation(enregistreur):
+    from robotpi_client import enregistrement
+    # 4 enregistrements par bloc, changement de fichier tous les 4 blocs
+    e = enregistreur('vol.rec', taille_bloc=64, nb_blocs=4, taille_fichier=256,
+                     nb_fichiers=3)
+    _remplir(e, 0, 38)
+    assert e.blocs_ecrits == 9 and e.blocs_perdus == 0
+    e.fermer()
+    fichiers = _fichiers()
+    assert fichiers == ['vol.rec.2', 'vol.rec.1', 'vol.rec']
+
+    lignes = list(enregistrement.decoder(fichiers))
+    assert [l['marque'] for l in lignes] == list(range(38))
+    assert [l['distance_mm'] for l in lignes] == [10 * i for i in range(38)]
+    assert [l['duty_g'] for l in lignes] == [2 * i for i in range(38)]
+    assert [l['duty_d'] for l in lignes] == [-2 * i for i in range(38)]
+    assert [l['bouton'] for l in lignes] == [i % 2 for i in range(38)]
+    assert {l['statut_capteur'] for l in lignes} == {11}
+    assert {l['demarrage'] for l in lignes} == {0}
+
+
+def test_rotation_supprime_les_plus_anciens(enregistreur):
+    from robotpi_client import enregistrement
+    e = enregistreur('vol.rec', taille_bloc=64, nb_blocs=4, taille_fichier=256,
+                     nb_fichiers=2)
+    _remplir(e, 0, 40)
+    e.fermer()
+    assert _fichiers() == ['vol.rec.1', 'vol.rec']
+    marques = [l['marque'] for l in enregistrement.decoder(_fichiers())]
+    assert marques == list(range(16, 40))
+
+
+def test_debordement_compte_les_blocs_perdus(enregistreur):
+    from robotpi_client import enregistrement
+    e = enregistreur('vol.rec', taille_bloc=64, nb_blocs=4, ecriture_auto=False)
+    _remplir(e, 0, 40)  # 10 blocs pleins, 3 gardés dans le tampon
+    assert e.blocs_ecrits == 0
+    assert e.blocs_perdus == 7
+    e.vider()
+    assert e.blocs_ecrits == 3 and e.blocs_perdus == 7
+    _remplir(e, 40, 6)
+    e.fermer()  # bloc plein puis bloc incomplet
+    assert e.blocs_perdus == 7
+    marques = [l['marque'] for l in enregistrement.decoder(['vol.rec'])]
+    assert marques == list(range(28, 46))
+
+
+def test_ecriture_auto_par_bloc(enregistreur):
+    e = enregistreur('vol.rec', taille_bloc=64, nb_blocs=2)
+    _remplir(e, 0, 3)
+    assert e.blocs_ecrits == 0 and not os.path.exists('vol.rec')
+    _remplir(e, 3, 1)
+    assert e.blocs_ecrits == 1
+    assert os.path.getsize('vol.rec') == 16 + 64
+    e.fermer()
@@ -0,0 +1,89 @@
+"""
+Filtre des mesures de distance (robotPi.vl53l0x.FiltreDistance)
+"""
+
+import time
+
+import pytest
+
+VALIDE = 11
+PHASE = 4      # signal trop faible : rien devant le capteur
+SIGMA = 1      # statut invalide rejeté
+
+
+@pytest.fixture
+def filtre(simulation):
+    simulation()
+    from robotPi.vl53l0x import FiltreDistance
+    return FiltreDistance
+
+
+def test_mediane_ecarte_une_mesure_aberrante(filtre):
+    f = filtre(taille=5)
+    for d in (200, 202, 30, 201, 199):
+        valeur = f.ajouter(d)
+    assert valeur == 200
+
+
+@pytest.mark.parametrize('statut', [VALIDE, PHASE])
+def test_hors_de_portee_repousse_la_valeur(filtre, statut):
+    f = filtre(taille=5)
+    for _ in range(5):
+        f.ajouter(150)
+    assert f.sous_seuil(200, 230)
+    valeurs = [f.ajouter(8190, statut) for _ in range(3)]
+    # la médiane passe à la mesure lointaine dès que la fenêtre est majoritaire
+    assert valeurs[-1] == 8190
+    assert not f.sous_seuil(200, 230)
+    assert f.rejets == 0
+
+
+def test_moyenne_hors_de_portee(filtre):
+    f = filtre(mode='moyenne', alpha=0.5)
+    f.ajouter(150)
+    for _ in range(10):
+        f.ajouter(8190, PHASE)
+    assert f.valeur > 8000
+
+
+def test_rejets_successifs_oublient_la_valeur(filtre):
+    f = filtre(taille=5)
+    for _ in range(5):
+        f.ajouter(150)
+    assert f.sous_seuil(200, 230)
+    for _ in range(4):
+        assert f.ajouter(150, SIGMA) == 150  # rejets isolés : valeur gardée
+    assert f.ajouter(None) is None         # cinquième rejet de suite
+    assert not f.sous_seuil(200, 230)
+    assert f.rejets == 5
+    # une mesure valide interrompt la série et repart de zéro
+    assert f.ajouter(400) == 400
+
+
+def test_hysteresis(filtre):
+    f = filtre(taille=1)
+    assert not f.sous_seuil(200, 230)
+    f.ajouter(190)
+    assert f.sous_seuil(200, 230)
+    f.ajouter(220)                # entre les deux seuils : toujours présent
+    assert f.sous_seuil(200, 230)
+    f.ajouter(235)                # au-dessus du seuil de sortie : relâché
+    assert not f.sous_seuil(200, 230)
+    f.ajouter(220)                # entre les deux seuils : reste relâché
+    assert not f.sous_seuil(200, 230)
+
+
+def test_obstacle_relache_quand_la_cible_sort_de_portee(robot):
+    r = robot()
+    cible = [150.0]
+    r.sim.capteur.distance = lambda: cible[0]
+    r.configurer_filtre(taille=5)
+    for _ in range(6):
+        r.lire_distance()
+    assert r.obstacle_detecte(20)
+    cible[0] = 5000.0  # cible hors de portée du capteur
+    for _ in range(6):
+        r.lire_distance()
+        time.sleep_ms(5)
+    assert r.lire_distance() == 8190
+    assert not r.obstacle_detecte(20)
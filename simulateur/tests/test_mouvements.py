@@ -0,0 +1,53 @@
+"""
+File de mouvements (robotPi.moteurs.FileMouvements) et ses commandes RobotPi
+"""
+
+import time
+
+import pytest
+
+DUTY_MAX = 65535
+
+
+def test_rampe_puis_arret(robot):
+    r = robot()
+    r.mouvement(50, 50, 0.5, rampe=200)
+    time.sleep_ms(100)
+    # 200 %/s : environ 20 % après 100 ms, encore en accélération
+    assert 0.1 * DUTY_MAX < r.moteur_gauche.duty < 0.3 * DUTY_MAX
+    time.sleep_ms(300)
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == DUTY_MAX // 2
+    r.attendre_mouvements()
+    # fin du dernier segment temporisé : ralentissement jusqu'à l'arrêt
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
+    assert not r.file_mouvements.en_cours
+
+
+def test_segments_dans_l_ordre(robot):
+    r = robot()
+    r.mouvement(40, 40, 0.3, rampe=10000)
+    r.mouvement(-40, 40, 0.3, rampe=10000)
+    time.sleep_ms(200)
+    assert r.moteur_gauche.duty > 0 and r.moteur_droit.duty > 0
+    time.sleep_ms(300)
+    assert r.moteur_gauche.duty < 0 < r.moteur_droit.duty
+    r.attendre_mouvements()
+    assert r.moteur_gauche.duty == 0
+
+
+def test_attendre_apres_commande_directe(robot):
+    r = robot()
+    r.mouvement(50, 50, 0.2)
+    r.attendre_mouvements()
+    r.avancer(60)  # reprend la main sur la file
+    debut = time.ticks_ms()
+    r.attendre_mouvements()
+    assert time.ticks_diff(time.ticks_ms(), debut) < 50
+    assert r.moteur_gauche.duty == int(0.6 * DUTY_MAX)
+
+
+def test_file_pleine(robot):
+    r = robot()
+    with pytest.raises(RuntimeError):
+        for _ in range(20):
+            r.mouvement(10, 10, 1)
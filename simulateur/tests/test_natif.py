@@ -0,0 +1,222 @@
+"""
+Versions Python (_py) des boucles compilées de robotPi._natif
+
+Chaque version Python est comparée à une référence (le code d'avant la
+séparation, ou une formule directe) sur des valeurs courantes et limites,
+puis à la version compilée elle-même : le source de _natif.py est exécuté
+sous CPython avec des décorateurs neutres et un ptr8 qui tronque à l'octet
+comme viper.
+"""
+
+import ast
+import os
+import random
+import types
+
+import pytest
+
+import robotpi_sim
+
+SOURCE_NATIF = os.path.join(robotpi_sim.REPERTOIRE_LIBRAIRIE, 'robotPi', '_natif.py')
+
+
+class Ptr8:
+    """ptr8 de viper : lecture d'un octet, écriture tronquée à 8 bits"""
+
+    def __init__(self, tampon):
+        self.tampon = tampon
+
+    def __getitem__(self, i):
+        return self.tampon[i]
+
+    def __setitem__(self, i, valeur):
+        self.tampon[i] = valeur & 0xff
+
+
+def _identite(fonction):
+    return fonction
+
+
+@pytest.fixture(scope='module')
+def natif():
+    """Module _natif exécuté sous CPython (sans la garde MicroPython)"""
+    with open(SOURCE_NATIF, encoding='utf-8') as f:
+        arbre = ast.parse(f.read())
+    arbre.body = [noeud for noeud in arbre.body
+                  if not isinstance(noeud, (ast.If, ast.Import))]
+    module = types.ModuleType('_natif')
+    module.micropython = types.SimpleNamespace(native=_identite, viper=_identite)
+    module.ptr8 = Ptr8
+    exec(compile(arbre, SOURCE_NATIF, 'exec'), module.__dict__)
+    return module
+
+
+@pytest.fixture(scope='module')
+def modules():
+    robotpi_sim.installer(1)
+    try:
+        from robotPi import leds, moteurs, vl53l0x
+        yield types.SimpleNamespace(leds=leds, moteurs=moteurs, vl53l0x=vl53l0x)
+    finally:
+        robotpi_sim.desinstaller()
+
+
+# === Moteurs ===
+
+VITESSES = [-250, -100, -99.5, -50, -1, -0.01, 0, 0.01, 1, 33, 33.3, 50, 66.7,
+            99, 99.99, 100, 100.01, 250]
+
+
+def _duty_u16_reference(vitesse):
+    vitesse = max(0, min(100, vitesse))
+    return int((vitesse / 100) * 65535)
+
+
+def _duty_signe_reference(vitesse):
+    vitesse = max(-100, min(100, vitesse))
+    return int(vitesse * 65535 / 100)
+
+
+@pytest.mark.parametrize('vitesse', VITESSES)
+def test_duty(modules, natif, vitesse):
+    m = modules.moteurs
+    assert m._duty_u16_py(vitesse) == _duty_u16_reference(vitesse) == natif.duty_u16(vitesse)
+    assert m._duty_signe_py(vitesse) == _duty_signe_reference(vitesse) == natif.duty_signe(vitesse)
+
+
+def test_duty_limites(modules):
+    m = modules.moteurs
+    assert m._duty_u16_py(100) == m._duty_u16_py(1000) == 65535
+    assert m._duty_u16_py(0) == m._duty_u16_py(-5) == 0
+    assert m._duty_signe_py(-100) == m._duty_signe_py(-1000) == -65535
+    assert m._duty_signe_py(50) == -m._duty_signe_py(-50)
+
+
+class MoteurTrace:
+    def __init__(self, duty):
+        self.duty = duty
+        self.appels = []
+
+    def appliquer(self, duty):
+        self.appels.append(duty)
+        self.duty = duty
+
+
+def _rampe_reference(duty, cible, pas):
+    # prochain duty, ou None sans appel
+    if duty == cible:
+        return None
+    ecart = cible - duty
+    return duty + max(-pas, min(pas, ecart))
+
+
+@pytest.mark.parametrize('duty, cible, pas', [
+    (0, 0, 4096), (0, 65535, 4096), (65535, 0, 4096), (0, -65535, 4096),
+    (-65535, 65535, 4096), (60000, 65535, 4096), (-3000, 0, 4096),
+    (100, 101, 1), (0, 65535, 65535), (0, 65535, 100000), (-4096, 4096, 8192),
+])
+def test_rampe(modules, natif, duty, cible, pas):
+    attendu = _rampe_reference(duty, cible, pas)
+    for rampe in (modules.moteurs._rampe_py, natif.rampe):
+        moteur = MoteurTrace(duty)
+        rampe(moteur, cible, pas)
+        assert moteur.appels == ([] if attendu is None else [attendu])
+
+
+def test_rampe_atteint_la_cible_sans_la_depasser(modules):
+    moteur = MoteurTrace(-65535)
+    for _ in range(100):
+        modules.moteurs._rampe_py(moteur, 30000, 4096)
+    assert moteur.duty == 30000
+    assert moteur.appels == sorted(moteur.appels)
+    assert len(moteur.appels) == -(-(30000 + 65535) // 4096)
+
+
+# === LEDs ===
+
+def _table_luminosite_reference(facteur, gamma):
+    if gamma == 1.0:
+        return bytes(int(v * facteur) for v in range(256))
+    return bytes(int(255 * (v / 255) ** gamma * facteur) for v in range(256))
+
+
+@pytest.mark.parametrize('facteur', [0.0, 0.01, 0.25, 0.5, 0.999, 1.0])
+@pytest.mark.parametrize('gamma', [1.0, 0.45, 2.2, 2.8])
+def test_table_luminosite(modules, natif, facteur, gamma):
+    attendu = _table_luminosite_reference(facteur, gamma)
+    for table in (modules.leds._table_luminosite_py, natif.table_luminosite):
+        lut = bytearray(b'\xaa' * 256)  # toute la table est réécrite
+        table(lut, facteur, gamma)
+        assert lut == attendu
+    assert attendu[0] == 0 and attendu[255] == int(255 * facteur)
+
+
+def _interpoler_reference(depart, arrivee, k, n):
+    return bytes(d + (a - d) * k // n for d, a in zip(depart, arrivee))
+
+
+def _images():
+    hasard = random.Random(25)
+    aleatoires = [bytes(hasard.randrange(256) for _ in range(12)) for _ in range(2)]
+    return [
+        (bytes(12), bytes(12)),
+        (bytes(12), b'\xff' * 12),
+        (b'\xff' * 12, bytes(12)),
+        (bytes(range(0, 240, 20)), bytes(range(230, -10, -20))),
+        tuple(aleatoires),
+        (b'', b''),
+    ]
+
+
+@pytest.mark.parametrize('depart, arrivee', _images())
+@pytest.mark.parametrize('k, n', [(0, 1), (1, 1), (1, 3), (2, 3), (3, 3), (7, 50), (49, 50)])
+def test_interpoler(modules, natif, depart, arrivee, k, n):
+    attendu = _interpoler_reference(depart, arrivee, k, n)
+    for interpoler in (modules.leds._interpoler_py, natif.interpoler):
+        image = bytearray(len(depart))
+        interpoler(image, depart, arrivee, k, n)
+        assert image == attendu
+    if k == n:
+        assert attendu == arrivee
+
+
+# === VL53L0X ===
+
+def _select_spads_reference(carte, spad_count, is_aperture):
+    # boucle du pilote d'origine, sur une liste d'entiers
+    carte = list(carte)
+    spads_enabled = 0
+    for i in range(48):
+        if i < 12 and is_aperture or spads_enabled >= spad_count:
+            carte[i // 8] &= ~(1 << (i >> 2))
+        elif carte[i // 8] & (1 << (i >> 2)):
+            spads_enabled += 1
+    return bytes(v & 0xff for v in carte)
+
+
+def _cartes_spad():
+    hasard = random.Random(3)
+    return [bytes(6), b'\xff' * 6, b'\xf7\xff\xfe\xff\xff\xff', b'\x0f\x00\xf0\x00\xff\x00',
+            bytes(hasard.randrange(256) for _ in range(6))]
+
+
+@pytest.mark.parametrize('carte', _cartes_spad())
+@pytest.mark.parametrize('spad_count', [0, 1, 3, 5, 12, 32, 44, 48])
+@pytest.mark.parametrize('is_aperture', [False, True])
+def test_select_spads(modules, natif, carte, spad_count, is_aperture):
+    attendu = _select_spads_reference(carte, spad_count, is_aperture)
+    for select_spads in (modules.vl53l0x._select_spads_py, natif.select_spads):
+        spad_map = bytearray(carte)
+        select_spads(spad_map, spad_count, is_aperture)
+        assert spad_map == attendu
+    if not any(carte):
+        assert attendu == carte
+
+
+@pytest.mark.parametrize('valeur', [0, 1, 0xff, 0x100, 0x12345678, 0x7fffffff,
+                                    0x80000000, 0xfffffffe, 0xffffffff, 33000 * 1000])
+def test_pack_u32(modules, natif, valeur):
+    for pack_u32 in (modules.vl53l0x._pack_u32_py, natif.pack_u32):
+        buf = bytearray(b'\x55' * 6)
+        pack_u32(buf, valeur)
+        assert buf == valeur.to_bytes(4, 'big') + b'\x55\x55'
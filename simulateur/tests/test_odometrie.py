@@ -0,0 +1,75 @@
+"""
+Encodeurs, régulation PI de la vitesse des roues et position
+(robotPi.odometrie)
+"""
+
+import math
+import time
+
+import pytest
+
+ENCODEURS = ((10, 11), (12, 13))
+
+
+@pytest.fixture
+def odometrie(robot):
+    """Robot à encodeurs (350 impulsions par tour) ; rendements : vitesse
+    réelle / vitesse nominale de chaque moteur simulé"""
+    def creer(rendements=(1.0, 1.0)):
+        r = robot({'robot': {'encodeurs': ENCODEURS, 'rendements': rendements,
+                             'cap': 0.0}})
+        r.configurer_odometrie(ENCODEURS, 350)
+        return r
+    return creer
+
+
+def _angle(degres):
+    # dans [-180, 180[
+    return (degres + 180) % 360 - 180
+
+
+def _ecart_cap(robot_simule, depart):
+    return _angle(math.degrees(robot_simule.cap - depart))
+
+
+@pytest.mark.parametrize('rendements', [(1.0, 1.0), (1.0, 0.8), (0.7, 1.0)])
+def test_avancer_cm_droit_malgre_des_moteurs_inegaux(odometrie, rendements):
+    r = odometrie(rendements)
+    simule = r.sim.robot
+    cap = simule.cap
+    r.avancer_cm(30, vitesse=60)
+    assert simule.distance_parcourue == pytest.approx(0.30, abs=0.01)
+    assert abs(_ecart_cap(simule, cap)) < 3
+    assert r.moteur_gauche.duty == r.moteur_droit.duty == 0
+    x, y, cap_mesure = r.position()
+    assert x == pytest.approx(300, abs=5) and abs(y) < 10
+
+
+def test_reculer(odometrie):
+    r = odometrie()
+    r.avancer_cm(-20, vitesse=50)
+    assert r.sim.robot.distance_parcourue == pytest.approx(0.20, abs=0.01)
+    assert r.position()[0] == pytest.approx(-200, abs=5)
+
+
+@pytest.mark.parametrize('angle', [90, -45, 180])
+def test_tourner_degres(odometrie, angle):
+    r = odometrie()
+    simule = r.sim.robot
+    cap = simule.cap
+    r.tourner_degres(angle, vitesse=50)
+    assert abs(_angle(_ecart_cap(simule, cap) - angle)) < 4
+    assert abs(_angle(r.position()[2] - angle)) < 4
+
+
+def test_vitesse_regulee(odometrie):
+    r = odometrie((1.0, 0.7))
+    r.avancer_cm(100, vitesse=50, bloquant=False)
+    time.sleep_ms(1000)  # régime établi, loin de la cible
+    gauche, droite = r.vitesses_roues()
+    assert gauche == pytest.approx(150, rel=0.1)
+    assert droite == pytest.approx(150, rel=0.1)
+    # la roue la plus faible reçoit plus de rapport cyclique
+    assert r.moteur_droit.duty > r.moteur_gauche.duty
+    r.odometrie.arreter()
+    r.stopper()
@@ -0,0 +1,24 @@
+"""
+Profilage des latences (RobotPi.activer_profilage)
+"""
+
+
+def test_reactiver_apres_desactivation(robot):
+    r = robot()
+    profileur = r.activer_profilage()
+    r.lire_distance()
+    assert profileur.histogrammes['lire_distance'].nombre == 1
+
+    assert r.desactiver_profilage() is profileur
+    assert r.profileur is None
+    assert 'lire_distance' not in vars(r)  # méthode d'origine
+    r.lire_distance()
+    assert profileur.histogrammes['lire_distance'].nombre == 1
+
+    nouveau = r.activer_profilage()
+    assert nouveau is not profileur
+    r.lire_distance()
+    assert nouveau.histogrammes['lire_distance'].nombre == 1
+    assert nouveau.histogrammes['capteur.read'].nombre >= 1
+    r.desactiver_profilage()
+    assert r.desactiver_profilage() is None
@@ -0,0 +1,76 @@
+"""
+Programmes générés par Blockly exécutés de bout en bout dans le simulateur,
+comme avec python -m robotpi_sim : trace des roues et du capteur.
+"""
+
+import os
+
+import pytest
+
+import robotpi_sim
+from robotpi_sim import __main__ as ligne_de_commande
+
+PROGRAMMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'programmes')
+
+
+@pytest.fixture
+def simuler(monkeypatch, tmp_path):
+    """Lance un programme avec les options de la ligne de commande et
+    retourne (code de sortie, simulation, trace). La trace contient à chaque
+    pas de l'horloge : (instant s, vitesse roue gauche, vitesse roue droite
+    en m/s, distance devant le capteur en mm, mesures du capteur)."""
+    trace = []
+
+    def installer(*arguments, **options):
+        simulation = robotpi_sim.installer(*arguments, **options)
+        robot = simulation.robot
+
+        def relever(dt_us):
+            gauche, droite = robot.vitesses
+            trace.append((simulation.horloge.us / 1000000, gauche, droite,
+                          robot.distance_capteur_mm(), simulation.capteur.mesures))
+        simulation.horloge.observer(relever)
+        return simulation
+
+    monkeypatch.setattr(ligne_de_commande, 'installer', installer)
+    # fichier de calibration écrit dans le dossier courant
+    monkeypatch.chdir(tmp_path)
+
+    def lancer(programme, *options):
+        code = ligne_de_commande.main(
+            [os.path.join(PROGRAMMES, programme)] + [str(option) for option in options])
+        return code, robotpi_sim.carte.active, trace
+
+    yield lancer
+    robotpi_sim.desinstaller()
+
+
+def test_evitement_appui_par_defaut(simuler):
+    code, simulation, trace = simuler('evitement.py', '--duree', 10, '--boite', 1.0, 1.5)
+    assert code == 0
+    appui = ligne_de_commande.APPUI_DEFAUT
+    avant = [pas for pas in trace if pas[0] < appui]
+    apres = [pas for pas in trace if pas[0] >= appui]
+    # immobile jusqu'à l'appui (mise en route et attente du bouton)...
+    assert all(g == 0 and d == 0 for _, g, d, _, _ in avant)
+    # ...puis en marche avant dans la seconde qui suit
+    assert any(g > 0.1 and d > 0.1 for t, g, d, _, _ in apres if t < appui + 1)
+    # le capteur est relevé en boucle après l'appui
+    assert apres[-1][4] - apres[0][4] > 100
+    # la boîte est évitée : recul puis rotation, sans contact
+    assert any(g < -0.05 and d < -0.05 for _, g, d, _, _ in apres)
+    assert any(g * d < -0.0025 for _, g, d, _, _ in apres)
+    assert simulation.robot.collisions == 0
+    assert min(distance for _, _, _, distance, _ in apres if distance is not None) > 50
+
+
+def test_arret_au_bouton(simuler):
+    code, simulation, trace = simuler('evitement.py', '--duree', 10,
+                                      '--appui', 3, '--appui', 6)
+    assert code == 0
+    # la boucle s'arrête au second appui, au plus une manœuvre d'évitement
+    # (1 s) plus tard, avant la fin de la simulation
+    assert 6 < trace[-1][0] < 7.5
+    assert simulation.robot.distance_parcourue > 0.3
+    moteur_g, moteur_d = simulation.pwm[0], simulation.pwm[1]
+    assert moteur_g.duty_u16() == 0 and moteur_d.duty_u16() == 0
@@ -0,0 +1,125 @@
+"""
+Serveur de commandes (robotPi.serveur) et client du PC (robotpi_client)
+"""
+
+import threading
+
+import pytest
+
+from robotpi_client import protocole as p
+
+
+class Sortie:
+    def __init__(self):
+        self.octets = bytearray()
+
+    def write(self, donnees):
+        self.octets.extend(donnees)
+
+
+def _reponses(octets):
+    lecteur = p.LecteurTrames()
+    reponses = []
+    for octet in octets:
+        if lecteur.pousser(octet):
+            charge = bytes(lecteur.charge())
+            reponses.append((charge[0], charge[1], charge[2:]))
+    assert lecteur.erreurs == 0
+    return reponses
+
+
+def _requete(numero, commande, arguments=b''):
+    return p.trame(bytes((numero, commande)) + arguments)
+
+
+@pytest.fixture
+def serveur(simulation):
+    simulation()
+    from robotPi.serveur import ServeurCommandes
+    serveur = ServeurCommandes(None, entree=None, sortie=Sortie())
+    serveur.reponses = lambda: _reponses(serveur.sortie.octets)
+    return serveur
+
+
+def test_trame_valide(serveur):
+    serveur.traiter(_requete(1, p.PING, b'abc'))
+    assert serveur.reponses() == [(1, p.OK, b'abc')]
+    assert serveur.commandes == 1 and serveur.lecteur.erreurs == 0
+
+
+def test_trame_en_morceaux_et_texte_ignore(serveur):
+    flux = b'Bonjour\r\n' + _requete(2, p.PING, b'\x03\xfe') + b'>>> ' + _requete(3, p.PING)
+    for i in range(len(flux)):
+        serveur.traiter(flux[i:i + 1])
+    assert serveur.reponses() == [(2, p.OK, b'\x03\xfe'), (3, p.OK, b'')]
+
+
+def test_crc_faux_puis_resynchronisation(serveur):
+    mauvaise = bytearray(_requete(1, p.PING, b'x'))
+    mauvaise[-1] ^= 0x5a
+    serveur.traiter(bytes(mauvaise) + _requete(2, p.PING, b'y'))
+    assert serveur.reponses() == [(2, p.OK, b'y')]
+    assert serveur.lecteur.erreurs == 1
+
+
+def test_trame_tronquee_puis_resynchronisation(serveur):
+    # la longueur annoncée avale le début de la trame suivante, rejetée par
+    # le CRC ; le serveur se recale sur le SYNC d'après
+    tronquee = _requete(1, p.PING, b'0123456789')[:6]
+    serveur.traiter(tronquee + _requete(2, p.PING, b'a') + _requete(3, p.PING, b'b')
+                    + _requete(4, p.PING, b'c'))
+    assert serveur.lecteur.erreurs == 1
+    reponses = serveur.reponses()
+    assert reponses[-1] == (4, p.OK, b'c')
+    assert all(statut == p.OK for _, statut, _ in reponses)
+    assert 1 not in [numero for numero, _, _ in reponses]
+
+
+def test_longueur_nulle_et_charge_trop_courte(serveur):
+    serveur.traiter(p.trame(b'') + p.trame(b'\x05') + _requete(6, p.PING))
+    assert serveur.reponses() == [(6, p.OK, b'')]
+
+
+def test_commande_inconnue_et_arguments(serveur):
+    serveur.traiter(_requete(1, 0x6e) + _requete(2, p.PILOTER, b'\x10')
+                    + _requete(3, p.LOT, bytes((p.PING, 2)) + b'ok'
+                               + bytes((p.LOT, 0))))
+    assert serveur.reponses() == [(1, p.INCONNUE, b''), (2, p.ARGUMENTS, b''),
+                                  (3, p.ARGUMENTS, bytes((p.OK, 2)) + b'ok')]
+
+
+def test_client_et_port_simule(robot):
+    from robotpi_client import ClientRobot
+    from robotpi_sim.serie import PortSimule
+    r = robot()
+    r.sim.capteur.distance = lambda: 300.0
+    port = PortSimule(r)
+    erreurs = []
+
+    def servir():
+        try:
+            port.servir(r.sim.horloge)
+        except BaseException as e:  # remontée dans le test
+            erreurs.append(e)
+
+    fil = threading.Thread(target=servir, daemon=True)
+    fil.start()
+    client = ClientRobot(port.chemin, timeout=2.0)
+    try:
+        assert client.ping(b'robotPi') < 2.0
+        distance = client.lire_distance()
+        assert distance == pytest.approx(300, abs=30)
+        lot = client.lot()
+        lot.allumer_leds(0, 0, 255)
+        lot.lire_distance()
+        leds, distance = lot.executer()
+        assert leds is None and distance == pytest.approx(300, abs=30)
+        assert r.tampon_leds.couleur(0) == (0, 0, 255)
+        client.fin()
+        fil.join(2.0)
+        assert not fil.is_alive() and not erreurs
+    finally:
+        client.fermer()
+        port.serveur.actif = False
+        fil.join(2.0)
+        port.fermer()
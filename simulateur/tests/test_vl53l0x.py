@@ -0,0 +1,61 @@
+"""
+Accès aux registres du VL53L0X (robotPi.vl53l0x)
+"""
+
+import pytest
+
+
+class I2CTrace:
+    """I2C qui relève les tampons donnés par le pilote"""
+
+    def __init__(self, i2c):
+        self.i2c = i2c
+        self.tampons = set()
+
+    def readfrom_mem_into(self, adresse, registre, tampon):
+        assert isinstance(tampon, bytearray)
+        self.tampons.add(id(tampon))
+        self.i2c.readfrom_mem_into(adresse, registre, tampon)
+
+    def writeto_mem(self, adresse, registre, tampon):
+        assert isinstance(tampon, bytearray)
+        self.tampons.add(id(tampon))
+        self.i2c.writeto_mem(adresse, registre, tampon)
+
+    def readfrom_mem(self, *arguments):
+        raise AssertionError("readfrom_mem alloue les octets lus")
+
+
+class SansStruct:
+    def __getattr__(self, nom):
+        raise AssertionError("ustruct.%s alloue son résultat" % nom)
+
+
+@pytest.fixture
+def capteur(simulation, monkeypatch):
+    simulation()
+    from machine import I2C
+    from robotPi import vl53l0x
+    capteur = vl53l0x.VL53L0X(I2C(0))
+    capteur.i2c = I2CTrace(capteur.i2c)
+    monkeypatch.setattr(vl53l0x, 'ustruct', SansStruct())
+    return capteur
+
+
+def test_registres_8_et_16_bits_sans_allocation(capteur):
+    # registres libres du modèle : 0x20 (8 bits), 0x44 (taux de signal, 16 bits)
+    for i in range(100):
+        capteur._register(0x20, i)
+        assert capteur._register(0x20) == i
+        capteur._register(0x44, 0x0100 + i * 517, struct='>H')
+        assert capteur._register(0x44, struct='>H') == 0x0100 + i * 517
+        assert capteur._flag(0x20, 0) == bool(i & 1)
+    # toujours les deux tampons préalloués, jamais un nouvel objet
+    assert capteur.i2c.tampons == {id(capteur._buf1), id(capteur._buf2)}
+    assert capteur.i2c_transactions >= 500
+
+
+def test_registre_32_bits_dans_le_tampon_prealloue(capteur):
+    capteur._register(0x04, 0x12345678, struct='>I')
+    assert capteur.i2c.tampons == {id(capteur._buf4)}
+    assert bytes(capteur._buf4) == b'\x12\x34\x56\x78'